@@ -0,0 +1 @@
+"""Benchmarks, run from repository root (python -m benchmarks.load)."""
@@ -0,0 +1,338 @@
+"""Local stand-in for Telegram Bot API.
+
+An aiohttp server speaking the Bot API wire format. It simulates network
+latency, flood control (429 with retry_after when global or per-chat
+rates are exceeded, or at random) and users who blocked the bot (403).
+
+Run it standalone and point the whole bot at it:
+
+    python -m benchmarks.fake_telegram serve --port 8081 --latency 0.05 --blocked-share 0.1
+    TELEGRAM_API_URL=http://127.0.0.1:8081 python -m bot
+
+Or measure outbound dispatcher throughput and backoff in one process
+(the path used by broadcasts, reminders, kicks and payment messages):
+
+    BOT_TOKEN=1:x PRODAMUS_SECRET_KEY=x python -m benchmarks.fake_telegram outbound --messages 2000 --chats 500
+
+Outbound tuning settings (TELEGRAM_GLOBAL_RATE, TELEGRAM_CHAT_RATE,
+OUTBOUND_WORKERS) are read from the environment as usual.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import random
+import statistics
+import sys
+import time
+from collections import Counter, deque
+from typing import Any
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiohttp import web
+from loguru import logger
+
+BOT_USER = {"id": 42, "is_bot": True, "first_name": "Fake", "username": "fake_bot"}
+
+# Methods counted against flood limits and refused for blocked users
+SEND_METHODS = frozenset(
+    {
+        "sendMessage",
+        "sendPhoto",
+        "sendVideo",
+        "sendDocument",
+        "sendAnimation",
+        "sendVoice",
+        "sendVideoNote",
+        "sendMediaGroup",
+        "copyMessage",
+        "forwardMessage",
+    }
+)
+
+
+def fake_session(base_url: str) -> AiohttpSession:
+    """
+    Create aiogram session sending requests to a fake (or local) Bot API server.
+
+    Args:
+        base_url: Server URL, e.g. http://127.0.0.1:8081
+
+    Returns:
+        AiohttpSession
+    """
+    return AiohttpSession(api=TelegramAPIServer.from_base(base_url))
+
+
+class FakeBotAPI:
+    """Bot API stand-in with simulated latency, flood control and blocked users."""
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.02,
+        global_rate: float = 30,
+        chat_rate: float = 1,
+        flood_probability: float = 0.0,
+        retry_after: int = 1,
+        blocked_share: float = 0.0,
+    ) -> None:
+        """
+        Create server.
+
+        Args:
+            latency: Base response delay in seconds
+            jitter: Random extra delay up to this many seconds
+            global_rate: Sends per second before 429 (like Telegram's ~30/s)
+            chat_rate: Sends per second to one chat before 429
+            flood_probability: Chance of 429 for any send
+            retry_after: retry_after value of 429 responses
+            blocked_share: Share of chats that blocked the bot (chosen by chat ID)
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.flood_probability = flood_probability
+        self.retry_after = retry_after
+        self.blocked_share = blocked_share
+        self.stats: Counter[tuple[str, int]] = Counter()
+        self._message_ids = itertools.count(1)
+        self._sends: deque[float] = deque()
+        self._chat_sends: dict[int, float] = {}
+
+    def create_app(self) -> web.Application:
+        """Create aiohttp application."""
+        app = web.Application()
+        app.router.add_route("*", "/bot{token}/{method}", self.handle)
+        app.router.add_get("/stats", self.handle_stats)
+        return app
+
+    def is_blocked(self, chat_id: int) -> bool:
+        """Check if chat blocked the bot (deterministic per chat)."""
+        return self.blocked_share > 0 and random.Random(chat_id).random() < self.blocked_share
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Handle Bot API call."""
+        method = request.match_info["method"]
+        data = dict(await request.post()) if request.can_read_body else {}
+        data.update(request.query)
+
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+        if method == "getUpdates":
+            # Long polling without updates, capped to keep shutdown quick
+            await asyncio.sleep(min(_to_int(data.get("timeout")) or 0, 1))
+
+        status, payload = self._respond(method, data)
+        self.stats[(method, status)] += 1
+        return web.json_response(payload, status=status)
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        """Requests served by method and status."""
+        return web.json_response({f"{method} {status}": count for (method, status), count in self.stats.items()})
+
+    def _respond(self, method: str, data: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        chat_id = _to_int(data.get("chat_id"))
+
+        if method in SEND_METHODS:
+            if chat_id is not None and self.is_blocked(chat_id):
+                return 403, _error(403, "Forbidden: bot was blocked by the user")
+            if self._is_flooding(chat_id):
+                return 429, {
+                    **_error(429, f"Too Many Requests: retry after {self.retry_after}"),
+                    "parameters": {"retry_after": self.retry_after},
+                }
+
+        return 200, {"ok": True, "result": self._result(method, data, chat_id)}
+
+    def _is_flooding(self, chat_id: int | None) -> bool:
+        now = time.monotonic()
+        if self.flood_probability and random.random() < self.flood_probability:
+            return True
+
+        while self._sends and now - self._sends[0] >= 1:
+            self._sends.popleft()
+        if len(self._sends) >= self.global_rate:
+            return True
+
+        if chat_id is not None:
+            last = self._chat_sends.get(chat_id)
+            if last is not None and now - last < 1 / self.chat_rate:
+                return True
+            self._chat_sends[chat_id] = now
+
+        self._sends.append(now)
+        return False
+
+    def _result(self, method: str, data: dict[str, Any], chat_id: int | None) -> Any:
+        if method in SEND_METHODS:
+            return {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id or 0, "type": "private"},
+                "text": data.get("text", ""),
+            }
+        if method == "getMe":
+            return BOT_USER
+        if method == "getUpdates":
+            return []
+        if method == "getChat":
+            return {"id": chat_id or 0, "type": "private", "accent_color_id": 0, "max_reaction_count": 0}
+        if method == "getChatMember":
+            return {"status": "member", "user": {"id": _to_int(data.get("user_id")) or 0, "is_bot": False, "first_name": "User"}}
+        if method == "createChatInviteLink":
+            return {
+                "invite_link": f"https://t.me/+fake{next(self._message_ids)}",
+                "creator": BOT_USER,
+                "creates_join_request": False,
+                "is_primary": False,
+                "is_revoked": False,
+            }
+        # banChatMember, unbanChatMember, answerCallbackQuery, deleteMessage, editMessage*...
+        return True
+
+
+def _to_int(value: Any) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _error(code: int, description: str) -> dict[str, Any]:
+    return {"ok": False, "error_code": code, "description": description}
+
+
+async def start_server(api: FakeBotAPI, host: str, port: int) -> web.AppRunner:
+    """
+    Start fake API server.
+
+    Args:
+        api: Fake API
+        host: Bind host
+        port: Bind port
+
+    Returns:
+        AppRunner (call cleanup() to stop)
+    """
+    runner = web.AppRunner(api.create_app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+async def serve(api: FakeBotAPI, host: str, port: int) -> None:
+    """Run fake API server until interrupted."""
+    runner = await start_server(api, host, port)
+    logger.info(f"Fake Bot API listening on http://{host}:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def benchmark_outbound(api: FakeBotAPI, messages: int, chats: int, port: int) -> None:
+    """
+    Send messages through the outbound dispatcher and report throughput and backoff.
+
+    Args:
+        api: Fake API
+        messages: Messages to send
+        chats: Distinct recipients
+        port: Fake server port
+    """
+    # Imported here so that "serve" doesn't need bot settings
+    from aiogram.methods import SendMessage
+
+    from bot.core.config import settings
+    from bot.core.outbound import Priority, outbound
+
+    runner = await start_server(api, "127.0.0.1", port)
+    bot = Bot(token=settings.bot.BOT_TOKEN, session=fake_session(f"http://127.0.0.1:{port}"))
+    outbound.start(bot)
+
+    latencies: list[float] = []
+    errors: Counter[str] = Counter()
+
+    async def send(index: int) -> None:
+        chat_id = 1_000_000 + index % chats
+        submitted = time.perf_counter()
+        try:
+            await outbound.send(SendMessage(chat_id=chat_id, text=f"Message {index}"), Priority.BROADCAST, chat_id)
+        except Exception as e:
+            errors[type(e).__name__] += 1
+        latencies.append(time.perf_counter() - submitted)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(send(index) for index in range(messages)))
+    finally:
+        duration = time.perf_counter() - started
+        await outbound.stop()
+        await bot.session.close()
+        await runner.cleanup()
+
+    delivered = messages - sum(errors.values())
+    lane = outbound.get_stats()["lanes"][Priority.BROADCAST.name.lower()]
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    print(
+        f"\n{messages} messages to {chats} chats in {duration:.2f}s: "
+        f"{delivered / duration:.1f} delivered/s, {delivered} delivered"
+    )
+    print(
+        f"Limiter: global {settings.bot.TELEGRAM_GLOBAL_RATE}/s, chat {settings.bot.TELEGRAM_CHAT_RATE}/s, "
+        f"{settings.bot.OUTBOUND_WORKERS} workers"
+    )
+    print(
+        f"Latency submit->done: p50 {statistics.median(latencies_ms):.0f} ms, "
+        f"p95 {latencies_ms[int(len(latencies_ms) * 0.95) - 1]:.0f} ms, max {latencies_ms[-1]:.0f} ms"
+    )
+    print(f"Outbound lane: {lane}")
+    print(f"Failed: {dict(errors) or 'none'}")
+    print(f"Server responses: {dict(sorted((f'{m} {s}', c) for (m, s), c in api.stats.items()))}")
+
+
+def main() -> None:
+    """Parse arguments and run command."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["serve", "outbound"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.05, help="base response delay, seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="random extra delay, seconds")
+    parser.add_argument("--global-rate", type=float, default=30, help="server-side sends/s before 429")
+    parser.add_argument("--chat-rate", type=float, default=1, help="server-side sends/s to one chat before 429")
+    parser.add_argument("--flood-probability", type=float, default=0.0, help="random 429 chance per send")
+    parser.add_argument("--retry-after", type=int, default=1, help="retry_after of 429 responses")
+    parser.add_argument("--blocked-share", type=float, default=0.0, help="share of chats that blocked the bot")
+    parser.add_argument("--messages", type=int, default=1000, help="outbound: messages to send")
+    parser.add_argument("--chats", type=int, default=500, help="outbound: distinct recipients")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+
+    api = FakeBotAPI(
+        latency=args.latency,
+        jitter=args.jitter,
+        global_rate=args.global_rate,
+        chat_rate=args.chat_rate,
+        flood_probability=args.flood_probability,
+        retry_after=args.retry_after,
+        blocked_share=args.blocked_share,
+    )
+    try:
+        if args.command == "serve":
+            asyncio.run(serve(api, args.host, args.port))
+        else:
+            asyncio.run(benchmark_outbound(api, args.messages, args.chats, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
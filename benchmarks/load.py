@@ -0,0 +1,431 @@
+"""Synthetic load benchmark.
+
+Builds the production Dispatcher (get_handlers_router() +
+register_middlewares()) with a fake Bot API session and feeds it
+synthetic updates concurrently through Dispatcher.feed_update:
+/start, menu:* callbacks, buy_subscription, tariff:* and bonuses.
+
+Reports throughput, p50/p95/p99 latency and SQL statements per update,
+overall and per scenario.
+
+The database is taken from DATABASE_URL / DB_* settings. A local
+Postgres is migrated to head; an SQLite file gets the schema created
+from models:
+
+    DATABASE_URL=sqlite+aiosqlite:///bench.db BOT_TOKEN=1:x PRODAMUS_SECRET_KEY=x \\
+        python -m benchmarks.load --updates 5000 --concurrency 50
+
+Benchmark users are seeded with IDs starting at --user-id-offset.
+Redis (FSM storage and cache tier) is used only with --redis.
+Per-user throttling is off unless --throttle is given, otherwise most
+updates of the few benchmark users would be dropped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Callable
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.base import BaseSession
+from aiogram.enums import ParseMode
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+from loguru import logger
+from sqlalchemy import func, select, text
+from sqlalchemy.schema import DefaultClause
+
+from bot.core.cache import cache
+from bot.core.config import settings
+from bot.core.redis import RedisClient
+from bot.core.throttling import throttler
+from bot.database import AgreementModel, Base, SubscriptionModel, UserModel, engine, sessionmaker
+from bot.database.instrumentation import count_queries
+from bot.database.migrations import run_migrations
+from bot.handlers import get_handlers_router
+from bot.middlewares import register_middlewares
+from bot.middlewares.services import ServiceMiddleware
+from bot.services.pricing import TARIFFS
+
+BOT_ID = 42
+SEED_BATCH = 1000
+
+
+class FakeTelegramSession(BaseSession):
+    """Bot API session answering every method locally after a fixed delay."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        """
+        Create session.
+
+        Args:
+            latency: Simulated Bot API round trip in seconds
+        """
+        super().__init__()
+        self.latency = latency
+        self.calls = 0
+        self._message_ids = itertools.count(1)
+
+    async def make_request(self, bot: Bot, method: TelegramMethod[TelegramType], timeout: int | None = None) -> Any:
+        """Return a plausible result for method."""
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        response = self.check_response(
+            bot=bot,
+            method=method,
+            status_code=200,
+            content=json.dumps({"ok": True, "result": self._result(method)}),
+        )
+        return response.result
+
+    async def stream_content(self, url: str, **kwargs: Any) -> AsyncGenerator[bytes, None]:
+        """Downloads are not used by benchmarked handlers."""
+        yield b""
+
+    async def close(self) -> None:
+        """Nothing to close."""
+
+    def _result(self, method: TelegramMethod[Any]) -> Any:
+        returning = method.__returning__
+        if returning is Message:
+            return {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": getattr(method, "chat_id", 0), "type": "private"},
+                "text": getattr(method, "text", None) or "",
+            }
+        if returning is User:
+            return {"id": BOT_ID, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+        # bool and Message | bool (edit methods)
+        return True
+
+
+@dataclass
+class Scenario:
+    """Kind of synthetic update."""
+
+    name: str
+    weight: int
+    build: Callable[[int, int], Update]
+
+
+@dataclass
+class Sample:
+    """Result of one update."""
+
+    scenario: str
+    latency: float
+    queries: int
+    error: str | None = None
+
+
+@dataclass
+class Report:
+    """Aggregated results."""
+
+    samples: list[Sample] = field(default_factory=list)
+    duration: float = 0.0
+
+
+def _user(user_id: int) -> User:
+    return User(id=user_id, is_bot=False, first_name=f"User{user_id}", language_code="ru")
+
+
+def _chat(user_id: int) -> Chat:
+    return Chat(id=user_id, type="private")
+
+
+def message_update(text: str) -> Callable[[int, int], Update]:
+    """Build factory of message updates with text."""
+
+    def build(update_id: int, user_id: int) -> Update:
+        return Update(
+            update_id=update_id,
+            message=Message(
+                message_id=update_id,
+                date=datetime.datetime.now(datetime.timezone.utc),
+                chat=_chat(user_id),
+                from_user=_user(user_id),
+                text=text,
+            ),
+        )
+
+    return build
+
+
+def callback_update(data: str | Callable[[], str]) -> Callable[[int, int], Update]:
+    """Build factory of callback query updates with data."""
+
+    def build(update_id: int, user_id: int) -> Update:
+        return Update(
+            update_id=update_id,
+            callback_query=CallbackQuery(
+                id=str(update_id),
+                from_user=_user(user_id),
+                chat_instance=str(user_id),
+                data=data() if callable(data) else data,
+                message=Message(
+                    message_id=update_id,
+                    date=datetime.datetime.now(datetime.timezone.utc),
+                    chat=_chat(user_id),
+                    from_user=User(id=BOT_ID, is_bot=True, first_name="Bench"),
+                    text="menu",
+                ),
+            ),
+        )
+
+    return build
+
+
+SCENARIOS = [
+    Scenario("/start", 15, message_update("/start")),
+    Scenario("menu:main", 20, callback_update("menu:main")),
+    Scenario("menu:account", 15, callback_update("menu:account")),
+    Scenario("menu:info", 5, callback_update("menu:info")),
+    Scenario("menu:documents", 5, callback_update("menu:documents")),
+    Scenario("buy_subscription", 15, callback_update("buy_subscription")),
+    Scenario("tariff:*", 15, callback_update(lambda: f"tariff:{random.choice(list(TARIFFS))}")),
+    Scenario("bonuses", 10, callback_update("bonuses")),
+]
+
+
+async def prepare_database() -> None:
+    """Create schema: migrations on Postgres, models on SQLite."""
+    if engine.dialect.name == "postgresql":
+        await run_migrations()
+        return
+
+    # Postgres-only server defaults (TIMEZONE('utc', now())) are replaced for SQLite
+    for table in Base.metadata.tables.values():
+        for column in table.columns:
+            if column.server_default is not None and "now()" in str(getattr(column.server_default, "arg", "")):
+                column.server_default = DefaultClause(text("CURRENT_TIMESTAMP"))
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+
+async def seed_users(first_id: int, count: int, subscribed_share: float) -> None:
+    """
+    Insert benchmark users who accepted the agreement (skipped if present).
+
+    Args:
+        first_id: First user ID
+        count: Number of users
+        subscribed_share: Share of users with active subscription
+    """
+    user_ids = range(first_id, first_id + count)
+    async with sessionmaker() as session:
+        existing = await session.scalar(
+            select(func.count()).select_from(UserModel).where(UserModel.id.between(user_ids[0], user_ids[-1]))
+        )
+        if existing == count:
+            return
+
+        expires_at = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) + datetime.timedelta(days=30)
+        for offset in range(0, count, SEED_BATCH):
+            batch = list(user_ids[offset : offset + SEED_BATCH])
+            found = set(
+                (await session.execute(select(UserModel.id).where(UserModel.id.in_(batch)))).scalars().all()
+            )
+            for user_id in batch:
+                if user_id in found:
+                    continue
+                session.add(UserModel(id=user_id, first_name=f"User{user_id}", language_code="ru"))
+                session.add(
+                    AgreementModel(
+                        user_id=user_id, agreed_to_offer=True, agreed_to_privacy=True, agreed_to_consent=True
+                    )
+                )
+                if random.random() < subscribed_share:
+                    session.add(SubscriptionModel(user_id=user_id, expires_at=expires_at, is_active=True))
+            await session.commit()
+
+    logger.info(f"Seeded {count} benchmark users")
+
+
+async def run_load(
+    dp: Dispatcher,
+    bot: Bot,
+    updates: int,
+    concurrency: int,
+    user_ids: list[int],
+) -> Report:
+    """
+    Feed synthetic updates concurrently.
+
+    Args:
+        dp: Dispatcher
+        bot: Bot with fake session
+        updates: Number of updates
+        concurrency: Updates processed at once
+        user_ids: Users sending updates
+
+    Returns:
+        Report
+    """
+    report = Report()
+    weights = [scenario.weight for scenario in SCENARIOS]
+    plan = random.choices(SCENARIOS, weights=weights, k=updates)
+    update_ids = itertools.count(1)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def feed(scenario: Scenario) -> None:
+        update = scenario.build(next(update_ids), random.choice(user_ids))
+        async with semaphore:
+            error = None
+            started = time.perf_counter()
+            with count_queries() as stats:
+                try:
+                    await dp.feed_update(bot, update)
+                except Exception as e:
+                    error = type(e).__name__
+            report.samples.append(Sample(scenario.name, time.perf_counter() - started, stats.total, error))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(feed(scenario) for scenario in plan))
+    report.duration = time.perf_counter() - started
+    return report
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Get percentile of values (nearest rank)."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))]
+
+
+def summarize(samples: list[Sample]) -> dict[str, Any]:
+    """Get latency and query statistics of samples."""
+    latencies = [sample.latency * 1000 for sample in samples]
+    queries = [sample.queries for sample in samples]
+    return {
+        "updates": len(samples),
+        "errors": sum(1 for sample in samples if sample.error),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(max(latencies), 2),
+        "queries_avg": round(statistics.fmean(queries), 2),
+        "queries_max": max(queries),
+    }
+
+
+def print_report(report: Report, api_calls: int) -> None:
+    """Print human-readable report."""
+    total = summarize(report.samples)
+    print(
+        f"\n{total['updates']} updates in {report.duration:.2f}s: "
+        f"{total['updates'] / report.duration:.1f} updates/s, {api_calls} Bot API calls, {total['errors']} errors"
+    )
+
+    header = f"{'scenario':<18}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'q/upd':>8}{'q max':>7}"
+    print(header)
+    print("-" * len(header))
+    by_scenario: dict[str, list[Sample]] = {}
+    for sample in report.samples:
+        by_scenario.setdefault(sample.scenario, []).append(sample)
+    for name, samples in [*sorted(by_scenario.items()), ("TOTAL", report.samples)]:
+        row = summarize(samples)
+        print(
+            f"{name:<18}{row['updates']:>7}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}"
+            f"{row['max_ms']:>10}{row['queries_avg']:>8}{row['queries_max']:>7}"
+        )
+
+    errors = sorted({sample.error for sample in report.samples if sample.error})
+    if errors:
+        print(f"Errors: {', '.join(errors)}")
+
+
+async def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=2000, help="measured updates")
+    parser.add_argument("--warmup", type=int, default=200, help="updates before measurement")
+    parser.add_argument("--concurrency", type=int, default=50, help="updates processed at once")
+    parser.add_argument("--users", type=int, default=500, help="distinct users sending updates")
+    parser.add_argument("--subscribed", type=float, default=0.5, help="share of users with subscription")
+    parser.add_argument("--user-id-offset", type=int, default=9_000_000_000, help="first benchmark user ID")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="simulated Bot API latency, seconds")
+    parser.add_argument("--redis", action="store_true", help="use REDIS_URL for FSM storage and cache")
+    parser.add_argument("--throttle", action="store_true", help="keep per-user throttling (RATE_LIMIT) on")
+    parser.add_argument("--seed", type=int, default=1, help="random seed (same seed, same update mix)")
+    parser.add_argument("--json", action="store_true", help="print machine-readable summary")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    logger.remove()
+    logger.add(sys.stderr, level=os.getenv("BENCH_LOG_LEVEL", "WARNING"))
+
+    redis_client = None
+    try:
+        await prepare_database()
+        await seed_users(args.user_id_offset, args.users, args.subscribed)
+
+        storage: BaseStorage = MemoryStorage()
+        if args.redis:
+            from aiogram.fsm.storage.redis import RedisStorage
+
+            redis_client = RedisClient(settings.cache.redis_url)
+            await redis_client.connect()
+            storage = RedisStorage(redis=redis_client.get_client())
+            await cache.setup(redis_client.get_client())
+            throttler.setup(redis_client.get_client())
+        if not args.throttle:
+            throttler.interval = 0
+
+        session = FakeTelegramSession(latency=args.api_latency)
+        bot = Bot(
+            token=settings.bot.BOT_TOKEN,
+            session=session,
+            default=DefaultBotProperties(parse_mode=ParseMode.HTML),
+        )
+        dp = Dispatcher(storage=storage)
+        register_middlewares(dp)
+        if redis_client:
+            dp.update.middleware(ServiceMiddleware(services={"redis": redis_client.get_client()}))
+        dp.include_router(get_handlers_router())
+
+        user_ids = list(range(args.user_id_offset, args.user_id_offset + args.users))
+        if args.warmup:
+            await run_load(dp, bot, args.warmup, args.concurrency, user_ids)
+
+        calls_before = session.calls
+        report = await run_load(dp, bot, args.updates, args.concurrency, user_ids)
+        print_report(report, session.calls - calls_before)
+
+        if args.json:
+            print(
+                json.dumps(
+                    {
+                        "throughput": round(len(report.samples) / report.duration, 1),
+                        **summarize(report.samples),
+                        "database": engine.dialect.name,
+                        "concurrency": args.concurrency,
+                        "seed": args.seed,
+                    }
+                )
+            )
+    finally:
+        if redis_client:
+            await cache.close()
+            await redis_client.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""Startup time benchmark.
+
+Measures two numbers Railway deploys depend on:
+
+* import time of ``bot.__main__`` in a fresh interpreter;
+* time from process spawn until ``/health`` answers 200.
+
+The bot process uses the current environment (BOT_TOKEN, DATABASE_URL,
+REDIS_URL, ...), only PORT is overridden. Telegram doesn't have to be
+reachable: the healthcheck is served before polling starts.
+
+Usage:
+    python benchmarks/startup.py --runs 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    """Get free TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import() -> float:
+    """
+    Import bot entry point in a fresh interpreter.
+
+    Returns:
+        Seconds spent in import
+    """
+    code = "import time; t = time.perf_counter(); import bot.__main__; print(time.perf_counter() - t)"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure_healthy(timeout: float) -> float:
+    """
+    Start bot and poll healthcheck until it answers.
+
+    Args:
+        timeout: Seconds to wait for healthcheck
+
+    Returns:
+        Seconds from spawn to first 200 response
+    """
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "bot"],
+        cwd=ROOT,
+        env={**os.environ, "PORT": str(port)},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Bot exited with code {process.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            time.sleep(0.01)
+        raise TimeoutError(f"Healthcheck not ready in {timeout}s")
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def report(name: str, samples: list[float]) -> None:
+    """Print samples summary."""
+    print(
+        f"{name:<16} median {statistics.median(samples) * 1000:8.1f} ms  "
+        f"min {min(samples) * 1000:8.1f} ms  max {max(samples) * 1000:8.1f} ms  (n={len(samples)})"
+    )
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="measurements per metric")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait for healthcheck")
+    parser.add_argument("--skip-health", action="store_true", help="measure import time only")
+    args = parser.parse_args()
+
+    # First run warms bytecode and OS file caches
+    measure_import()
+
+    report("import", [measure_import() for _ in range(args.runs)])
+    if not args.skip_health:
+        report("time to /health", [measure_healthy(args.timeout) for _ in range(args.runs)])
+
+
+if __name__ == "__main__":
+    main()
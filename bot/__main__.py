@@ -7,33 +7,39 @@ import logging
 import os
 import signal
 import sys
-
-# DEBUG: Print to confirm module is loading
-print("=" * 60, flush=True)
-print("🔧 DEBUG: bot/__main__.py is being imported", flush=True)
-print("=" * 60, flush=True)
+from typing import TYPE_CHECKING
 
 from aiohttp import web
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 from aiogram.fsm.storage.memory import MemoryStorage
-from aiogram.fsm.storage.redis import RedisStorage
 from aiogram.types import ErrorEvent
 from loguru import logger
-from redis.asyncio import Redis
-
-from alembic import command
-from alembic.config import Config
 
+from bot.core.cache import cache
 from bot.core.config import settings
+from bot.core.metrics import loop_lag_monitor
+from bot.core.tracing import EXPORT_RECORD_KEY, tracer
+from bot.core.throttling import throttler
+from bot.core.outbound import outbound
 from bot.core.redis import RedisClient
 from bot.database import sessionmaker
 from bot.handlers import get_handlers_router
 from bot.handlers.prodamus_webhook import setup_webhook_handlers
-from bot.middlewares import register_middlewares
-from bot.middlewares.services import ServiceMiddleware
-from bot.scheduler import setup_scheduler
+from bot.middlewares import (
+    TelegramRequestMetricsMiddleware,
+    TelegramRequestTracingMiddleware,
+    register_middlewares,
+)
+
+if TYPE_CHECKING:
+    from bot.core.leader import LeaderElection
+    from bot.core.sharding import ReplicaRegistry
+
+# Mode-specific components (webhook, Redis storage, scheduler, leader
+# election or sharding, migrations) are imported where they are used,
+# so the healthcheck isn't delayed by modules this mode never needs.
 
 # =========================
 # НАСТРОЙКА ЛОГИРОВАНИЯ
@@ -48,8 +54,11 @@ logger.remove()
 logger.add(
     sys.stdout,
     format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <level>{message}</level>",
-    level="INFO"
+    level="INFO",
+    # Exported traces go to their own file sink only
+    filter=lambda record: EXPORT_RECORD_KEY not in record["extra"],
 )
+tracer.setup()
 
 # =========================
 # ГЛОБАЛЬНЫЕ ПЕРЕМЕННЫЕ
@@ -59,6 +68,11 @@ bot: Bot | None = None
 dp: Dispatcher | None = None
 runner: web.AppRunner | None = None
 redis_client: RedisClient | None = None
+replica_registry: ReplicaRegistry | None = None
+leader_election: LeaderElection | None = None
+# Set by shutdown(), ends webhook mode bot task
+stop_event = asyncio.Event()
+shutdown_task: asyncio.Task | None = None
 
 
 # =========================
@@ -82,6 +96,21 @@ async def start_web_server() -> web.AppRunner:
     # Setup webhook routes (includes /, /health, /prodamus-webhook)
     setup_webhook_handlers(app)
 
+    # Mount Telegram update handler (webhook mode only)
+    if settings.bot.USE_WEBHOOK and dp and bot:
+        from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+
+        if not settings.bot.WEBHOOK_SECRET:
+            logger.warning("⚠️ WEBHOOK_SECRET not set - Telegram updates will not be verified")
+
+        SimpleRequestHandler(
+            dispatcher=dp,
+            bot=bot,
+            handle_in_background=True,
+            secret_token=settings.bot.WEBHOOK_SECRET,
+        ).register(app, path=settings.bot.WEBHOOK_PATH)
+        logger.info(f"🔗 Telegram webhook handler mounted at {settings.bot.WEBHOOK_PATH}")
+
     # Create and start runner
     runner = web.AppRunner(app)
     await runner.setup()
@@ -119,6 +148,8 @@ async def start_bot_safe(bot_instance: Bot, dp_instance: Dispatcher) -> None:
             logger.info(f"🔄 Bot polling attempt {attempt}/{max_retries}")
 
             BOT_ALIVE = True
+            # Polling is rejected by Telegram while a webhook is registered
+            await bot_instance.delete_webhook(drop_pending_updates=False)
             await dp_instance.start_polling(bot_instance)
 
             # Если polling завершился нормально (не ошибка)
@@ -143,9 +174,76 @@ async def start_bot_safe(bot_instance: Bot, dp_instance: Dispatcher) -> None:
         await asyncio.sleep(3600)
 
 
+async def start_bot_webhook(bot_instance: Bot, dp_instance: Dispatcher) -> None:
+    """
+    Запускает бота в режиме webhook.
+
+    Обновления принимает aiohttp-приложение из start_web_server, здесь только
+    выполняются startup-хуки диспетчера и регистрируется webhook в Telegram.
+
+    Args:
+        bot_instance: Экземпляр бота
+        dp_instance: Экземпляр диспетчера
+    """
+    global BOT_ALIVE
+
+    max_retries = 5
+    backoff = 5  # секунды
+
+    logger.info("🤖 Starting bot in webhook mode")
+    await dp_instance.emit_startup(bot=bot_instance, dispatcher=dp_instance, **dp_instance.workflow_data)
+
+    for attempt in range(1, max_retries + 1):
+        try:
+            logger.info(f"🔄 Set webhook attempt {attempt}/{max_retries}")
+
+            await bot_instance.set_webhook(
+                url=settings.bot.webhook_url,
+                secret_token=settings.bot.WEBHOOK_SECRET,
+                allowed_updates=dp_instance.resolve_used_update_types(),
+                drop_pending_updates=False,
+            )
+
+            BOT_ALIVE = True
+            logger.success(f"✅ Webhook set to {settings.bot.webhook_url}")
+            break
+
+        except Exception as e:
+            BOT_ALIVE = False
+            logger.error(f"❌ Failed to set webhook (attempt {attempt}/{max_retries}): {e}")
+
+            if attempt < max_retries:
+                logger.info(f"⏳ Retrying in {backoff} seconds...")
+                await asyncio.sleep(backoff)
+                backoff *= 2  # Exponential backoff
+            else:
+                logger.error("🚨 Max retries reached. Webhook is not registered.")
+                logger.warning("⚠️ Web server continues running for healthcheck")
+
+    # Updates are delivered to the web server, keep process alive until shutdown
+    await stop_event.wait()
+
+
 # =========================
 # GRACEFUL SHUTDOWN
 # =========================
+def request_shutdown(signal_name: str | None = None) -> asyncio.Task:
+    """
+    Start graceful shutdown once, repeated signals reuse the same task.
+
+    Args:
+        signal_name: Название сигнала (SIGTERM, SIGINT)
+
+    Returns:
+        Shutdown task
+    """
+    global shutdown_task
+
+    if shutdown_task is None:
+        shutdown_task = asyncio.create_task(shutdown(signal_name))
+    return shutdown_task
+
+
 async def shutdown(signal_name: str | None = None) -> None:
     """
     Graceful shutdown приложения.
@@ -153,19 +251,40 @@ async def shutdown(signal_name: str | None = None) -> None:
     Args:
         signal_name: Название сигнала (SIGTERM, SIGINT)
     """
-    global bot, dp, runner, redis_client
+    global bot, dp, runner, redis_client, replica_registry, leader_election
 
     logger.warning(f"🛑 {'Received ' + signal_name + ' signal. ' if signal_name else ''}Shutting down...")
+    stop_event.set()
 
     # 1. Остановка бота
     if dp:
         try:
-            await dp.stop_polling()
-            logger.info("✅ Bot polling stopped")
+            if settings.bot.USE_WEBHOOK:
+                # Webhook is left registered: other replicas keep receiving updates
+                await dp.emit_shutdown(bot=bot, dispatcher=dp, **dp.workflow_data)
+                logger.info("✅ Dispatcher shutdown hooks executed")
+            else:
+                await dp.stop_polling()
+                logger.info("✅ Bot polling stopped")
         except Exception as e:
             logger.error(f"Error stopping bot: {e}")
 
-    # 2. Закрытие бота
+    # 2. Передача лидерства / шарда другим репликам
+    try:
+        if leader_election:
+            await leader_election.stop()
+        if replica_registry:
+            await replica_registry.stop()
+    except Exception as e:
+        logger.error(f"Error stopping scheduler coordination: {e}")
+
+    # 3. Отправка очереди исходящих сообщений
+    try:
+        await outbound.stop()
+    except Exception as e:
+        logger.error(f"Error stopping outbound dispatcher: {e}")
+
+    # 4. Закрытие бота
     if bot:
         try:
             await bot.session.close()
@@ -173,15 +292,17 @@ async def shutdown(signal_name: str | None = None) -> None:
         except Exception as e:
             logger.error(f"Error closing bot: {e}")
 
-    # 3. Закрытие Redis
+    # 5. Закрытие Redis
     if redis_client:
         try:
+            await cache.close()
             await redis_client.close()
             logger.info("✅ Redis connection closed")
         except Exception as e:
             logger.error(f"Error closing Redis: {e}")
 
-    # 4. Остановка веб-сервера
+    # 6. Остановка веб-сервера
+    await loop_lag_monitor.stop()
     if runner:
         try:
             await runner.cleanup()
@@ -204,23 +325,53 @@ async def on_startup(dispatcher: Dispatcher) -> None:
     """
     logger.info("🚀 Bot startup sequence initiated")
 
-    # Run database migrations
-    try:
-        logger.info("🔄 Running database migrations...")
-        alembic_cfg = Config("alembic.ini")
-        # Run upgrade head in thread to avoid blocking loop
-        await asyncio.to_thread(command.upgrade, alembic_cfg, "head")
-        logger.success("✅ Database migrations applied")
-    except Exception as e:
-        logger.error(f"❌ Failed to apply migrations: {e}")
+    # Run database migrations (skipped when schema is already at head)
+    if settings.bot.RUN_MIGRATIONS_ON_STARTUP:
+        from bot.database.migrations import run_migrations
+
+        try:
+            logger.info("🔄 Checking database migrations...")
+            if await run_migrations():
+                logger.success("✅ Database migrations applied")
+        except Exception as e:
+            logger.error(f"❌ Failed to apply migrations: {e}")
 
     try:
         # Get bot from global variable (bot is already created)
-        global bot
+        global bot, replica_registry, leader_election
         if bot:
+            from bot.scheduler import setup_cron_scheduler, setup_scheduler
+
             scheduler = setup_scheduler(bot)
             scheduler.start()
-            logger.success("⏰ Scheduler started")
+
+            sharded = settings.bot.SCHEDULER_MODE == "sharded"
+            if sharded and not redis_client:
+                logger.warning("⚠️ Sharded scheduler requires Redis, falling back to leader election")
+                sharded = False
+
+            if sharded:
+                from bot.core.sharding import ReplicaRegistry
+
+                # Every replica runs cron jobs for its own part of users
+                replica_registry = ReplicaRegistry(
+                    redis_client.get_client(),
+                    heartbeat_interval=settings.bot.REPLICA_HEARTBEAT_SECONDS,
+                    ttl=settings.bot.REPLICA_TTL_SECONDS,
+                )
+                await replica_registry.start()
+                setup_cron_scheduler(bot, replica_registry).start()
+            else:
+                from bot.core.leader import scheduler_leader
+
+                # Cron jobs run only in the replica elected as leader
+                cron_scheduler = setup_cron_scheduler(bot)
+                cron_scheduler.start(paused=True)
+                scheduler_leader.on_elected = cron_scheduler.resume
+                scheduler_leader.on_demoted = cron_scheduler.pause
+                scheduler_leader.start()
+                leader_election = scheduler_leader
+            logger.success(f"⏰ Scheduler started ({settings.bot.SCHEDULER_MODE} mode)")
     except Exception as e:
         logger.warning(f"⚠️ Failed to start scheduler: {e}")
         logger.warning("⚠️ Continuing without scheduler")
@@ -258,8 +409,12 @@ async def main() -> None:
                 redis_client = RedisClient(settings.cache.redis_url)
                 await redis_client.connect()
                 
+                from aiogram.fsm.storage.redis import RedisStorage
+
                 redis_instance = redis_client.get_client()
                 storage = RedisStorage(redis=redis_instance)
+                await cache.setup(redis_instance)
+                throttler.setup(redis_instance)
                 logger.success("📦 Using Redis storage")
             else:
                 logger.warning("⚠️ REDIS_URL not set")
@@ -273,10 +428,21 @@ async def main() -> None:
 
         # === 3. Создание бота ===
         logger.info("🤖 Creating bot instance")
+        session = None
+        if settings.bot.TELEGRAM_API_URL:
+            from aiogram.client.session.aiohttp import AiohttpSession
+            from aiogram.client.telegram import TelegramAPIServer
+
+            logger.info(f"🔀 Using Bot API server {settings.bot.TELEGRAM_API_URL}")
+            session = AiohttpSession(api=TelegramAPIServer.from_base(settings.bot.TELEGRAM_API_URL))
         bot = Bot(
             token=settings.bot.BOT_TOKEN,
+            session=session,
             default=DefaultBotProperties(parse_mode=ParseMode.HTML),
         )
+        bot.session.middleware(TelegramRequestMetricsMiddleware())
+        bot.session.middleware(TelegramRequestTracingMiddleware())
+        outbound.start(bot)
 
         # === 4. Создание диспетчера ===
         logger.info("⚙️ Creating dispatcher")
@@ -290,6 +456,8 @@ async def main() -> None:
         
         # Register ServiceMiddleware if Redis is available
         if redis_client:
+            from bot.middlewares.services import ServiceMiddleware
+
             dp.update.middleware(ServiceMiddleware(services={"redis": redis_client.get_client()}))
 
         # Register routers
@@ -300,29 +468,32 @@ async def main() -> None:
         # === 5. ЗАПУСК WEB СЕРВЕРА ПЕРВЫМ ===
         logger.info("🌐 Starting web server (PRIORITY #1)")
         runner = await start_web_server()
+        loop_lag_monitor.start()
 
-        # === 6. Пауза для прохождения healthcheck ===
-        logger.info("⏳ Waiting 2 seconds for Railway healthcheck...")
-        await asyncio.sleep(2)
-        logger.success("✅ Healthcheck window passed")
-
-        # === 7. Запуск бота в фоновой задаче ===
+        # === 6. Запуск бота в фоновой задаче ===
+        # Healthcheck is served already, bot starts right away
         logger.info("🤖 Starting bot in background task")
-        bot_task = asyncio.create_task(start_bot_safe(bot, dp))
+        if settings.bot.USE_WEBHOOK:
+            bot_task = asyncio.create_task(start_bot_webhook(bot, dp))
+        else:
+            bot_task = asyncio.create_task(start_bot_safe(bot, dp))
 
-        # === 8. Регистрация обработчиков сигналов ===
+        # === 7. Регистрация обработчиков сигналов ===
         loop = asyncio.get_running_loop()
         for sig in (signal.SIGTERM, signal.SIGINT):
             loop.add_signal_handler(
                 sig,
-                lambda s=sig: asyncio.create_task(shutdown(s.name))
+                lambda s=sig: request_shutdown(s.name)
             )
         logger.success("✅ Signal handlers registered")
 
-        # === 9. Держим процесс живым ===
+        # === 8. Держим процесс живым ===
         logger.success("=" * 60)
         logger.success("✅ APPLICATION STARTED SUCCESSFULLY")
-        logger.success("📡 Bot polling in background")
+        if settings.bot.USE_WEBHOOK:
+            logger.success(f"📡 Bot receiving updates via webhook at {settings.bot.WEBHOOK_PATH}")
+        else:
+            logger.success("📡 Bot polling in background")
         logger.success("🩺 Healthcheck: http://0.0.0.0:{}/health".format(os.getenv("PORT", 8080)))
         logger.success("=" * 60)
 
@@ -334,13 +505,32 @@ async def main() -> None:
     except Exception as e:
         logger.exception(f"🚨 FATAL ERROR: {e}")
     finally:
-        await shutdown()
+        # Waits for shutdown started by a signal instead of running it twice
+        await request_shutdown()
 
 
 # =========================
 # ENTRY POINT
 # =========================
+def install_uvloop() -> bool:
+    """
+    Use uvloop event loop if it is installed.
+
+    Returns:
+        True if uvloop was installed
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
 if __name__ == "__main__":
+    if install_uvloop():
+        logger.info("⚡ Using uvloop event loop")
     try:
         asyncio.run(main())
     except Exception as e:
@@ -0,0 +1,423 @@
+"""Two-tier cache: in-process LRU in front of Redis."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Iterable, TypeVar
+
+from loguru import logger
+from pydantic import BaseModel
+
+from bot.core.config import settings
+from bot.core.redis import CustomRedis
+from bot.core.tracing import span
+
+try:
+    import orjson
+
+    def _dumps(value: Any) -> str:
+        return orjson.dumps(value).decode()
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson is optional
+    import json
+
+    def _dumps(value: Any) -> str:
+        return json.dumps(value, separators=(",", ":"))
+
+    _loads = json.loads
+
+T = TypeVar("T")
+
+TAG_INDEX = "cache_tag:{tag}"
+INVALIDATION_CHANNEL = "cache_invalidate"
+# Pub/sub read timeout, an idle channel is not an error
+INVALIDATION_POLL_SECONDS = 10.0
+# Tags per invalidation pipeline and pub/sub message
+INVALIDATION_BATCH_SIZE = 500
+
+# Marker for "not in local cache" (None is a valid cached value)
+_MISS = object()
+
+
+class LocalCache:
+    """Bounded LRU cache with per-entry TTL."""
+
+    def __init__(self, max_size: int) -> None:
+        """
+        Create cache.
+
+        Args:
+            max_size: Maximum number of entries
+        """
+        self.max_size = max_size
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        """Get value or _MISS if absent or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISS
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return _MISS
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store value for ttl seconds, evicting least recently used entries."""
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        """Delete keys."""
+        for key in keys:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Delete all entries."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+
+class CacheStats:
+    """Cache hit/miss counters."""
+
+    def __init__(self) -> None:
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.coalesced = 0
+
+    def as_dict(self) -> dict[str, int]:
+        """Get statistics as dictionary."""
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+        }
+
+
+class TwoTierCache:
+    """
+    Read-through cache with local LRU and optional Redis tiers.
+
+    - Concurrent misses for the same key share one loader call.
+    - None results are cached for a short negative TTL.
+    - Keys are grouped by tags; invalidating a tag drops all its keys
+      in both tiers and, via Redis pub/sub, in other processes' local tier.
+    - Without Redis only the local tier is used.
+    """
+
+    def __init__(self, max_size: int, local_ttl: float, negative_ttl: float) -> None:
+        """
+        Create cache.
+
+        Args:
+            max_size: Local tier capacity
+            local_ttl: Maximum lifetime of local entries
+            negative_ttl: Lifetime of cached None results
+        """
+        self.local = LocalCache(max_size)
+        self.local_ttl = local_ttl
+        self.negative_ttl = negative_ttl
+        self.stats = CacheStats()
+        self._redis: CustomRedis | None = None
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._local_tags: dict[str, set[str]] = {}
+        self._listener: asyncio.Task | None = None
+        # Bumped on every invalidation to detect loads racing with writes
+        self._generation = 0
+        # Key or tag index -> generation of its last invalidation, kept while loads are in flight
+        self._invalidated: dict[str, int] = {}
+
+    async def setup(self, redis: CustomRedis | None) -> None:
+        """
+        Attach Redis tier and subscribe to invalidations from other processes.
+
+        Args:
+            redis: Redis client or None to use local tier only
+        """
+        self._redis = redis
+        if redis is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen_invalidations(redis))
+
+    async def close(self) -> None:
+        """Stop invalidation listener."""
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[T | None]],
+        ttl: float,
+        model: type[BaseModel] | None = None,
+        tags: Iterable[str] = (),
+    ) -> T | None:
+        """
+        Get value from cache or load it.
+
+        Args:
+            key: Cache key
+            loader: Coroutine function returning value (None if not found)
+            ttl: Redis TTL in seconds (local tier uses min(ttl, local_ttl))
+            model: Pydantic model to restore value from Redis
+            tags: Tags for group invalidation
+
+        Returns:
+            Cached or loaded value
+        """
+        value = self.local.get(key)
+        if value is not _MISS:
+            self.stats.local_hits += 1
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            with span("cache.fetch", key=key):
+                value = await self._fetch(key, loader, ttl, model, tuple(tags))
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Exception is re-raised here, waiters get it from the future
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+            if not self._inflight:
+                self._invalidated.clear()
+
+    async def invalidate(self, *keys: str) -> None:
+        """
+        Drop keys from both tiers.
+
+        Args:
+            keys: Cache keys
+        """
+        if not keys:
+            return
+
+        self._mark_invalidated(keys, ())
+
+        self.local.delete(*keys)
+        if self._redis is None:
+            return
+
+        try:
+            await self._redis.unlink(*keys)
+            await self._redis.publish(INVALIDATION_CHANNEL, _dumps({"keys": list(keys)}))
+        except Exception as e:
+            logger.warning(f"Failed to invalidate cache keys {keys}: {e}")
+
+    async def invalidate_tags(self, *tags: str) -> None:
+        """
+        Drop all keys marked with tags.
+
+        Redis keys are found through tag index sets, without SCAN. Tags are
+        processed in batches: one pipeline reads their index sets, another
+        unlinks the keys and publishes one invalidation message.
+
+        Args:
+            tags: Tags
+        """
+        if not tags:
+            return
+
+        self._mark_invalidated((), tags)
+        self._drop_local_tags(tags)
+
+        if self._redis is None:
+            return
+
+        for start in range(0, len(tags), INVALIDATION_BATCH_SIZE):
+            batch = tags[start : start + INVALIDATION_BATCH_SIZE]
+            index_keys = [CustomRedis.index_key(TAG_INDEX.format(tag=tag)) for tag in batch]
+            try:
+                async with self._redis.pipeline(transaction=False) as pipe:
+                    for index_key in index_keys:
+                        pipe.smembers(index_key)
+                    members = await pipe.execute()
+
+                async with self._redis.pipeline(transaction=False) as pipe:
+                    pipe.unlink(*index_keys, *set().union(*members))
+                    pipe.publish(INVALIDATION_CHANNEL, _dumps({"tags": list(batch)}))
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Failed to invalidate {len(batch)} cache tags: {e}")
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with counters and local tier size
+        """
+        return {"local_size": len(self.local), **self.stats.as_dict()}
+
+    async def _fetch(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float,
+        model: type[BaseModel] | None,
+        tags: tuple[str, ...],
+    ) -> Any:
+        if self._redis is not None:
+            try:
+                cached = await self._redis.get(key)
+            except Exception as e:
+                logger.warning(f"Failed to read cache key {key}: {e}")
+                cached = None
+
+            if cached is not None:
+                try:
+                    value = self._restore(_loads(cached), model)
+                except Exception as e:
+                    logger.warning(f"Dropping undecodable cache key {key}: {e}")
+                else:
+                    self.stats.redis_hits += 1
+                    self._set_local(key, value, ttl, tags)
+                    return value
+
+        self.stats.misses += 1
+        self.stats.loads += 1
+        generation = self._generation
+        value = await loader()
+
+        if self._invalidated_since(generation, key, tags):
+            # Data was changed while loading, result may be stale
+            return value
+
+        if value is None:
+            ttl = min(ttl, self.negative_ttl)
+
+        self._set_local(key, value, ttl, tags)
+        await self._set_redis(key, value, ttl, tags)
+        return value
+
+    def _mark_invalidated(self, keys: Iterable[str], tags: Iterable[str]) -> None:
+        self._generation += 1
+        # Nothing to protect without loads in flight
+        if not self._inflight:
+            return
+        for key in keys:
+            self._invalidated[key] = self._generation
+        for tag in tags:
+            self._invalidated[TAG_INDEX.format(tag=tag)] = self._generation
+
+    def _invalidated_since(self, generation: int, key: str, tags: tuple[str, ...]) -> bool:
+        names = (key, *(TAG_INDEX.format(tag=tag) for tag in tags))
+        return any(self._invalidated.get(name, 0) > generation for name in names)
+
+    def _drop_local_tags(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            self.local.delete(*self._local_tags.pop(tag, ()))
+
+    def _set_local(self, key: str, value: Any, ttl: float, tags: tuple[str, ...]) -> None:
+        self.local.set(key, value, min(ttl, self.local_ttl))
+        for tag in tags:
+            self._local_tags.setdefault(tag, set()).add(key)
+
+        if len(self._local_tags) > self.local.max_size:
+            # Forget tags whose keys were all evicted
+            self._local_tags = {
+                tag: keys for tag, keys in self._local_tags.items() if any(k in self.local for k in keys)
+            }
+
+    async def _set_redis(self, key: str, value: Any, ttl: float, tags: tuple[str, ...]) -> None:
+        if self._redis is None:
+            return
+
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.setex(key, max(1, int(ttl)), _dumps(self._dump(value)))
+                for tag in tags:
+                    tag_key = CustomRedis.index_key(TAG_INDEX.format(tag=tag))
+                    pipe.sadd(tag_key, key)
+                    # Tag set outlives its keys, stale members are harmless
+                    pipe.expire(tag_key, max(1, int(ttl)) * 2)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to cache key {key}: {e}")
+
+    @staticmethod
+    def _dump(value: Any) -> Any:
+        if isinstance(value, BaseModel):
+            return value.model_dump(mode="json")
+        if isinstance(value, list):
+            return [item.model_dump(mode="json") if isinstance(item, BaseModel) else item for item in value]
+        return value
+
+    @staticmethod
+    def _restore(data: Any, model: type[BaseModel] | None) -> Any:
+        if model is None or data is None:
+            return data
+        if isinstance(data, list):
+            return [model.model_validate(item) for item in data]
+        return model.model_validate(data)
+
+    async def _listen_invalidations(self, redis: CustomRedis) -> None:
+        while True:
+            pubsub = redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                while True:
+                    # Own timeout instead of the client's socket_timeout, which
+                    # would treat a quiet channel as a broken connection
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=INVALIDATION_POLL_SECONDS
+                    )
+                    if message is None:
+                        continue
+
+                    data = _loads(message["data"])
+                    keys, tags = data.get("keys", ()), data.get("tags", ())
+                    self._mark_invalidated(keys, tags)
+                    self.local.delete(*keys)
+                    self._drop_local_tags(tags)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error: {e}")
+                # Entries may have been missed, local tier can't be trusted
+                self.local.clear()
+                await asyncio.sleep(5)
+            finally:
+                await pubsub.aclose()
+
+
+# Shared cache for the whole process, Redis tier is attached on startup
+cache = TwoTierCache(
+    max_size=settings.cache.LOCAL_CACHE_SIZE,
+    local_ttl=settings.cache.LOCAL_CACHE_TTL,
+    negative_ttl=settings.cache.NEGATIVE_CACHE_TTL,
+)
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import os
+from typing import Literal
 
 from pydantic import Field, PostgresDsn, RedisDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -24,7 +25,8 @@ class BotSettings(EnvBaseSettings):
 
     BOT_TOKEN: str
     SUPPORT_URL: str | None = None
-    RATE_LIMIT: int | float = 0.5
+    RATE_LIMIT: int | float = 0.5  # seconds per update from one user, 0 disables throttling
+    RATE_LIMIT_BURST: int = 3  # updates allowed in quick succession
     DEBUG: bool = False
     USE_WEBHOOK: bool = False
     WEBHOOK_BASE_URL: str | None = None
@@ -32,6 +34,58 @@ class BotSettings(EnvBaseSettings):
     WEBHOOK_SECRET: str | None = None
     WEBHOOK_HOST: str = "0.0.0.0"
     WEBHOOK_PORT: int = int(os.getenv("PORT", "8080"))
+    # Disable when migrations run as a release command (python -m bot.database.migrations)
+    RUN_MIGRATIONS_ON_STARTUP: bool = True
+
+    # Bot API server, e.g. local one or benchmarks/fake_telegram.py (api.telegram.org by default)
+    TELEGRAM_API_URL: str | None = None
+
+    # Telegram API limits for outgoing messages
+    TELEGRAM_GLOBAL_RATE: float = 25  # messages per second (Telegram limit ~30)
+    TELEGRAM_CHAT_RATE: float = 1  # messages per second to one chat
+    OUTBOUND_WORKERS: int = 10  # concurrent outgoing API calls
+
+    # Broadcast settings
+    BROADCAST_BATCH_SIZE: int = 100  # users per checkpoint
+    BROADCAST_CONCURRENCY: int = 20  # messages in flight
+
+    # Admin export
+    EXPORT_BATCH_SIZE: int = 1000  # rows fetched from cursor at once
+
+    # Scheduler jobs
+    SCHEDULER_CONCURRENCY: int = 20  # users processed in parallel
+    SCHEDULER_LEADER_CHECK_SECONDS: int = 10  # leader lock attempts / pings interval
+    # "leader": cron jobs run in one replica, "sharded": every replica handles its share of users
+    SCHEDULER_MODE: Literal["leader", "sharded"] = "leader"
+    REPLICA_HEARTBEAT_SECONDS: int = 10  # sharded mode: registry heartbeat interval
+    REPLICA_TTL_SECONDS: int = 30  # sharded mode: replica is dead without heartbeat this long
+    DELAYED_JOBS_POLL_SECONDS: int = 15  # delayed jobs queue polling interval
+    DELAYED_JOBS_BATCH_SIZE: int = 100  # due jobs claimed per query
+    DELAYED_JOBS_LEASE_SECONDS: int = 600  # claimed job is retried if not finished by then
+
+    # Tracing
+    TRACING_ENABLED: bool = True
+    SLOW_UPDATE_SECONDS: float = 1.0  # updates slower than this are logged with span breakdown
+    TRACE_SAMPLE_RATE: float = 0.0  # share of updates within budget exported (slow ones always are)
+    TRACE_EXPORT_PATH: str | None = None  # OTLP/JSON lines file, e.g. for collector's otlpjsonfile receiver
+
+    # Query budget per update (handlers override it with flags={"query_budget": N})
+    QUERY_BUDGET_DEFAULT: int = 10
+    N_PLUS_ONE_THRESHOLD: int = 3  # same statement this many times in one update is reported
+    QUERY_BUDGET_STRICT: bool = False  # raise instead of logging (tests, benchmarks, development)
+
+    @property
+    def webhook_url(self) -> str:
+        """Get public webhook URL."""
+        base_url = self.WEBHOOK_BASE_URL
+        # Railway exposes public domain of the service
+        if not base_url and os.getenv("RAILWAY_PUBLIC_DOMAIN"):
+            base_url = f"https://{os.getenv('RAILWAY_PUBLIC_DOMAIN')}"
+
+        if not base_url:
+            raise ValueError("WEBHOOK_BASE_URL is required when USE_WEBHOOK is enabled")
+
+        return f"{base_url.rstrip('/')}/{self.WEBHOOK_PATH.lstrip('/')}"
 
 
 class DBSettings(EnvBaseSettings):
@@ -71,6 +125,14 @@ class CacheSettings(EnvBaseSettings):
     REDIS_PASS: str | None = None
     REDIS_DB: int = 0
 
+    USER_STATE_TTL: int = 300  # seconds
+    LOCAL_CACHE_SIZE: int = 10_000  # entries in in-process cache tier
+    LOCAL_CACHE_TTL: int = 30  # seconds, bounds staleness if invalidation is missed
+    NEGATIVE_CACHE_TTL: int = 30  # seconds to remember "not found" results
+    PROMOCODE_CACHE_TTL: int = 600  # seconds
+    ADMIN_STATS_TTL: int = 60  # seconds
+    PAYMENT_URL_TTL: int = 600  # seconds a signed payment link is reused
+
     @property
     def redis_url(self) -> str:
         """Get Redis URL."""
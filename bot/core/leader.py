@@ -0,0 +1,210 @@
+"""Leader election between replicas with Postgres advisory lock."""
+
+from __future__ import annotations
+
+import asyncio
+import zlib
+from typing import Awaitable, Callable
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from bot.core.config import settings
+
+LeaderCallback = Callable[[], Awaitable[None] | None]
+
+
+def lock_key(name: str) -> int:
+    """
+    Get advisory lock key for name.
+
+    Args:
+        name: Lock name
+
+    Returns:
+        Signed 32-bit key
+    """
+    return zlib.crc32(name.encode()) - 2**31
+
+
+class LeaderElection:
+    """
+    Lease held as a session-level Postgres advisory lock.
+
+    The lock lives on a dedicated connection (outside the pool). Postgres
+    releases it as soon as that connection is gone, so when the leader
+    dies another replica takes over on its next check. The leader pings
+    its connection every check interval and steps down if the ping
+    fails. TCP keepalives make the server notice a vanished peer within
+    seconds.
+
+    Databases without advisory locks (e.g. SQLite in development) always
+    elect the only process.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        interval: float,
+        on_elected: LeaderCallback | None = None,
+        on_demoted: LeaderCallback | None = None,
+    ) -> None:
+        """
+        Create election.
+
+        Args:
+            name: Lock name, replicas competing for the same role use the same name
+            interval: Seconds between lock attempts / leader pings
+            on_elected: Called when this process becomes leader
+            on_demoted: Called when this process loses leadership
+        """
+        self.name = name
+        self.key = lock_key(name)
+        self.interval = interval
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self._engine: AsyncEngine | None = None
+        self._connection: AsyncConnection | None = None
+        self._task: asyncio.Task | None = None
+        self._is_leader = False
+
+    @property
+    def is_leader(self) -> bool:
+        """Check if this process currently holds the lock."""
+        return self._is_leader
+
+    def start(self) -> None:
+        """Start competing for leadership in background task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop election and release lock so another replica takes over at once."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        await self._step_down(release=True)
+
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+
+    def get_stats(self) -> dict[str, object]:
+        """
+        Get election state.
+
+        Returns:
+            Dictionary with lock name and leadership flag
+        """
+        return {"name": self.name, "is_leader": self._is_leader}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if self._is_leader:
+                    await self._ping()
+                else:
+                    await self._try_acquire()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Leader election {self.name!r} error: {e}")
+
+            await asyncio.sleep(self.interval)
+
+    def _get_engine(self) -> AsyncEngine:
+        if self._engine is None:
+            connect_args = {}
+            if settings.db.database_url.startswith("postgresql+asyncpg"):
+                connect_args["server_settings"] = {
+                    "application_name": f"leader:{self.name}",
+                    # Server drops the lock quickly if this host disappears
+                    "tcp_keepalives_idle": "10",
+                    "tcp_keepalives_interval": "5",
+                    "tcp_keepalives_count": "3",
+                }
+            self._engine = create_async_engine(
+                settings.db.database_url,
+                poolclass=NullPool,
+                connect_args=connect_args,
+            )
+        return self._engine
+
+    async def _try_acquire(self) -> None:
+        engine = self._get_engine()
+        if engine.dialect.name != "postgresql":
+            await self._become_leader()
+            return
+
+        connection = await engine.connect()
+        try:
+            acquired = (
+                await connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key})
+            ).scalar_one()
+            # Session-level lock survives commit, connection mustn't stay idle in transaction
+            await connection.commit()
+        except BaseException:
+            await connection.close()
+            raise
+
+        if not acquired:
+            await connection.close()
+            return
+
+        self._connection = connection
+        await self._become_leader()
+
+    async def _ping(self) -> None:
+        if self._connection is None:
+            return
+
+        try:
+            await asyncio.wait_for(self._connection.execute(text("SELECT 1")), timeout=self.interval)
+            await self._connection.commit()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Lost leader lock {self.name!r}: {e}")
+            await self._step_down(release=False)
+
+    async def _become_leader(self) -> None:
+        self._is_leader = True
+        logger.success(f"👑 Elected leader for {self.name!r}")
+        await self._notify(self.on_elected)
+
+    async def _step_down(self, release: bool) -> None:
+        connection, self._connection = self._connection, None
+        was_leader, self._is_leader = self._is_leader, False
+
+        if connection is not None:
+            try:
+                if release:
+                    await connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+                    await connection.commit()
+            except Exception as e:
+                logger.warning(f"Failed to release leader lock {self.name!r}: {e}")
+            finally:
+                # Closing the session releases the lock in any case
+                await asyncio.gather(connection.close(), return_exceptions=True)
+
+        if was_leader:
+            logger.warning(f"Stepped down as leader for {self.name!r}")
+            await self._notify(self.on_demoted)
+
+    async def _notify(self, callback: LeaderCallback | None) -> None:
+        if callback is None:
+            return
+        try:
+            result = callback()
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logger.exception(f"Leader election {self.name!r} callback failed: {e}")
+
+
+# Cron jobs of bot/scheduler.py run only in the replica holding this lock
+scheduler_leader = LeaderElection("scheduler", interval=settings.bot.SCHEDULER_LEADER_CHECK_SECONDS)
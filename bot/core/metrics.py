@@ -0,0 +1,158 @@
+"""Prometheus metrics exposed at /metrics."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime
+
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_SUBMITTED, JobEvent
+from apscheduler.schedulers.base import BaseScheduler
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+
+# Sub-millisecond resolution for pool waits and loop lag
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# Batch jobs run from seconds to tens of minutes
+JOB_BUCKETS = (0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+
+UPDATE_HANDLER_SECONDS = Histogram(
+    "bot_update_handler_seconds",
+    "Time spent handling a Telegram update, including handler middlewares",
+    ["router", "handler"],
+)
+UPDATE_DB_QUERIES = Histogram(
+    "bot_update_db_queries",
+    "SQL statements executed while handling a Telegram update",
+    ["router", "handler"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+UPDATE_QUERY_BUDGET_VIOLATIONS = Counter(
+    "bot_update_query_budget_violations_total",
+    "Updates over their query budget or repeating a statement (N+1)",
+    ["router", "handler"],
+)
+UPDATE_HANDLER_ERRORS = Counter(
+    "bot_update_handler_errors_total",
+    "Telegram update handlers that raised",
+    ["router", "handler", "error"],
+)
+THROTTLED_UPDATES = Counter(
+    "bot_throttled_updates_total",
+    "Updates dropped by per-user throttling (answered once per flood, then dropped)",
+    ["handler", "result"],
+)
+
+TELEGRAM_API_SECONDS = Histogram(
+    "telegram_api_request_seconds",
+    "Telegram Bot API call latency",
+    ["method"],
+)
+TELEGRAM_API_ERRORS = Counter(
+    "telegram_api_errors_total",
+    "Failed Telegram Bot API calls",
+    ["method", "error"],
+)
+
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a free database connection",
+    buckets=FAST_BUCKETS,
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Time a database connection stays checked out of the pool",
+)
+DB_POOL_CONNECTIONS_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "Database connections checked out of the pool",
+)
+
+SCHEDULER_JOB_SECONDS = Histogram(
+    "scheduler_job_seconds",
+    "Scheduler job run time",
+    ["job", "status"],
+    buckets=JOB_BUCKETS,
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_seconds",
+    "Web server request latency (Prodamus and Telegram webhooks, health endpoints)",
+    ["route", "method", "status"],
+)
+
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds",
+    "Delay of a periodic event loop callback behind its schedule",
+    buckets=FAST_BUCKETS,
+)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    Render metrics in Prometheus text format.
+
+    Returns:
+        Body and content type
+    """
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def instrument_scheduler(scheduler: BaseScheduler) -> None:
+    """
+    Record run time of every job of scheduler.
+
+    Args:
+        scheduler: APScheduler instance
+    """
+    started: dict[tuple[str, datetime], float] = {}
+
+    def on_submitted(event: JobEvent) -> None:
+        now = time.perf_counter()
+        for run_time in event.scheduled_run_times:
+            started[(event.job_id, run_time)] = now
+
+    def on_finished(event: JobEvent) -> None:
+        started_at = started.pop((event.job_id, event.scheduled_run_time), None)
+        if started_at is None:
+            return
+        status = "error" if event.code == EVENT_JOB_ERROR else "ok"
+        SCHEDULER_JOB_SECONDS.labels(job=event.job_id, status=status).observe(time.perf_counter() - started_at)
+
+    scheduler.add_listener(on_submitted, EVENT_JOB_SUBMITTED)
+    scheduler.add_listener(on_finished, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+
+
+class LoopLagMonitor:
+    """Measures how late a sleeping task wakes up, i.e. how long the loop was blocked."""
+
+    def __init__(self, interval: float = 0.5) -> None:
+        """
+        Create monitor.
+
+        Args:
+            interval: Seconds between measurements
+        """
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start measuring in background task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop measuring."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            EVENT_LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - expected))
+
+
+loop_lag_monitor = LoopLagMonitor()
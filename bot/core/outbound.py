@@ -0,0 +1,352 @@
+"""Central dispatcher for outgoing Telegram messages."""
+
+from __future__ import annotations
+
+import asyncio
+import enum
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramNetworkError, TelegramRetryAfter, TelegramServerError
+from aiogram.methods import TelegramMethod
+from loguru import logger
+
+from bot.core.config import settings
+from bot.core.rate_limiter import TelegramRateLimiter, telegram_limiter
+from bot.core.tracing import span
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    if not future.cancelled():
+        future.exception()
+
+
+class OutboundStopped(RuntimeError):
+    """Dispatcher stopped before the call was sent."""
+
+
+class Priority(enum.IntEnum):
+    """Outbound lanes, lower value is sent first."""
+
+    PAYMENT = 0
+    NOTIFICATION = 1
+    REMINDER = 2
+    BROADCAST = 3
+
+
+@dataclass
+class _OutboundItem:
+    method: TelegramMethod[Any]
+    priority: Priority
+    chat_id: int | None
+    coalesce_key: str | None
+    future: asyncio.Future
+    submitted_at: float = field(default_factory=time.monotonic)
+    attempts: int = 0
+
+
+class LaneStats:
+    """Counters for one priority lane."""
+
+    def __init__(self) -> None:
+        self.submitted = 0
+        self.coalesced = 0
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.rate_limited = 0
+        self.queued = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record_done(self, latency: float, ok: bool) -> None:
+        """Record finished item."""
+        if ok:
+            self.sent += 1
+        else:
+            self.failed += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get statistics as dictionary."""
+        done = self.sent + self.failed
+        return {
+            "queued": self.queued,
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "rate_limited": self.rate_limited,
+            "avg_latency_ms": round(self.total_latency / done * 1000, 3) if done else 0.0,
+            "max_latency_ms": round(self.max_latency * 1000, 3),
+        }
+
+
+class OutboundDispatcher:
+    """
+    Priority queue of Telegram API calls served by a pool of workers.
+
+    All calls share one rate limiter. A worker waits for per-chat spacing
+    of its item, takes a global token and then switches to a more urgent
+    queued item if one is ready, so payment confirmations overtake
+    pending reminders and broadcasts.
+    On TelegramRetryAfter the limiter is paused and the call is requeued.
+    Items submitted with the same coalesce_key while still queued are
+    merged: the latest method replaces the queued one.
+    """
+
+    def __init__(self, limiter: TelegramRateLimiter, workers: int, max_attempts: int = 3) -> None:
+        """
+        Create dispatcher.
+
+        Args:
+            limiter: Shared Telegram rate limiter
+            workers: Number of concurrent API calls
+            max_attempts: Attempts for network and server errors
+        """
+        self.limiter = limiter
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self._queue: asyncio.PriorityQueue[tuple[int, int, _OutboundItem]] = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._pending: dict[str, _OutboundItem] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._bot: Bot | None = None
+        self.stats = {priority: LaneStats() for priority in Priority}
+
+    @property
+    def is_running(self) -> bool:
+        """Check if workers are started."""
+        return bool(self._tasks)
+
+    def start(self, bot: Bot) -> None:
+        """
+        Start worker tasks.
+
+        Args:
+            bot: Bot instance used for API calls
+        """
+        if self._tasks:
+            return
+
+        self._bot = bot
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Outbound dispatcher started with {self.workers} workers")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Send queued items (up to timeout) and stop workers.
+
+        Items left unsent fail with OutboundStopped.
+
+        Args:
+            timeout: Maximum time to wait for queue to drain
+        """
+        if not self._tasks:
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Outbound dispatcher stopped with {self._queue.qsize()} unsent items")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        # Callers awaiting send() would wait forever otherwise
+        while not self._queue.empty():
+            item = self._get_nowait()
+            self._queue.task_done()
+            self._finish(item, error=OutboundStopped("Outbound dispatcher stopped"))
+        self._pending.clear()
+        logger.info("Outbound dispatcher stopped")
+
+    def submit(
+        self,
+        method: TelegramMethod[Any],
+        priority: Priority = Priority.NOTIFICATION,
+        chat_id: int | None = None,
+        coalesce_key: str | None = None,
+    ) -> asyncio.Future:
+        """
+        Queue API call without waiting for it.
+
+        Args:
+            method: aiogram method, e.g. SendMessage(...)
+            priority: Lane
+            chat_id: Target chat for per-chat spacing
+            coalesce_key: Merge with queued item that has the same key
+
+        Returns:
+            Future with method result
+        """
+        stats = self.stats[priority]
+        stats.submitted += 1
+
+        if coalesce_key is not None:
+            queued = self._pending.get(coalesce_key)
+            if queued is not None:
+                queued.method = method
+                stats.coalesced += 1
+                return queued.future
+
+        future = asyncio.get_running_loop().create_future()
+        # Fire-and-forget callers never read the result
+        future.add_done_callback(_consume_exception)
+
+        item = _OutboundItem(
+            method=method,
+            priority=priority,
+            chat_id=chat_id,
+            coalesce_key=coalesce_key,
+            future=future,
+        )
+        if coalesce_key is not None:
+            self._pending[coalesce_key] = item
+
+        self._put(item)
+        return item.future
+
+    async def send(
+        self,
+        method: TelegramMethod[Any],
+        priority: Priority = Priority.NOTIFICATION,
+        chat_id: int | None = None,
+        coalesce_key: str | None = None,
+    ) -> Any:
+        """
+        Queue API call and wait for result.
+
+        Telegram errors (except flood control, which is retried) are raised
+        to the caller.
+
+        Args:
+            method: aiogram method, e.g. SendMessage(...)
+            priority: Lane
+            chat_id: Target chat for per-chat spacing
+            coalesce_key: Merge with queued item that has the same key
+
+        Returns:
+            Method result
+        """
+        # Queue wait is included: worker tasks don't belong to the caller's trace
+        with span(f"outbound.{method.__api_method__}", priority=priority.name):
+            # Cancelling one waiter must not drop the call for coalesced waiters
+            return await asyncio.shield(self.submit(method, priority, chat_id, coalesce_key))
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Get per-lane statistics.
+
+        Returns:
+            Dictionary with queue size and lane counters
+        """
+        return {
+            "queue_size": self._queue.qsize(),
+            "workers": len(self._tasks),
+            "lanes": {priority.name.lower(): stats.as_dict() for priority, stats in self.stats.items()},
+        }
+
+    def _put(self, item: _OutboundItem) -> None:
+        self.stats[item.priority].queued += 1
+        self._queue.put_nowait((item.priority, next(self._seq), item))
+
+    def _requeue(self, item: _OutboundItem) -> None:
+        if item.coalesce_key is not None:
+            self._pending.setdefault(item.coalesce_key, item)
+        self._put(item)
+
+    def _get_nowait(self) -> _OutboundItem:
+        _, _, item = self._queue.get_nowait()
+        self.stats[item.priority].queued -= 1
+        return item
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, item = await self._queue.get()
+            self.stats[item.priority].queued -= 1
+
+            try:
+                # Per-chat spacing first, so a global token isn't held while sleeping
+                while (delay := self._chat_delay(item)) > 0:
+                    await asyncio.sleep(delay)
+
+                await self.limiter.global_bucket.acquire()
+
+                # More urgent item could arrive while waiting for token
+                if not self._queue.empty():
+                    urgent = self._get_nowait()
+                    if urgent.priority < item.priority and not self._chat_delay(urgent):
+                        item, urgent = urgent, item
+                    self._put(urgent)
+                    self._queue.task_done()
+
+                await self._execute(item)
+            except asyncio.CancelledError:
+                self._finish(item, error=OutboundStopped("Outbound dispatcher stopped"))
+                raise
+            except Exception as e:
+                logger.exception(f"Outbound worker error: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _chat_delay(self, item: _OutboundItem) -> float:
+        return self.limiter.chat_delay(item.chat_id) if item.chat_id is not None else 0.0
+
+    async def _execute(self, item: _OutboundItem) -> None:
+        if item.future.cancelled():
+            return
+
+        if item.chat_id is not None:
+            await self.limiter.acquire_chat(item.chat_id)
+
+        # Item can't be coalesced any more once request is in flight
+        if item.coalesce_key is not None and self._pending.get(item.coalesce_key) is item:
+            del self._pending[item.coalesce_key]
+
+        stats = self.stats[item.priority]
+        item.attempts += 1
+
+        try:
+            result = await self._bot(item.method)
+        except TelegramRetryAfter as e:
+            stats.rate_limited += 1
+            stats.retried += 1
+            self.limiter.pause(e.retry_after)
+            self._requeue(item)
+            return
+        except (TelegramNetworkError, TelegramServerError) as e:
+            if item.attempts < self.max_attempts:
+                stats.retried += 1
+                self._requeue(item)
+                return
+            self._finish(item, error=e)
+            return
+        except Exception as e:
+            self._finish(item, error=e)
+            return
+
+        self._finish(item, result=result)
+
+    def _finish(self, item: _OutboundItem, result: Any = None, error: BaseException | None = None) -> None:
+        self.stats[item.priority].record_done(time.monotonic() - item.submitted_at, ok=error is None)
+
+        if item.future.done():
+            return
+
+        if error is not None:
+            logger.debug(f"Outbound {type(item.method).__name__} to {item.chat_id} failed: {error}")
+            item.future.set_exception(error)
+        else:
+            item.future.set_result(result)
+
+
+# Shared dispatcher for the whole process, started on application startup
+outbound = OutboundDispatcher(telegram_limiter, workers=settings.bot.OUTBOUND_WORKERS)
@@ -0,0 +1,149 @@
+"""Rate limiting for outgoing Telegram API calls."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from loguru import logger
+
+from bot.core.config import settings
+
+
+class TokenBucket:
+    """Asyncio token bucket."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        """
+        Create token bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size (defaults to rate)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stop issuing tokens for given time (e.g. after 429 retry_after).
+
+        Args:
+            seconds: Pause duration
+        """
+        now = time.monotonic()
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._tokens = 0.0
+        self._updated_at = max(self._updated_at, self._paused_until)
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """
+        Wait until tokens are available and take them.
+
+        Args:
+            tokens: Number of tokens to take
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+class TelegramRateLimiter:
+    """
+    Limiter for Telegram Bot API limits.
+
+    Combines global bucket (~30 messages per second for the whole bot)
+    with per-chat spacing (~1 message per second to the same chat).
+    """
+
+    _CHAT_CLEANUP_THRESHOLD = 10_000
+
+    def __init__(self, global_rate: float, chat_rate: float) -> None:
+        """
+        Create limiter.
+
+        Args:
+            global_rate: Messages per second across all chats
+            chat_rate: Messages per second to one chat
+        """
+        self.global_bucket = TokenBucket(global_rate)
+        self.chat_interval = 1.0 / chat_rate
+        self._chat_next_at: dict[int, float] = {}
+
+    async def acquire(self, chat_id: int | None = None) -> None:
+        """
+        Wait for permission to make one API call.
+
+        Args:
+            chat_id: Target chat ID (None for calls not bound to a chat)
+        """
+        if chat_id is not None:
+            await self.acquire_chat(chat_id)
+
+        await self.global_bucket.acquire()
+
+    def chat_delay(self, chat_id: int) -> float:
+        """
+        Get time until chat can be sent to, without reserving it.
+
+        Args:
+            chat_id: Target chat ID
+
+        Returns:
+            Seconds to wait (0 if chat is ready)
+        """
+        return max(0.0, self._chat_next_at.get(chat_id, 0.0) - time.monotonic())
+
+    async def acquire_chat(self, chat_id: int) -> None:
+        """
+        Wait only for per-chat spacing, without taking global token.
+
+        Args:
+            chat_id: Target chat ID
+        """
+        now = time.monotonic()
+        next_at = self._chat_next_at.get(chat_id, 0.0)
+        self._chat_next_at[chat_id] = max(now, next_at) + self.chat_interval
+        if next_at > now:
+            await asyncio.sleep(next_at - now)
+
+        if len(self._chat_next_at) > self._CHAT_CLEANUP_THRESHOLD:
+            self._cleanup(time.monotonic())
+
+    def pause(self, seconds: float) -> None:
+        """
+        Pause all calls after TelegramRetryAfter.
+
+        Args:
+            seconds: retry_after value from Telegram
+        """
+        logger.warning(f"Telegram flood control: pausing outgoing calls for {seconds}s")
+        self.global_bucket.pause(seconds)
+
+    def _cleanup(self, now: float) -> None:
+        self._chat_next_at = {chat_id: at for chat_id, at in self._chat_next_at.items() if at > now}
+
+
+# Shared limiter for the whole process
+telegram_limiter = TelegramRateLimiter(
+    global_rate=settings.bot.TELEGRAM_GLOBAL_RATE,
+    chat_rate=settings.bot.TELEGRAM_CHAT_RATE,
+)
@@ -1,29 +1,153 @@
 from __future__ import annotations
 
+import asyncio
+import inspect
 import json
-from typing import Any, Awaitable, Callable, Dict, Type, TypeVar, Union
+import re
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Type, TypeVar, Union
 
 from loguru import logger
 from pydantic import BaseModel
 from redis.asyncio import Redis
 
+from bot.core.tracing import span
+
 T = TypeVar("T", bound=BaseModel)
 
+KEY_INDEX = "key_index:{name}"
+
+
+def _escape_glob(pattern: str) -> str:
+    """Escape glob special characters for SCAN MATCH."""
+    return re.sub(r"([*?\[\]\\])", r"\\\1", pattern)
+
 
 class CustomRedis(Redis):
     """Extended Redis class with additional methods."""
 
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        """Execute command, recording it in the current trace."""
+        with span(f"redis.{args[0]}"):
+            return await super().execute_command(*args, **options)
+
     async def delete_key(self, key: str) -> None:
         """Delete key from Redis."""
         await self.delete(key)
         logger.info(f"Key {key} deleted")
 
-    async def delete_keys_by_prefix(self, prefix: str) -> None:
-        """Delete keys starting with prefix."""
-        keys = await self.keys(prefix + '*')
-        if keys:
-            await self.delete(*keys)
-            logger.info(f"Deleted keys starting with {prefix}")
+    async def delete_keys_by_prefix(
+        self,
+        prefix: str,
+        batch_size: int = 500,
+        max_keys_per_second: float | None = None,
+        on_progress: Callable[[int], Awaitable[None] | None] | None = None,
+    ) -> int:
+        """
+        Delete keys starting with prefix without blocking Redis.
+
+        Keys are found with incremental SCAN and removed with UNLINK in
+        batches, so other clients (e.g. FSM storage) are served in between.
+
+        Args:
+            prefix: Key prefix
+            batch_size: Keys per SCAN step and UNLINK call
+            max_keys_per_second: Throughput limit (None for unlimited)
+            on_progress: Called with total deleted count after every batch
+
+        Returns:
+            Number of deleted keys
+        """
+        keys = self.scan_iter(match=_escape_glob(prefix) + "*", count=batch_size)
+        deleted = await self._unlink_batches(keys, batch_size, max_keys_per_second, on_progress)
+        logger.info(f"Deleted {deleted} keys starting with {prefix}")
+        return deleted
+
+    @staticmethod
+    def index_key(name: str) -> str:
+        """Get Redis key of key index set."""
+        return KEY_INDEX.format(name=name)
+
+    async def add_to_index(self, name: str, *keys: str, ttl: int | None = None) -> None:
+        """
+        Register keys in index, so they can be deleted without SCAN.
+
+        Args:
+            name: Index name (e.g. key prefix or tag)
+            keys: Keys to register
+            ttl: Optional index TTL in seconds
+        """
+        if not keys:
+            return
+
+        index_key = self.index_key(name)
+        async with self.pipeline(transaction=False) as pipe:
+            pipe.sadd(index_key, *keys)
+            if ttl is not None:
+                pipe.expire(index_key, ttl)
+            await pipe.execute()
+
+    async def delete_index(
+        self,
+        name: str,
+        batch_size: int = 500,
+        max_keys_per_second: float | None = None,
+        on_progress: Callable[[int], Awaitable[None] | None] | None = None,
+    ) -> int:
+        """
+        Delete all keys registered in index and the index itself.
+
+        Args:
+            name: Index name
+            batch_size: Keys per SSCAN step and UNLINK call
+            max_keys_per_second: Throughput limit (None for unlimited)
+            on_progress: Called with total deleted count after every batch
+
+        Returns:
+            Number of deleted keys
+        """
+        index_key = self.index_key(name)
+        keys = self.sscan_iter(index_key, count=batch_size)
+        deleted = await self._unlink_batches(keys, batch_size, max_keys_per_second, on_progress)
+        await self.unlink(index_key)
+        return deleted
+
+    async def _unlink_batches(
+        self,
+        keys: AsyncIterator[str],
+        batch_size: int,
+        max_keys_per_second: float | None,
+        on_progress: Callable[[int], Awaitable[None] | None] | None,
+    ) -> int:
+        deleted = 0
+        batch: list[str] = []
+        started = time.monotonic()
+
+        async def flush() -> None:
+            nonlocal deleted
+            deleted += await self.unlink(*batch)
+            batch.clear()
+
+            if on_progress is not None:
+                result = on_progress(deleted)
+                if inspect.isawaitable(result):
+                    await result
+
+            if max_keys_per_second:
+                # Sleep until deleted count fits into the throughput limit
+                ahead = deleted / max_keys_per_second - (time.monotonic() - started)
+                if ahead > 0:
+                    await asyncio.sleep(ahead)
+
+        async for key in keys:
+            batch.append(key)
+            if len(batch) >= batch_size:
+                await flush()
+
+        if batch:
+            await flush()
+
+        return deleted
 
     async def delete_all_keys(self) -> None:
         """Delete all keys from current database."""
@@ -35,7 +159,7 @@ class CustomRedis(Redis):
         value = await self.get(key)
         if value:
             return value
-        logger.info(f"Key {key} not found")
+        logger.debug(f"Key {key} not found")
         return None
 
     async def set_value(self, key: str, value: str) -> None:
@@ -60,7 +184,7 @@ class CustomRedis(Redis):
         cached_data = await self.get(cache_key)
 
         if cached_data:
-            logger.info(f"Data retrieved from cache for key: {cache_key}")
+            logger.debug(f"Data retrieved from cache for key: {cache_key}")
             try:
                 # logger.info("Loading data from Redis")
                 data = json.loads(cached_data)
@@ -74,11 +198,11 @@ class CustomRedis(Redis):
                 logger.error(f"Error deserializing cached data: {e}")
                 await self.delete_key(cache_key)
 
-        logger.info(f"Data not found in cache for key: {cache_key}, fetching from source")
+        logger.debug(f"Data not found in cache for key: {cache_key}, fetching from source")
         try:
             data = await fetch_data_func(*args, **kwargs)
             if data is None:
-                logger.info("Data not found in source")
+                logger.debug("Data not found in source")
                 return None
 
             if isinstance(data, list):
@@ -89,7 +213,7 @@ class CustomRedis(Redis):
                 # models = [model(**item) for item in processed_data]
                 models = data # Assuming fetch_data_func returns models
                 await self.set_value_with_ttl(key=cache_key, ttl=ttl, value=json.dumps(processed_data))
-                logger.info(f"List data saved to cache for key: {cache_key} with TTL: {ttl}s")
+                logger.debug(f"List data saved to cache for key: {cache_key} with TTL: {ttl}s")
                 return models
 
             else:
@@ -97,7 +221,7 @@ class CustomRedis(Redis):
                 # model_instance = model(**processed_data)
                 model_instance = data # Assuming fetch_data_func returns model
                 await self.set_value_with_ttl(key=cache_key, ttl=ttl, value=json.dumps(processed_data))
-                logger.info(f"Data saved to cache for key: {cache_key} with TTL: {ttl}s")
+                logger.debug(f"Data saved to cache for key: {cache_key} with TTL: {ttl}s")
                 return model_instance
 
         except Exception as e:
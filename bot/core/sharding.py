@@ -0,0 +1,263 @@
+"""Work partitioning between replicas registered in Redis."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from loguru import logger
+from sqlalchemy import ColumnElement, true
+
+from bot.core.redis import CustomRedis
+
+REPLICAS_KEY = "scheduler_replicas"
+SHARD_RUN_KEY = "shard_run:{job}:{run_id}"
+SHARD_DONE = "done"
+
+# Shard claims are renewed and released only by the replica holding them
+RENEW_CLAIM_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_CLAIM_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass(frozen=True)
+class Shard:
+    """Part of user ID space handled by one replica: user_id % count == index."""
+
+    index: int = 0
+    count: int = 1
+
+    def owns(self, user_id: int) -> bool:
+        """Check if user belongs to this shard."""
+        return user_id % self.count == self.index
+
+    def filter(self, user_id_column: ColumnElement[int]) -> ColumnElement[bool]:
+        """
+        Build SQL condition selecting users of this shard.
+
+        Args:
+            user_id_column: Column with user ID
+
+        Returns:
+            WHERE clause
+        """
+        if self.count == 1:
+            return true()
+        return user_id_column % self.count == self.index
+
+
+# Whole user ID space, used when sharding is off
+ALL_USERS = Shard()
+
+
+def default_replica_id() -> str:
+    """Get unique ID of this process."""
+    replica = os.getenv("RAILWAY_REPLICA_ID") or socket.gethostname()
+    return f"{replica}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class ReplicaRegistry:
+    """
+    Live replicas tracked in a Redis sorted set scored by heartbeat time.
+
+    Every replica refreshes its heartbeat in the background. Members whose
+    heartbeat is older than ttl are considered dead and dropped. A replica's
+    shard is its position among live members sorted by ID, so shards are
+    rebalanced automatically when replicas join or leave.
+    """
+
+    def __init__(
+        self,
+        redis: CustomRedis,
+        heartbeat_interval: float,
+        ttl: float,
+        replica_id: str | None = None,
+    ) -> None:
+        """
+        Create registry.
+
+        Args:
+            redis: Redis client
+            heartbeat_interval: Seconds between heartbeats
+            ttl: Seconds without heartbeat after which replica is dead
+            replica_id: Unique ID of this process
+        """
+        self.redis = redis
+        self.heartbeat_interval = heartbeat_interval
+        self.ttl = ttl
+        self.replica_id = replica_id or default_replica_id()
+        self._task: asyncio.Task | None = None
+        self._renew_script = redis.register_script(RENEW_CLAIM_SCRIPT)
+        self._release_script = redis.register_script(RELEASE_CLAIM_SCRIPT)
+
+    async def start(self) -> None:
+        """Register replica and start heartbeats."""
+        try:
+            await self._heartbeat()
+        except Exception as e:
+            logger.warning(f"Replica {self.replica_id} heartbeat failed: {e}")
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        logger.info(f"Replica {self.replica_id} registered for sharded scheduling")
+
+    async def stop(self) -> None:
+        """Stop heartbeats and leave the registry, so others take over its shard."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        try:
+            await self.redis.zrem(REPLICAS_KEY, self.replica_id)
+        except Exception as e:
+            logger.warning(f"Failed to unregister replica {self.replica_id}: {e}")
+
+    async def get_replicas(self) -> list[str]:
+        """
+        Get live replicas.
+
+        Returns:
+            Sorted replica IDs
+        """
+        alive_since = time.time() - self.ttl
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(REPLICAS_KEY, "-inf", alive_since)
+            pipe.zrangebyscore(REPLICAS_KEY, alive_since, "+inf")
+            _, members = await pipe.execute()
+
+        replicas = {member.decode() if isinstance(member, bytes) else member for member in members}
+        # Count self even if the last heartbeat didn't reach Redis
+        replicas.add(self.replica_id)
+        return sorted(replicas)
+
+    async def get_shard(self) -> Shard:
+        """
+        Get shard of this replica.
+
+        Falls back to the whole user ID space if Redis is unavailable:
+        doing work twice is better than skipping it.
+
+        Returns:
+            Shard
+        """
+        try:
+            replicas = await self.get_replicas()
+        except Exception as e:
+            logger.warning(f"Replica registry unavailable, processing all users: {e}")
+            return ALL_USERS
+
+        return Shard(index=replicas.index(self.replica_id), count=len(replicas))
+
+    async def run_sharded(
+        self,
+        job: str,
+        run_id: str,
+        func: Callable[[Shard], Awaitable[None]],
+        lease: float = 300,
+        done_ttl: float = 2 * 86400,
+    ) -> int:
+        """
+        Run one occurrence of a job split into shards claimed through Redis.
+
+        The first replica to start the run fixes its shard count. Every
+        replica claims its own shard first, then any shard nobody has
+        finished, e.g. of a replica that died or started late. A shard is
+        claimed with a lease renewed while it runs and is marked done
+        afterwards; a failed shard is released for another attempt.
+
+        Without Redis the whole user ID space is processed.
+
+        Args:
+            job: Job name
+            run_id: Occurrence of the job, e.g. date of a daily run
+            func: Processes users of a shard, raises on failure
+            lease: Seconds a claim lives without renewal
+            done_ttl: Seconds finished shards are remembered
+
+        Returns:
+            Number of shards processed by this replica
+        """
+        key = SHARD_RUN_KEY.format(job=job, run_id=run_id)
+        try:
+            shard = await self.get_shard()
+            await self.redis.set(f"{key}:count", shard.count, nx=True, ex=int(done_ttl))
+            count = int(await self.redis.get(f"{key}:count"))
+        except Exception as e:
+            logger.warning(f"Shard claims unavailable, running {job} for all users: {e}")
+            await func(ALL_USERS)
+            return 1
+
+        processed = 0
+        for offset in range(count):
+            index = (shard.index + offset) % count
+            claim_key = f"{key}:{index}"
+            if not await self.redis.set(claim_key, self.replica_id, nx=True, ex=int(lease)):
+                continue
+
+            renewal = asyncio.create_task(self._renew_claim(claim_key, lease))
+            try:
+                await func(Shard(index=index, count=count))
+            except Exception as e:
+                logger.error(f"{job} failed for shard {index + 1}/{count}, releasing it: {e}")
+                await self._release_script(keys=[claim_key], args=[self.replica_id])
+                continue
+            finally:
+                renewal.cancel()
+                await asyncio.gather(renewal, return_exceptions=True)
+
+            await self.redis.set(claim_key, SHARD_DONE, ex=int(done_ttl))
+            processed += 1
+
+        return processed
+
+    async def get_stats(self) -> dict[str, object]:
+        """
+        Get registry state.
+
+        Returns:
+            Dictionary with replica ID and current shard
+        """
+        shard = await self.get_shard()
+        return {"replica_id": self.replica_id, "shard_index": shard.index, "shard_count": shard.count}
+
+    async def _renew_claim(self, claim_key: str, lease: float) -> None:
+        while True:
+            await asyncio.sleep(lease / 3)
+            try:
+                renewed = await self._renew_script(keys=[claim_key], args=[self.replica_id, int(lease)])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Failed to renew shard claim {claim_key}: {e}")
+                continue
+
+            if not renewed:
+                logger.warning(f"Shard claim {claim_key} expired and is no longer held by {self.replica_id}")
+                return
+
+    async def _heartbeat(self) -> None:
+        await self.redis.zadd(REPLICAS_KEY, {self.replica_id: time.time()})
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self._heartbeat()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Replica {self.replica_id} heartbeat failed: {e}")
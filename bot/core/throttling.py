@@ -0,0 +1,176 @@
+"""Per-user throttling of incoming updates."""
+
+from __future__ import annotations
+
+import enum
+import math
+import time
+
+from loguru import logger
+from redis.commands.core import AsyncScript
+
+from bot.core.config import settings
+from bot.core.redis import CustomRedis
+
+KEY = "throttle:{bucket}:{user_id}"
+
+# Token bucket: one token per `interval` seconds, up to `burst` tokens.
+# "notified" marks that the current flood was already answered, so a user
+# spamming a button gets one "too fast" reply instead of one per tap.
+# Time comes from Redis, so replicas with skewed clocks share buckets.
+TOKEN_BUCKET_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'notified')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) / interval)
+
+local result
+local notified = state[3] or '0'
+if tokens >= 1 then
+    tokens = tokens - 1
+    notified = '0'
+    result = 0
+elseif notified == '1' then
+    result = 2
+else
+    notified = '1'
+    result = 1
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now), 'notified', notified)
+redis.call('PEXPIRE', KEYS[1], math.ceil(interval * burst * 1000) + 1000)
+return result
+"""
+
+
+class ThrottleResult(enum.IntEnum):
+    """Decision for one update."""
+
+    ALLOWED = 0
+    # First rejected update of a flood, user should be told to slow down
+    THROTTLED = 1
+    # Rest of the flood, dropped silently
+    DROPPED = 2
+
+
+class LocalBuckets:
+    """In-process token buckets, same semantics as TOKEN_BUCKET_SCRIPT."""
+
+    # Seconds between sweeps of idle buckets
+    _CLEANUP_INTERVAL = 60.0
+
+    def __init__(self) -> None:
+        # key -> (tokens, updated_at, notified, idle_until)
+        self._buckets: dict[str, tuple[float, float, bool, float]] = {}
+        self._next_cleanup = time.monotonic() + self._CLEANUP_INTERVAL
+
+    def hit(self, key: str, interval: float, burst: int) -> ThrottleResult:
+        """
+        Take token from bucket.
+
+        Args:
+            key: Bucket key
+            interval: Seconds per token
+            burst: Bucket capacity
+
+        Returns:
+            Decision
+        """
+        now = time.monotonic()
+        if now >= self._next_cleanup:
+            self._cleanup(now)
+
+        tokens, updated_at, notified, _ = self._buckets.get(key, (burst, now, False, now))
+        tokens = min(burst, tokens + (now - updated_at) / interval)
+
+        if tokens >= 1:
+            tokens, notified, result = tokens - 1, False, ThrottleResult.ALLOWED
+        elif notified:
+            result = ThrottleResult.DROPPED
+        else:
+            notified, result = True, ThrottleResult.THROTTLED
+
+        # After a full refill the bucket is equal to a new one
+        self._buckets[key] = (tokens, now, notified, now + (burst - tokens) * interval)
+        return result
+
+    def _cleanup(self, now: float) -> None:
+        self._buckets = {key: state for key, state in self._buckets.items() if state[3] > now}
+        self._next_cleanup = now + self._CLEANUP_INTERVAL
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class Throttler:
+    """
+    Per-user token buckets shared by all replicas through Redis.
+
+    Falls back to in-process buckets without Redis or while it fails.
+    """
+
+    def __init__(self, interval: float, burst: int, redis_retry_interval: float = 5.0) -> None:
+        """
+        Create throttler.
+
+        Args:
+            interval: Default seconds per update (0 disables throttling)
+            burst: Updates allowed in quick succession
+            redis_retry_interval: Seconds to use local buckets after a Redis error
+        """
+        self.interval = interval
+        self.burst = burst
+        self.redis_retry_interval = redis_retry_interval
+        self.local = LocalBuckets()
+        self._script: AsyncScript | None = None
+        self._redis_failed_at = -math.inf
+
+    def setup(self, redis: CustomRedis | None) -> None:
+        """
+        Attach Redis.
+
+        Args:
+            redis: Redis client or None to use local buckets only
+        """
+        self._script = redis.register_script(TOKEN_BUCKET_SCRIPT) if redis is not None else None
+
+    async def hit(
+        self,
+        user_id: int,
+        bucket: str = "default",
+        interval: float | None = None,
+    ) -> ThrottleResult:
+        """
+        Count update of user.
+
+        Args:
+            user_id: Telegram user ID
+            bucket: Bucket name, handlers with own limit use separate buckets
+            interval: Seconds per update (default interval if None)
+
+        Returns:
+            Decision
+        """
+        interval = self.interval if interval is None else interval
+        # Zero default interval turns throttling off, handler limits included
+        if self.interval <= 0 or interval <= 0:
+            return ThrottleResult.ALLOWED
+
+        key = KEY.format(bucket=bucket, user_id=user_id)
+        now = time.monotonic()
+        if self._script is not None and now - self._redis_failed_at >= self.redis_retry_interval:
+            try:
+                return ThrottleResult(int(await self._script(keys=[key], args=[interval, self.burst])))
+            except Exception as e:
+                self._redis_failed_at = now
+                logger.warning(f"Throttling falls back to local buckets for {self.redis_retry_interval}s: {e}")
+
+        return self.local.hit(key, interval, self.burst)
+
+
+throttler = Throttler(interval=settings.bot.RATE_LIMIT, burst=settings.bot.RATE_LIMIT_BURST)
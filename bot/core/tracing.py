@@ -0,0 +1,341 @@
+"""Per-update tracing with slow-update log and OTLP/JSON file export."""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+
+from loguru import logger
+
+from bot.core.config import settings
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+# Loguru "extra" key marking records for the export sink
+EXPORT_RECORD_KEY = "trace_export"
+
+# Spans kept per trace, e.g. a handler looping over thousands of queries
+MAX_SPANS = 500
+
+SERVICE_NAME = "albot"
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class Trace:
+    """Spans recorded while handling one update."""
+
+    __slots__ = ("trace_id", "spans", "dropped", "finished")
+
+    def __init__(self) -> None:
+        self.trace_id = os.urandom(16).hex()
+        self.spans: list[Span] = []
+        self.dropped = 0
+        self.finished = False
+
+    @property
+    def root(self) -> Span:
+        """First span of trace."""
+        return self.spans[0]
+
+
+class Span:
+    """Timed operation inside a trace."""
+
+    __slots__ = ("trace", "name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: Trace, name: str, parent_id: str | None, attributes: dict[str, Any]) -> None:
+        self.trace = trace
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: str | None = None
+
+    @property
+    def duration(self) -> float:
+        """Span duration in seconds (up to now if not finished)."""
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set span attribute."""
+        self.attributes[key] = value
+
+    def finish(self, error: BaseException | None = None) -> None:
+        """End span."""
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = type(error).__name__
+
+
+def start_span(name: str, **attributes: Any) -> Span | None:
+    """
+    Start child of the current span without making it current.
+
+    Used for leaf operations timed by event hooks (SQL statements).
+
+    Args:
+        name: Span name
+        attributes: Span attributes
+
+    Returns:
+        Span or None if no trace is active
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return None
+
+    trace = parent.trace
+    if trace.finished:
+        # Background task outlived its update
+        return None
+    if len(trace.spans) >= MAX_SPANS:
+        trace.dropped += 1
+        return None
+
+    span_ = Span(trace, name, parent.span_id, attributes)
+    trace.spans.append(span_)
+    return span_
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """
+    Record nested operation of the current trace.
+
+    Does nothing outside of a trace.
+
+    Args:
+        name: Span name
+        attributes: Span attributes
+
+    Yields:
+        Span or None if no trace is active
+    """
+    span_ = start_span(name, **attributes)
+    if span_ is None:
+        yield None
+        return
+
+    token = _current_span.set(span_)
+    try:
+        yield span_
+    except BaseException as e:
+        span_.finish(e)
+        raise
+    else:
+        span_.finish()
+    finally:
+        _current_span.reset(token)
+
+
+def traced(name: str | None = None) -> Callable[[F], F]:
+    """
+    Record calls of async function as spans.
+
+    Args:
+        name: Span name (module.function by default)
+
+    Returns:
+        Decorator
+    """
+
+    def decorator(func: F) -> F:
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(span_name):
+                return await func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(span_: Span) -> dict[str, Any]:
+    data: dict[str, Any] = {
+        "traceId": span_.trace.trace_id,
+        "spanId": span_.span_id,
+        "name": span_.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(span_.start_ns),
+        "endTimeUnixNano": str(span_.end_ns or span_.start_ns),
+        "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span_.attributes.items()],
+    }
+    if span_.parent_id:
+        data["parentSpanId"] = span_.parent_id
+    if span_.error:
+        data["status"] = {"code": 2, "message": span_.error}  # STATUS_CODE_ERROR
+    return data
+
+
+def to_otlp_json(trace: Trace) -> str:
+    """
+    Serialize trace as one OTLP/JSON ExportTraceServiceRequest.
+
+    Args:
+        trace: Finished trace
+
+    Returns:
+        JSON line readable by OpenTelemetry Collector's otlpjsonfile receiver
+    """
+    request = {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": "bot"}, "spans": [_otlp_span(span_) for span_ in trace.spans]}],
+            }
+        ]
+    }
+    return json.dumps(request, separators=(",", ":"), ensure_ascii=False)
+
+
+def format_trace(trace: Trace) -> str:
+    """
+    Format trace as indented span tree with timings.
+
+    Args:
+        trace: Finished trace
+
+    Returns:
+        Multiline text
+    """
+    children: dict[str | None, list[Span]] = {}
+    for span_ in trace.spans:
+        children.setdefault(span_.parent_id, []).append(span_)
+
+    root = trace.root
+    lines: list[str] = []
+
+    def walk(span_: Span, depth: int) -> None:
+        offset = (span_.start_ns - root.start_ns) / 1e6
+        parts = [f"{'  ' * depth}+{offset:.1f}ms", f"{span_.duration * 1000:.1f}ms", span_.name]
+        parts += [f"{key}={value}" for key, value in span_.attributes.items()]
+        if span_.error:
+            parts.append(f"❌ {span_.error}")
+        lines.append(" ".join(parts))
+        for child in children.get(span_.span_id, ()):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    if trace.dropped:
+        lines.append(f"... {trace.dropped} spans dropped")
+    return "\n".join(lines)
+
+
+class Tracer:
+    """
+    Records a trace per update.
+
+    Updates slower than slow_threshold are always logged with their span
+    tree and exported. Other updates are exported with sample_rate
+    probability.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        slow_threshold: float,
+        sample_rate: float,
+        export_path: str | None = None,
+    ) -> None:
+        """
+        Create tracer.
+
+        Args:
+            enabled: Record traces at all
+            slow_threshold: Update duration budget in seconds
+            sample_rate: Share of updates within budget to export (0..1)
+            export_path: OTLP/JSON lines file, None to disable export
+        """
+        self.enabled = enabled
+        self.slow_threshold = slow_threshold
+        self.sample_rate = sample_rate
+        self.export_path = export_path
+        self._sink_id: int | None = None
+
+    def setup(self) -> None:
+        """Add export sink (writes in background thread)."""
+        if not self.enabled or not self.export_path or self._sink_id is not None:
+            return
+
+        self._sink_id = logger.add(
+            self.export_path,
+            format="{message}",
+            filter=lambda record: EXPORT_RECORD_KEY in record["extra"],
+            enqueue=True,
+            rotation="100 MB",
+            retention=3,
+        )
+        logger.info(f"Exporting traces to {self.export_path}")
+
+    @contextmanager
+    def trace(self, name: str, **attributes: Any) -> Iterator[Span | None]:
+        """
+        Record root span of a new trace.
+
+        Args:
+            name: Root span name
+            attributes: Root span attributes
+
+        Yields:
+            Root span or None if tracing is disabled
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        trace = Trace()
+        root = Span(trace, name, None, attributes)
+        trace.spans.append(root)
+        token = _current_span.set(root)
+        try:
+            yield root
+        except BaseException as e:
+            root.finish(e)
+            raise
+        else:
+            root.finish()
+        finally:
+            _current_span.reset(token)
+            trace.finished = True
+            self._finish(trace)
+
+    def _finish(self, trace: Trace) -> None:
+        duration = trace.root.duration
+        slow = duration >= self.slow_threshold
+        if slow:
+            logger.warning(
+                f"🐢 Slow {trace.root.name} {duration:.3f}s (budget {self.slow_threshold}s), "
+                f"trace {trace.trace_id}:\n{format_trace(trace)}"
+            )
+
+        if self._sink_id is not None and (slow or random.random() < self.sample_rate):
+            logger.bind(**{EXPORT_RECORD_KEY: True}).info(to_otlp_json(trace))
+
+
+tracer = Tracer(
+    enabled=settings.bot.TRACING_ENABLED,
+    slow_threshold=settings.bot.SLOW_UPDATE_SECONDS,
+    sample_rate=settings.bot.TRACE_SAMPLE_RATE,
+    export_path=settings.bot.TRACE_EXPORT_PATH,
+)
@@ -1,6 +1,6 @@
 """Database package."""
 
-from .database import engine, get_session, sessionmaker
+from .database import LazySession, engine, get_pool_stats, get_session, pool_stats, sessionmaker
 from .models import (
     AgreementModel,
     Base,
@@ -14,6 +14,9 @@ __all__ = [
     "engine",
     "sessionmaker",
     "get_session",
+    "LazySession",
+    "get_pool_stats",
+    "pool_stats",
     "Base",
     "UserModel",
     "SubscriptionModel",
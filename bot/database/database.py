@@ -2,20 +2,129 @@
 
 from __future__ import annotations
 
-from typing import AsyncGenerator
+import time
+from typing import Any, AsyncGenerator
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
 
 from bot.core.config import settings
+from bot.core.metrics import DB_POOL_CHECKOUT_SECONDS, DB_POOL_CONNECTIONS_IN_USE, DB_POOL_WAIT_SECONDS
+from bot.database.instrumentation import instrument_engine
+
+
+class PoolStats:
+    """Connection pool checkout statistics."""
+
+    def __init__(self) -> None:
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.total_hold_time = 0.0
+        self.max_hold_time = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        """Record time spent waiting for a free connection."""
+        self.total_wait_time += seconds
+        self.max_wait_time = max(self.max_wait_time, seconds)
+        DB_POOL_WAIT_SECONDS.observe(seconds)
+
+    def record_checkout(self) -> None:
+        """Record connection checkout."""
+        self.checkouts += 1
+        self.in_use += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def record_checkin(self, hold_time: float | None) -> None:
+        """Record connection checkin."""
+        self.checkins += 1
+        self.in_use = max(0, self.in_use - 1)
+        if hold_time is not None:
+            self.total_hold_time += hold_time
+            self.max_hold_time = max(self.max_hold_time, hold_time)
+            DB_POOL_CHECKOUT_SECONDS.observe(hold_time)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get statistics as dictionary."""
+        return {
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "avg_wait_ms": round(self.total_wait_time / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait_time * 1000, 3),
+            "avg_hold_ms": round(self.total_hold_time / self.checkins * 1000, 3) if self.checkins else 0.0,
+            "max_hold_ms": round(self.max_hold_time * 1000, 3),
+        }
+
+
+pool_stats = PoolStats()
+DB_POOL_CONNECTIONS_IN_USE.set_function(lambda: pool_stats.in_use)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that measures time spent waiting for a connection."""
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_stats.record_wait(time.perf_counter() - started)
+
 
 # Create async engine
 engine: AsyncEngine = create_async_engine(
     settings.db.database_url,
     echo=settings.bot.DEBUG,
+    poolclass=InstrumentedQueuePool,
     pool_size=10,
     max_overflow=20,
 )
 
+instrument_engine(engine.sync_engine)
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _on_connect(dbapi_connection: Any, connection_record: ConnectionPoolEntry) -> None:
+    pool_stats.connects += 1
+
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _on_checkout(dbapi_connection: Any, connection_record: ConnectionPoolEntry, connection_proxy: Any) -> None:
+    connection_record.info["checkout_at"] = time.perf_counter()
+    pool_stats.record_checkout()
+
+
+@event.listens_for(engine.sync_engine, "checkin")
+def _on_checkin(dbapi_connection: Any, connection_record: ConnectionPoolEntry) -> None:
+    checkout_at = connection_record.info.pop("checkout_at", None)
+    pool_stats.record_checkin(time.perf_counter() - checkout_at if checkout_at is not None else None)
+
+
+def get_pool_stats() -> dict[str, Any]:
+    """
+    Get connection pool statistics.
+
+    Returns:
+        Dictionary with pool state and checkout counters
+    """
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        **pool_stats.as_dict(),
+    }
+
+
 # Create session factory
 sessionmaker: async_sessionmaker[AsyncSession] = async_sessionmaker(
     engine,
@@ -24,6 +133,42 @@ sessionmaker: async_sessionmaker[AsyncSession] = async_sessionmaker(
 )
 
 
+class LazySession:
+    """
+    AsyncSession proxy that opens the real session on first use.
+
+    Updates that never touch the database do not create a session at all.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] = sessionmaker) -> None:
+        self._session_factory = session_factory
+        self._session: AsyncSession | None = None
+
+    @property
+    def is_materialized(self) -> bool:
+        """Check if real session was created."""
+        return self._session is not None
+
+    def _get_session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._session_factory()
+        return self._session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get_session(), name)
+
+    async def release(self) -> None:
+        """Return connection to pool, session stays usable for next queries."""
+        if self._session is not None:
+            await self._session.close()
+
+    async def aclose(self) -> None:
+        """Close real session if it was created."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """Get database session."""
     async with sessionmaker() as session:
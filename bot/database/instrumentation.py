@@ -0,0 +1,177 @@
+"""SQLAlchemy engine hooks: statements in the current trace and per-update query counts."""
+
+from __future__ import annotations
+
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+from bot.core.tracing import start_span
+
+# Statement text kept in span attributes
+MAX_STATEMENT_LENGTH = 300
+
+_SPANS_KEY = "trace_spans"
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Code ran more queries than allowed or repeated a statement (N+1)."""
+
+
+class QueryStats:
+    """Statements executed inside a count_queries() block."""
+
+    def __init__(self, parent: QueryStats | None = None) -> None:
+        self.parent = parent
+        self.statements: Counter[str] = Counter()
+
+    @property
+    def total(self) -> int:
+        """Number of executed statements."""
+        return sum(self.statements.values())
+
+    def record(self, statement: str) -> None:
+        """Count statement here and in all enclosing blocks."""
+        stats: QueryStats | None = self
+        while stats is not None:
+            stats.statements[statement] += 1
+            stats = stats.parent
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        """
+        Get statements executed at least threshold times (N+1 suspects).
+
+        Statements are compared with bound parameters left out, so the same
+        query for different IDs counts as a repetition.
+
+        Args:
+            threshold: Minimal number of executions
+
+        Returns:
+            Dictionary of statement -> executions
+        """
+        return {statement: count for statement, count in self.statements.items() if count >= threshold}
+
+    def check(self, budget: int | None, n_plus_one_threshold: int | None) -> list[str]:
+        """
+        Get budget violations.
+
+        Args:
+            budget: Maximal number of statements (None for unlimited)
+            n_plus_one_threshold: Executions of one statement reported as N+1 (None to skip)
+
+        Returns:
+            Violation descriptions, empty if within budget
+        """
+        problems = []
+        if budget is not None and self.total > budget:
+            problems.append(f"{self.total} queries, budget {budget}")
+        if n_plus_one_threshold is not None:
+            for statement, count in self.repeated(n_plus_one_threshold).items():
+                problems.append(f"N+1: {count}x {' '.join(statement.split())[:MAX_STATEMENT_LENGTH]}")
+        return problems
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """
+    Count statements executed in block (including concurrent tasks started in it).
+
+    Yields:
+        QueryStats filled as statements run
+    """
+    stats = QueryStats(parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(budget: int, n_plus_one_threshold: int | None = 2) -> Iterator[QueryStats]:
+    """
+    Fail if block runs more than budget statements or repeats a statement.
+
+    For tests and benchmarks, e.g.::
+
+        with assert_max_queries(3):
+            await dp.feed_update(bot, update)
+
+    Args:
+        budget: Maximal number of statements
+        n_plus_one_threshold: Executions of one statement treated as N+1 (None to allow)
+
+    Yields:
+        QueryStats
+
+    Raises:
+        QueryBudgetExceeded: Budget exceeded or N+1 detected
+    """
+    with count_queries() as stats:
+        yield stats
+
+    problems = stats.check(budget, n_plus_one_threshold)
+    if problems:
+        raise QueryBudgetExceeded("; ".join(problems))
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement)
+
+    words = statement[: MAX_STATEMENT_LENGTH * 2].split()
+    span = start_span(f"sql.{words[0].upper() if words else 'EMPTY'}")
+    if span is not None:
+        span.set_attribute("statement", " ".join(words)[:MAX_STATEMENT_LENGTH])
+    conn.info.setdefault(_SPANS_KEY, []).append(span)
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    spans = conn.info.get(_SPANS_KEY)
+    span = spans.pop() if spans else None
+    if span is not None:
+        span.set_attribute("rows", cursor.rowcount)
+        span.finish()
+
+
+def _handle_error(exception_context: Any) -> None:
+    connection = exception_context.connection
+    spans = connection.info.get(_SPANS_KEY) if connection is not None else None
+    span = spans.pop() if spans else None
+    if span is not None:
+        span.finish(exception_context.original_exception)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Record SQL statements as spans of the current trace and in query counters.
+
+    Args:
+        engine: Sync engine (AsyncEngine.sync_engine)
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,93 @@
+"""Database migrations run on startup or as a release command."""
+
+from __future__ import annotations
+
+import asyncio
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from bot.core.leader import lock_key
+from bot.database.database import engine
+
+ALEMBIC_CONFIG = "alembic.ini"
+
+# Replicas booting together wait for the one applying migrations
+MIGRATIONS_LOCK_KEY = lock_key("migrations")
+
+
+def _get_head_revisions() -> set[str]:
+    # Alembic is imported only when migrations are checked, not on every import of bot
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory.from_config(Config(ALEMBIC_CONFIG)).get_heads())
+
+
+def _upgrade() -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    command.upgrade(Config(ALEMBIC_CONFIG), "head")
+
+
+async def _get_current_revisions(connection: AsyncConnection) -> set[str]:
+    from alembic.runtime.migration import MigrationContext
+
+    revisions = await connection.run_sync(
+        lambda sync_connection: MigrationContext.configure(sync_connection).get_current_heads()
+    )
+    await connection.commit()
+    return set(revisions)
+
+
+async def run_migrations() -> bool:
+    """
+    Upgrade database to head if it is behind.
+
+    Applied revisions are compared to the head first, so a boot with an
+    up-to-date schema costs one query. Otherwise the upgrade runs under a
+    Postgres advisory lock: concurrently starting replicas wait for it and
+    find nothing left to do.
+
+    Returns:
+        True if migrations were applied
+    """
+    heads = await asyncio.to_thread(_get_head_revisions)
+
+    async with engine.connect() as connection:
+        if await _get_current_revisions(connection) == heads:
+            logger.info("Database schema is up to date")
+            return False
+
+        locked = connection.dialect.name == "postgresql"
+        if locked:
+            await connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATIONS_LOCK_KEY})
+            await connection.commit()
+
+        try:
+            # Another replica may have applied them while we waited for the lock
+            if await _get_current_revisions(connection) == heads:
+                logger.info("Database schema was upgraded by another replica")
+                return False
+
+            logger.info(f"Upgrading database schema to {', '.join(sorted(heads))}")
+            # env.py runs its own event loop, so upgrade runs in a thread
+            await asyncio.to_thread(_upgrade)
+            return True
+        finally:
+            if locked:
+                await connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATIONS_LOCK_KEY})
+                await connection.commit()
+
+
+async def _main() -> None:
+    try:
+        await run_migrations()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -2,6 +2,8 @@
 
 from .agreement import AgreementModel
 from .base import Base
+from .broadcast import BroadcastJobModel
+from .delayed_job import DelayedJobModel
 from .lesson_progress import LessonProgressModel
 from .payment import PaymentModel
 from .promocode import PromocodeModel, PromocodeUsageModel
@@ -21,4 +23,6 @@ __all__ = [
     "PromocodeUsageModel",
     "ReferralModel",
     "VideoReviewModel",
+    "BroadcastJobModel",
+    "DelayedJobModel",
 ]
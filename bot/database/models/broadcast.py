@@ -0,0 +1,44 @@
+"""Broadcast model."""
+
+from __future__ import annotations
+
+import datetime
+
+from sqlalchemy import BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base, created_at
+
+
+class BroadcastJobModel(Base):
+    """Broadcast job model."""
+
+    __tablename__ = "broadcast_jobs"
+    __table_args__ = {"comment": "Admin broadcast jobs with progress checkpoint"}
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    created_by: Mapped[int] = mapped_column(BigInteger)
+
+    # Source message to copy to every user
+    from_chat_id: Mapped[int] = mapped_column(BigInteger)
+    message_id: Mapped[int]
+
+    # Admin message with progress report
+    progress_message_id: Mapped[int | None]
+
+    status: Mapped[str] = mapped_column(String(20), default="running", index=True)  # running, completed, cancelled
+    total: Mapped[int] = mapped_column(default=0)
+    sent: Mapped[int] = mapped_column(default=0)
+    failed: Mapped[int] = mapped_column(default=0)
+    blocked: Mapped[int] = mapped_column(default=0)
+
+    # Checkpoint: users are processed in ascending ID order
+    last_user_id: Mapped[int] = mapped_column(BigInteger, default=0)
+    heartbeat_at: Mapped[datetime.datetime | None]
+    # Process running the job, checkpoints of other processes are ignored
+    owner: Mapped[str | None] = mapped_column(String(255))
+
+    created_at: Mapped[created_at]
+    finished_at: Mapped[datetime.datetime | None]
+
+    repr_cols = ("id", "status", "sent", "total")
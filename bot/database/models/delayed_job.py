@@ -0,0 +1,35 @@
+"""Delayed job model."""
+
+from __future__ import annotations
+
+import datetime
+from typing import Any
+
+from sqlalchemy import JSON, BigInteger, ForeignKey, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base, created_at
+
+
+class DelayedJobModel(Base):
+    """Persistent delayed job (e.g. reminder) executed by scheduler worker."""
+
+    __tablename__ = "delayed_jobs"
+    __table_args__ = (
+        UniqueConstraint("kind", "dedup_key", name="uq_delayed_jobs_kind_dedup_key"),
+        {"comment": "Delayed jobs queue"},
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String(50))
+    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"))
+    # Pending job with the same kind and key is replaced (user ID, order ID...)
+    dedup_key: Mapped[str] = mapped_column(String(255))
+    run_at: Mapped[datetime.datetime] = mapped_column(index=True)
+    payload: Mapped[dict[str, Any] | None] = mapped_column(JSON, default=None)
+    attempts: Mapped[int] = mapped_column(default=0)
+    # Set when claimed; job is retried by another worker once the lease expires
+    locked_until: Mapped[datetime.datetime | None]
+    created_at: Mapped[created_at]
+
+    repr_cols = ("id", "kind", "user_id", "run_at")
@@ -26,6 +26,8 @@ class LessonProgressModel(Base):
     watched_free_lesson: Mapped[bool] = mapped_column(default=False)
     free_lesson_watched_at: Mapped[datetime.datetime | None]
     reminder_sent: Mapped[bool] = mapped_column(default=False)
+    # Set while a scheduler run sends the reminder; stale claims are taken again
+    reminder_claimed_at: Mapped[datetime.datetime | None]
 
     created_at: Mapped[created_at]
 
@@ -26,6 +26,7 @@ class PaymentModel(Base):
     subscription_days: Mapped[int]
     payment_provider: Mapped[str] = mapped_column(String(50), default="prodamus")
     payment_id: Mapped[str | None] = mapped_column(String(255))
+    order_id: Mapped[str | None] = mapped_column(String(255), unique=True)  # Deduplicates provider webhooks
     status: Mapped[str] = mapped_column(String(20), default="pending")
     created_at: Mapped[created_at]
 
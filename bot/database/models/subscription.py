@@ -5,7 +5,7 @@ from __future__ import annotations
 import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import BigInteger, ForeignKey
+from sqlalchemy import BigInteger, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base, created_at
@@ -18,12 +18,17 @@ class SubscriptionModel(Base):
     """User subscription model."""
 
     __tablename__ = "subscriptions"
-    __table_args__ = {"comment": "User subscriptions"}
+    __table_args__ = (
+        # Keyset pagination of subscriber list
+        Index("ix_subscriptions_expires_at_user_id", "expires_at", "user_id"),
+        {"comment": "User subscriptions"},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id", ondelete="CASCADE"), unique=True)
     expires_at: Mapped[datetime.datetime]
     is_active: Mapped[bool] = mapped_column(default=True)
+    kicked_at: Mapped[datetime.datetime | None]  # Removed from channel after expiry
     created_at: Mapped[created_at]
 
     # Relationships
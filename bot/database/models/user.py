@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from sqlalchemy import String
+from sqlalchemy import Index, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import TYPE_CHECKING
 
@@ -33,6 +33,11 @@ class UserModel(Base):
 
     is_admin: Mapped[bool] = mapped_column(default=False)
     is_premium: Mapped[bool] = mapped_column(default=False)
+    is_blocked: Mapped[bool] = mapped_column(default=False)  # User blocked the bot
+
+    # Denormalized referral counters, updated with referral rows
+    referrals_count: Mapped[int] = mapped_column(default=0, server_default="0", index=True)
+    paid_referrals_count: Mapped[int] = mapped_column(default=0, server_default="0")
 
     # Relationships
     subscription: Mapped[SubscriptionModel | None] = relationship(
@@ -52,3 +57,16 @@ class UserModel(Base):
     video_reviews: Mapped[list[VideoReviewModel]] = relationship("VideoReviewModel", back_populates="user")
 
     repr_cols = ("id", "first_name", "username")
+
+
+# Case-insensitive prefix search in admin subscriber list (LIKE 'abc%')
+Index(
+    "ix_users_username_prefix",
+    func.lower(UserModel.username).label("username_lower"),
+    postgresql_ops={"username_lower": "text_pattern_ops"},
+)
+Index(
+    "ix_users_first_name_prefix",
+    func.lower(UserModel.first_name).label("first_name_lower"),
+    postgresql_ops={"first_name_lower": "text_pattern_ops"},
+)
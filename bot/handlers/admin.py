@@ -2,22 +2,61 @@
 
 from __future__ import annotations
 
+import asyncio
+import datetime
+import os
+
 from aiogram import F, Router
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command
-from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import CallbackQuery, FSInputFile, InlineKeyboardButton, InlineKeyboardMarkup, Message
 from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.core.config import settings
+from bot.core.redis import CustomRedis
+from bot.services import (
+    SUBSCRIBER_FILTERS,
+    broadcast_progress_keyboard,
+    cancel_broadcast_job,
+    create_broadcast_job,
+    export_subscribers,
+    format_admin_stats,
+    format_broadcast_progress,
+    format_referral_leaderboard,
+    format_subscribers_page,
+    get_admin_stats,
+    get_referral_leaderboard,
+    get_subscribers_page,
+    start_broadcast_job,
+)
 
 router = Router(name="admin")
 
+# One export at a time, the file is built on local disk
+_export_lock = asyncio.Lock()
+
+
+class BroadcastStates(StatesGroup):
+    """Broadcast flow states."""
+
+    waiting_for_message = State()
+
+
+class SubscriberStates(StatesGroup):
+    """Subscriber list search states."""
+
+    waiting_for_search = State()
+
 
 def is_admin(user_id: int) -> bool:
     """Check if user is admin."""
     return user_id in settings.payment.ADMIN_IDS
 
 
-@router.message(Command("admin"))
+@router.message(Command("admin"), flags={"no_db": True})
 async def admin_panel(message: Message) -> None:
     """Show admin panel."""
     if not message.from_user or message.from_user.id not in settings.payment.ADMIN_IDS:
@@ -27,6 +66,7 @@ async def admin_panel(message: Message) -> None:
         inline_keyboard=[
             [InlineKeyboardButton(text="📊 Статистика", callback_data="admin:stats")],
             [InlineKeyboardButton(text="👥 Список подписчиков", callback_data="admin:users")],
+            [InlineKeyboardButton(text="🏆 Топ рефереров", callback_data="admin:referrals")],
             [InlineKeyboardButton(text="📤 Рассылка", callback_data="admin:broadcast")],
             [InlineKeyboardButton(text="📋 Выгрузить в Excel", callback_data="admin:export")],
             [InlineKeyboardButton(text="ℹ️ Как получить ID файла", callback_data="admin:fileid_info")],
@@ -39,7 +79,7 @@ async def admin_panel(message: Message) -> None:
     )
 
 
-@router.message(Command("getfileid"))
+@router.message(Command("getfileid"), flags={"no_db": True})
 async def get_file_id(message: Message) -> None:
     """Get file ID from reply."""
     if not message.from_user:
@@ -68,3 +108,413 @@ async def get_file_id(message: Message) -> None:
             await message.answer("В этом сообщении нет поддерживаемых медиафайлов.")
     else:
         await message.answer("Ответь на сообщение с файлом")
+
+
+@router.callback_query(F.data == "admin:stats")
+async def stats_handler(callback: CallbackQuery, session: AsyncSession) -> None:
+    """
+    Show bot statistics.
+
+    Args:
+        callback: Callback query
+        session: Database session
+    """
+    if not is_admin(callback.from_user.id):
+        await callback.answer()
+        return
+
+    stats = await get_admin_stats(session)
+
+    refresh_keyboard = InlineKeyboardMarkup(
+        inline_keyboard=[[InlineKeyboardButton(text="🔄 Обновить", callback_data="admin:stats")]]
+    )
+    try:
+        await callback.message.edit_text(format_admin_stats(stats), reply_markup=refresh_keyboard)
+    except TelegramBadRequest:
+        # Stats didn't change since last press
+        pass
+
+    await callback.answer()
+
+
+@router.callback_query(F.data == "admin:referrals")
+async def referrals_handler(
+    callback: CallbackQuery,
+    session: AsyncSession,
+    redis: CustomRedis | None = None,
+) -> None:
+    """
+    Show referral leaderboard.
+
+    Args:
+        callback: Callback query
+        session: Database session
+        redis: Redis client (injected when available)
+    """
+    if not is_admin(callback.from_user.id):
+        await callback.answer()
+        return
+
+    entries = await get_referral_leaderboard(session, redis=redis)
+
+    refresh_keyboard = InlineKeyboardMarkup(
+        inline_keyboard=[[InlineKeyboardButton(text="🔄 Обновить", callback_data="admin:referrals")]]
+    )
+    try:
+        await callback.message.edit_text(format_referral_leaderboard(entries), reply_markup=refresh_keyboard)
+    except TelegramBadRequest:
+        # Leaderboard didn't change since last press
+        pass
+
+    await callback.answer()
+
+
+async def _render_subscribers(session: AsyncSession, state: FSMContext) -> tuple[str, InlineKeyboardMarkup]:
+    # Browser state: filter, search query and stack of page start cursors
+    data = await state.get_data()
+    status = data.get("users_status", "all")
+    search = data.get("users_search")
+    cursors = data.get("users_cursors") or [None]
+
+    page = await get_subscribers_page(session, status=status, search=search, cursor=cursors[-1])
+    await state.update_data(users_next_cursor=page.next_cursor)
+
+    filter_buttons = [
+        InlineKeyboardButton(
+            text=f"• {title}" if key == status else title,
+            callback_data=f"admin:users_filter:{key}",
+        )
+        for key, title in SUBSCRIBER_FILTERS.items()
+    ]
+    nav_buttons = []
+    if len(cursors) > 1:
+        nav_buttons.append(InlineKeyboardButton(text="« Назад", callback_data="admin:users_prev"))
+    if page.next_cursor:
+        nav_buttons.append(InlineKeyboardButton(text="Далее »", callback_data="admin:users_next"))
+    search_button = (
+        InlineKeyboardButton(text="✖️ Сбросить поиск", callback_data="admin:users_search_reset")
+        if search
+        else InlineKeyboardButton(text="🔍 Поиск", callback_data="admin:users_search")
+    )
+
+    keyboard = InlineKeyboardMarkup(
+        inline_keyboard=[row for row in (filter_buttons, nav_buttons, [search_button]) if row]
+    )
+    return format_subscribers_page(page, status, search, page_number=len(cursors)), keyboard
+
+
+async def _show_subscribers(callback: CallbackQuery, session: AsyncSession, state: FSMContext) -> None:
+    text, keyboard = await _render_subscribers(session, state)
+    try:
+        await callback.message.edit_text(text, reply_markup=keyboard)
+    except TelegramBadRequest:
+        # Page didn't change
+        pass
+    await callback.answer()
+
+
+@router.callback_query(F.data == "admin:users")
+async def users_handler(callback: CallbackQuery, session: AsyncSession, state: FSMContext) -> None:
+    """
+    Show first page of subscriber list.
+
+    Args:
+        callback: Callback query
+        session: Database session
+        state: FSM context
+    """
+    if not is_admin(callback.from_user.id):
+        await callback.answer()
+        return
+
+    await state.update_data(users_status="all", users_search=None, users_cursors=[None])
+    await _show_subscribers(callback, session, state)
+
+
+@router.callback_query(F.data.startswith("admin:users_filter:"))
+async def users_filter_handler(callback: CallbackQuery, session: AsyncSession, state: FSMContext) -> None:
+    """
+    Apply subscriber list filter.
+
+    Args:
+        callback: Callback query
+        session: Database session
+        state: FSM context
+    """
+    if not is_admin(callback.from_user.id):
+        await callback.answer()
+        return
+
+    status = callback.data.split(":")[-1]
+    if status not in SUBSCRIBER_FILTERS:
+        await callback.answer()
+        return
+
+    await state.update_data(users_status=status, users_cursors=[None])
+    await _show_subscribers(callback, session, state)
+
+
+@router.callback_query(F.data.in_({"admin:users_next", "admin:users_prev"}))
+async def users_page_handler(callback: CallbackQuery, session: AsyncSession, state: FSMContext) -> None:
+    """
+    Go to next or previous subscriber list page.
+
+    Args:
+        callback: Callback query
+        session: Database session
+        state: FSM context
+    """
+    if not is_admin(callback.from_user.id):
+        await callback.answer()
+        return
+
+    data = await state.get_data()
+    cursors = data.get("users_cursors") or [None]
+
+    if callback.data == "admin:users_next":
+        if not data.get("users_next_cursor"):
+            await callback.answer()
+            return
+        cursors.append(data["users_next_cursor"])
+    elif len(cursors) > 1:
+        cursors.pop()
+
+    await state.update_data(users_cursors=cursors)
+    await _show_subscribers(callback, session, state)
+
+
+@router.callback_query(F.data == "admin:users_search", flags={"no_db": True})
+async def users_search_handler(callback: CallbackQuery, state: FSMContext) -> None:
+    """
+    Ask admin for search query.
+
+    Args:
+        callback: Callback query
+        state: FSM context
+    """
+    if not is_admin(callback.from_user.id):
+        await callback.answer()
+        return
+
+    await state.set_state(SubscriberStates.waiting_for_search)
+    await callback.message.answer("🔍 Отправьте начало username или имени подписчика")
+    await callback.answer()
+
+
+@router.message(SubscriberStates.waiting_for_search, F.text)
+async def users_search_query_handler(message: Message, session: AsyncSession, state: FSMContext) -> None:
+    """
+    Show subscribers matching search query.
+
+    Args:
+        message: Message with search query
+        session: Database session
+        state: FSM context
+    """
+    if not message.from_user or not is_admin(message.from_user.id):
+        return
+
+    await state.set_state(None)
+    await state.update_data(users_search=message.text.strip()[:64], users_cursors=[None])
+
+    text, keyboard = await _render_subscribers(session, state)
+    await message.answer(text, reply_markup=keyboard)
+
+
+@router.callback_query(F.data == "admin:users_search_reset")
+async def users_search_reset_handler(callback: CallbackQuery, session: AsyncSession, state: FSMContext) -> None:
+    """
+    Clear search query.
+
+    Args:
+        callback: Callback query
+        session: Database session
+        state: FSM context
+    """
+    if not is_admin(callback.from_user.id):
+        await callback.answer()
+        return
+
+    await state.update_data(users_search=None, users_cursors=[None])
+    await _show_subscribers(callback, session, state)
+
+
+@router.callback_query(F.data == "admin:export", flags={"no_db": True})
+async def export_handler(callback: CallbackQuery) -> None:
+    """
+    Send subscribers export as gzip CSV document.
+
+    Args:
+        callback: Callback query
+    """
+    if not is_admin(callback.from_user.id):
+        await callback.answer()
+        return
+
+    if _export_lock.locked():
+        await callback.answer("⏳ Выгрузка уже выполняется", show_alert=True)
+        return
+
+    await callback.answer("⏳ Готовлю выгрузку...")
+
+    async with _export_lock:
+        try:
+            path, rows_count = await export_subscribers()
+        except Exception as e:
+            logger.exception(f"Subscribers export failed: {e}")
+            await callback.message.answer("❌ Не удалось выгрузить подписчиков")
+            return
+
+        try:
+            filename = f"subscribers_{datetime.datetime.utcnow():%Y%m%d_%H%M}.csv.gz"
+            await callback.message.answer_document(
+                FSInputFile(path, filename=filename),
+                caption=f"📋 Подписчики: {rows_count}",
+            )
+        finally:
+            os.unlink(path)
+
+
+@router.callback_query(F.data == "admin:broadcast", flags={"no_db": True})
+async def broadcast_start_handler(callback: CallbackQuery, state: FSMContext) -> None:
+    """
+    Ask admin for broadcast message.
+
+    Args:
+        callback: Callback query
+        state: FSM context
+    """
+    if not is_admin(callback.from_user.id):
+        await callback.answer()
+        return
+
+    await state.set_state(BroadcastStates.waiting_for_message)
+
+    cancel_keyboard = InlineKeyboardMarkup(
+        inline_keyboard=[[InlineKeyboardButton(text="« Отмена", callback_data="admin:broadcast_cancel")]]
+    )
+    await callback.message.edit_text(
+        "📤 <b>Рассылка</b>\n\n"
+        "Отправьте сообщение для рассылки (текст, фото, видео или кружочек).\n"
+        "Оно будет скопировано всем пользователям бота.",
+        reply_markup=cancel_keyboard,
+    )
+    await callback.answer()
+
+
+@router.message(BroadcastStates.waiting_for_message, flags={"no_db": True})
+async def broadcast_message_handler(message: Message, state: FSMContext) -> None:
+    """
+    Save broadcast message and ask for confirmation.
+
+    Args:
+        message: Message to broadcast
+        state: FSM context
+    """
+    if not message.from_user or not is_admin(message.from_user.id):
+        return
+
+    await state.update_data(from_chat_id=message.chat.id, message_id=message.message_id)
+
+    confirm_keyboard = InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text="✅ Запустить рассылку", callback_data="admin:broadcast_confirm")],
+            [InlineKeyboardButton(text="« Отмена", callback_data="admin:broadcast_cancel")],
+        ]
+    )
+    await message.reply(
+        "☝️ Это сообщение получат все пользователи. Запустить рассылку?",
+        reply_markup=confirm_keyboard,
+    )
+
+
+@router.callback_query(F.data == "admin:broadcast_confirm")
+async def broadcast_confirm_handler(
+    callback: CallbackQuery,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
+    """
+    Create broadcast job and start sending.
+
+    Args:
+        callback: Callback query
+        state: FSM context
+        session: Database session
+    """
+    if not is_admin(callback.from_user.id):
+        await callback.answer()
+        return
+
+    data = await state.get_data()
+    await state.clear()
+
+    if "message_id" not in data:
+        await callback.answer("Сообщение для рассылки не найдено", show_alert=True)
+        return
+
+    job = await create_broadcast_job(
+        session,
+        created_by=callback.from_user.id,
+        from_chat_id=data["from_chat_id"],
+        message_id=data["message_id"],
+        progress_message_id=callback.message.message_id,
+    )
+    logger.info(f"Admin {callback.from_user.id} started broadcast job {job.id}")
+
+    await callback.message.edit_text(
+        format_broadcast_progress(job),
+        reply_markup=broadcast_progress_keyboard(job),
+    )
+    start_broadcast_job(job.id)
+    await callback.answer("Рассылка запущена")
+
+
+@router.callback_query(F.data == "admin:broadcast_cancel", flags={"no_db": True})
+async def broadcast_cancel_handler(callback: CallbackQuery, state: FSMContext) -> None:
+    """
+    Cancel broadcast creation.
+
+    Args:
+        callback: Callback query
+        state: FSM context
+    """
+    await state.clear()
+
+    try:
+        await callback.message.edit_text("❌ Рассылка отменена")
+    except TelegramBadRequest:
+        pass
+
+    await callback.answer()
+
+
+@router.callback_query(F.data.startswith("admin:broadcast_stop:"))
+async def broadcast_stop_handler(callback: CallbackQuery, session: AsyncSession) -> None:
+    """
+    Stop running broadcast job.
+
+    Args:
+        callback: Callback query
+        session: Database session
+    """
+    if not is_admin(callback.from_user.id):
+        await callback.answer()
+        return
+
+    job_id = int(callback.data.split(":")[2])
+    job = await cancel_broadcast_job(session, job_id)
+
+    if not job:
+        await callback.answer("Рассылка не найдена", show_alert=True)
+        return
+
+    try:
+        await callback.message.edit_text(
+            format_broadcast_progress(job),
+            reply_markup=broadcast_progress_keyboard(job),
+        )
+    except TelegramBadRequest:
+        pass
+
+    await callback.answer("Рассылка остановлена")
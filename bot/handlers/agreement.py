@@ -11,17 +11,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.keyboards.inline import main_keyboard, agreement_keyboard
 from bot.keyboards.reply import main_menu
-from bot.services import set_agreement, check_agreement
+from bot.services import UserState, set_agreement
 from bot.core.config import settings
 
 router = Router(name="agreement")
 
 
-async def _show_document(callback: CallbackQuery, session: AsyncSession, text: str) -> None:
+async def _show_document(callback: CallbackQuery, user_state: UserState, text: str) -> None:
     """Helper to show document with back button."""
-    is_agreed = await check_agreement(session, callback.from_user.id)
-    
-    back_callback = "menu:documents" if is_agreed else "agreement:back"
+    back_callback = "menu:documents" if user_state.has_agreement else "agreement:back"
     
     builder = InlineKeyboardBuilder()
     builder.row(InlineKeyboardButton(text="« Назад", callback_data=back_callback))
@@ -38,7 +36,7 @@ async def _show_document(callback: CallbackQuery, session: AsyncSession, text: s
     await callback.answer()
 
 
-@router.callback_query(F.data == "agreement:back")
+@router.callback_query(F.data == "agreement:back", flags={"no_db": True})
 async def agreement_back_handler(callback: CallbackQuery) -> None:
     """Handle back to agreement."""
     agreement_text = (
@@ -107,7 +105,7 @@ async def agreement_agree_handler(callback: CallbackQuery, session: AsyncSession
 
 
 @router.callback_query(F.data == "agreement:offer")
-async def show_offer(callback: CallbackQuery, session: AsyncSession) -> None:
+async def show_offer(callback: CallbackQuery, user_state: UserState) -> None:
     """Show offer document."""
     logger.info(f"🔘 Showing offer to user {callback.from_user.id}")
     
@@ -179,11 +177,11 @@ async def show_offer(callback: CallbackQuery, session: AsyncSession) -> None:
 ИНН: 772092659510
 Email: bazhenovaam.ip@gmail.com"""
     
-    await _show_document(callback, session, offer_text)
+    await _show_document(callback, user_state, offer_text)
 
 
 @router.callback_query(F.data == "agreement:privacy")
-async def show_privacy(callback: CallbackQuery, session: AsyncSession) -> None:
+async def show_privacy(callback: CallbackQuery, user_state: UserState) -> None:
     """Show privacy policy."""
     logger.info(f"🔘 Showing privacy policy to user {callback.from_user.id}")
     
@@ -241,11 +239,11 @@ async def show_privacy(callback: CallbackQuery, session: AsyncSession) -> None:
 По вопросам обработки данных:
 bazhenovaam.ip@gmail.com"""
     
-    await _show_document(callback, session, privacy_text)
+    await _show_document(callback, user_state, privacy_text)
 
 
 @router.callback_query(F.data == "agreement:consent")
-async def show_consent(callback: CallbackQuery, session: AsyncSession) -> None:
+async def show_consent(callback: CallbackQuery, user_state: UserState) -> None:
     """Show consent document."""
     logger.info(f"🔘 Showing consent to user {callback.from_user.id}")
     
@@ -289,4 +287,4 @@ async def show_consent(callback: CallbackQuery, session: AsyncSession) -> None:
 ИНН: 772092659510
 Email: bazhenovaam.ip@gmail.com"""
     
-    await _show_document(callback, session, consent_text)
+    await _show_document(callback, user_state, consent_text)
@@ -11,8 +11,10 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.core.config import settings
-from bot.database.models import PromocodeModel, ReferralModel, VideoReviewModel
+from bot.database.models import PromocodeModel, VideoReviewModel
 from bot.keyboards.inline import back_to_main_keyboard
+from bot.services.referrals import get_referral_stats
+from bot.services.user_state import invalidate_user_state
 
 router = Router(name="bonuses")
 
@@ -24,7 +26,7 @@ class VideoReviewStates(StatesGroup):
     waiting_for_video = State()
 
 
-@router.callback_query(F.data == "bonuses")
+@router.callback_query(F.data == "bonuses", flags={"query_budget": 3})
 async def show_bonuses_menu(callback: CallbackQuery, session: AsyncSession) -> None:
     """
     Show bonuses menu with referral and video review options.
@@ -38,12 +40,7 @@ async def show_bonuses_menu(callback: CallbackQuery, session: AsyncSession) -> N
 
     user_id = callback.from_user.id
 
-    # Count referrals
-    query = select(ReferralModel).filter_by(referrer_id=user_id)
-    result = await session.execute(query)
-    referrals = result.scalars().all()
-    total_referrals = len(referrals)
-    successful_referrals = sum(1 for r in referrals if r.is_bonus_given)
+    referral_stats = await get_referral_stats(session, user_id)
 
     # Check if user has uploaded video review
     video_query = select(VideoReviewModel).filter_by(user_id=user_id)
@@ -54,8 +51,8 @@ async def show_bonuses_menu(callback: CallbackQuery, session: AsyncSession) -> N
     text = (
         "🎁 <b>Бонусы и подарки</b>\n\n"
         f"👥 <b>Приведи друга:</b>\n"
-        f"├ Всего приглашений: {total_referrals}\n"
-        f"├ Оплатили подписку: {successful_referrals}\n"
+        f"├ Всего приглашений: {referral_stats.total}\n"
+        f"├ Оплатили подписку: {referral_stats.paid}\n"
         f"└ Бонус: +{settings.payment.REFERRAL_BONUS_DAYS} дней за каждого друга\n\n"
         f"🎥 <b>Видео-отзыв:</b>\n"
     )
@@ -90,7 +87,7 @@ async def show_bonuses_menu(callback: CallbackQuery, session: AsyncSession) -> N
     await callback.answer()
 
 
-@router.callback_query(F.data == "bonus_video_request")
+@router.callback_query(F.data == "bonus_video_request", flags={"no_db": True})
 async def request_video_review_handler(callback: CallbackQuery) -> None:
     """Show video review instructions."""
     text = (
@@ -113,7 +110,7 @@ async def request_video_review_handler(callback: CallbackQuery) -> None:
     await callback.answer()
 
 
-@router.callback_query(F.data == "bonus_video_submit")
+@router.callback_query(F.data == "bonus_video_submit", flags={"no_db": True})
 async def submit_video_review_handler(callback: CallbackQuery, state: FSMContext) -> None:
     """Start video review submission."""
     await state.set_state(VideoReviewStates.waiting_for_video)
@@ -149,6 +146,8 @@ async def process_video_review(message: Message, state: FSMContext, session: Asy
     )
     session.add(review)
     await session.commit()
+    # Drops cached discount eligibility
+    await invalidate_user_state(message.from_user.id)
     
     # Get promocode
     promo_code = settings.payment.VIDEO_REVIEW_PROMO
@@ -173,7 +172,7 @@ async def process_video_review(message: Message, state: FSMContext, session: Asy
     await message.answer(text, reply_markup=builder.as_markup())
 
 
-@router.callback_query(F.data == "get_referral_link")
+@router.callback_query(F.data == "get_referral_link", flags={"no_db": True})
 async def get_referral_link_handler(callback: CallbackQuery, bot: Bot) -> None:
     """
     Generate and send referral link.
@@ -206,7 +205,7 @@ async def get_referral_link_handler(callback: CallbackQuery, bot: Bot) -> None:
     await callback.answer()
 
 
-@router.callback_query(F.data == "upload_video_review")
+@router.callback_query(F.data == "upload_video_review", flags={"no_db": True})
 async def start_video_review_upload(callback: CallbackQuery, state: FSMContext) -> None:
     """
     Start video review upload process.
@@ -292,6 +291,8 @@ async def process_video_review(
     )
     session.add(video_review)
     await session.commit()
+    # Drops cached discount eligibility
+    await invalidate_user_state(user_id)
 
     logger.info(f"User {user_id} uploaded video review, granted promocode {promocode.code}")
 
@@ -2,81 +2,18 @@
 
 from __future__ import annotations
 
-import asyncio
-
 from aiogram import Bot, F, Router
-from aiogram.types import CallbackQuery, FSInputFile, URLInputFile
+from aiogram.types import CallbackQuery
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.core.config import settings
 from bot.keyboards.inline import back_to_main_keyboard, main_keyboard, tariffs_keyboard
-from bot.services import get_lesson_progress, mark_lesson_watched, mark_reminder_sent, start_lesson
+from bot.services import LESSON_REMINDER_JOB, enqueue_delayed_job, mark_lesson_watched, start_lesson
 
 router = Router(name="lessons")
 
 
-async def send_reminder_task(bot: Bot, user_id: int, session: AsyncSession) -> None:
-    """
-    Send reminder after delay if lesson not watched.
-
-    Args:
-        bot: Bot instance
-        user_id: User ID
-        session: Database session
-    """
-    try:
-        # Wait for configured delay
-        await asyncio.sleep(settings.payment.REMINDER_DELAY_SECONDS)
-
-        # Check if lesson was watched
-        progress = await get_lesson_progress(session, user_id)
-        if not progress or progress.watched_free_lesson or progress.reminder_sent:
-            return
-
-        # Send reminder with sad cat
-        try:
-            photo_url = settings.payment.SAD_CAT_PHOTO_URL
-            if photo_url.startswith("http"):
-                photo = URLInputFile(photo_url)
-            else:
-                photo = FSInputFile(photo_url)
-
-            reminder_text = (
-                "😿 Нежное напоминание 🤍\n\n"
-                "Ты еще не посмотрела урок по дыханию. "
-                "Возможно отвлеклась - это нормально.\n\n"
-                "Просто знай: эта практика помогает:\n"
-                "— снизить тревожность\n"
-                "— успокоить поток мыслей\n"
-                "— восстановить силы и энергию\n\n"
-                "В нём я делюсь проверенным подходом, который помогает справиться с тревогой самостоятельно, "
-                "без долгой и дорогой работы с психологами или специалистами.\n\n"
-                "Всего 10 минут - и ты увидишь в чём настоящая причина твоей тревоги "
-                "и как с ней работать в любой момент.\n\n"
-                "Нажми на кнопку и посмотри урок прямо сейчас ⬇️"
-            )
-
-            await bot.send_photo(
-                chat_id=user_id,
-                photo=photo,
-                caption=reminder_text,
-                reply_markup=back_to_main_keyboard(),
-            )
-
-            # Mark reminder as sent
-            await mark_reminder_sent(session, user_id)
-            logger.info(f"Sent reminder to user {user_id}")
-
-        except Exception as e:
-            logger.error(f"Failed to send reminder to user {user_id}: {e}")
-
-    except asyncio.CancelledError:
-        logger.debug(f"Reminder task cancelled for user {user_id}")
-    except Exception as e:
-        logger.error(f"Error in reminder task for user {user_id}: {e}")
-
-
 @router.callback_query(F.data == "lesson:watch")
 async def lesson_watch_handler(
     callback: CallbackQuery,
@@ -99,9 +36,9 @@ async def lesson_watch_handler(
     # Start lesson (create or update progress)
     await start_lesson(session, user_id)
 
-    # Start reminder task
-    asyncio.create_task(send_reminder_task(bot, user_id, session))
-    logger.info(f"Started reminder task for user {user_id}")
+    # Schedule reminder in case lesson is not watched
+    await enqueue_delayed_job(session, LESSON_REMINDER_JOB, user_id, settings.payment.REMINDER_DELAY_SECONDS)
+    logger.info(f"Scheduled lesson reminder for user {user_id}")
 
     # Send lesson video with caption
     lesson_text = (
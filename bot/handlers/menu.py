@@ -6,7 +6,6 @@ from aiogram import F, Router
 from aiogram.types import CallbackQuery
 from aiogram.exceptions import TelegramBadRequest
 from loguru import logger
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.keyboards.inline import (
     main_keyboard, 
@@ -15,19 +14,19 @@ from bot.keyboards.inline import (
     documents_keyboard
 )
 from bot.keyboards.reply import main_menu
-from bot.services import check_agreement
+from bot.services import UserState
 
 router = Router(name="menu")
 
 
 @router.callback_query(F.data == "menu:main")
-async def main_menu_handler(callback: CallbackQuery, session: AsyncSession) -> None:
+async def main_menu_handler(callback: CallbackQuery, user_state: UserState) -> None:
     """
     Show main menu.
 
     Args:
         callback: Callback query
-        session: Database session
+        user_state: User state snapshot
     """
     if not callback.from_user:
         return
@@ -35,7 +34,7 @@ async def main_menu_handler(callback: CallbackQuery, session: AsyncSession) -> N
     logger.info(f"🔘 User {callback.from_user.id} requested main menu")
 
     # Check agreement
-    if not await check_agreement(session, callback.from_user.id):
+    if not user_state.has_agreement:
         logger.warning(f"⛔ User {callback.from_user.id} tried to access menu without agreement")
         agreement_text = (
             f"👋 Привет, {callback.from_user.first_name}!\n\n"
@@ -79,14 +78,13 @@ async def main_menu_handler(callback: CallbackQuery, session: AsyncSession) -> N
     await callback.answer()
 
 
-@router.callback_query(F.data == "back_to_menu")
-async def back_to_menu_handler(callback: CallbackQuery, session: AsyncSession) -> None:
+@router.callback_query(F.data == "back_to_menu", flags={"no_db": True})
+async def back_to_menu_handler(callback: CallbackQuery) -> None:
     """
     Handle back to menu button.
 
     Args:
         callback: Callback query
-        session: Database session
     """
     if not callback.message:
         return
@@ -121,7 +119,7 @@ async def back_to_menu_handler(callback: CallbackQuery, session: AsyncSession) -
     # await callback.answer() moved to top
 
 
-@router.callback_query(F.data == "menu:documents")
+@router.callback_query(F.data == "menu:documents", flags={"no_db": True})
 async def documents_handler(callback: CallbackQuery) -> None:
     """
     Show documents menu.
@@ -151,7 +149,7 @@ async def documents_handler(callback: CallbackQuery) -> None:
     await callback.answer()
 
 
-@router.callback_query(F.data == "menu:info")
+@router.callback_query(F.data == "menu:info", flags={"no_db": True})
 async def info_handler(callback: CallbackQuery) -> None:
     """
     Show info.
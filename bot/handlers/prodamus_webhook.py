@@ -2,20 +2,27 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import hmac
+import time
 from typing import Any
+from urllib.parse import parse_qsl
 
 from aiohttp import web
 from aiogram import Bot
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from bot.core.cache import cache
 from bot.core.config import settings
-from bot.database.models import ReferralModel
-from bot.services.channel import add_to_channel
-from bot.services.prodamus import create_payment, update_payment_status
-from bot.services.subscriptions import extend_subscription
+from bot.core.metrics import HTTP_REQUEST_SECONDS, render_metrics
+from bot.core.outbound import outbound
+from bot.database import get_pool_stats
+from bot.services.prodamus import process_failed_payment, process_successful_payment
+
+# Strong references to notification tasks, so they are not garbage collected
+_background_tasks: set[asyncio.Task] = set()
 
 
 def verify_prodamus_signature(data: dict[str, Any], signature: str) -> bool:
@@ -42,12 +49,27 @@ def verify_prodamus_signature(data: dict[str, Any], signature: str) -> bool:
     return hmac.compare_digest(signature, expected_signature)
 
 
+def _schedule_notifications(bot: Bot) -> None:
+    """Run enqueued notifications right away instead of waiting for next poll."""
+    # Imported here: the scheduler isn't needed to serve the healthcheck
+    from bot.scheduler import process_delayed_jobs
+
+    task = asyncio.create_task(process_delayed_jobs(bot))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
 async def handle_prodamus_webhook(
     request: web.Request,
 ) -> web.Response:
     """
     Handle Prodamus payment webhook.
 
+    Payment is applied in one transaction and deduplicated by order_id,
+    so Prodamus retries are safe. Telegram calls are not made here:
+    notifications are enqueued to delayed jobs queue and sent in background
+    after the response.
+
     Args:
         request: aiohttp request
 
@@ -55,18 +77,13 @@ async def handle_prodamus_webhook(
         aiohttp response
     """
     try:
-        # Diagnostic: Read raw body
         raw_body = await request.read()
-        logger.info(f"RAW BODY LEN = {len(raw_body)}")
-        logger.info(f"SECRET LEN = {len(settings.payment.PRODAMUS_SECRET_KEY)}")
+        logger.debug(f"Prodamus webhook body length: {len(raw_body)}")
 
         # Parse form data from raw body
         try:
             decoded_body = raw_body.decode('utf-8')
-            # parse_qsl returns list of (key, value)
-            from urllib.parse import parse_qsl
-            data_list = parse_qsl(decoded_body, keep_blank_values=True)
-            data_dict = dict(data_list)
+            data_dict = dict(parse_qsl(decoded_body, keep_blank_values=True))
         except Exception as e:
             logger.error(f"Failed to parse raw body: {e}")
             return web.Response(status=400, text="Bad request")
@@ -83,7 +100,6 @@ async def handle_prodamus_webhook(
         order_id = data_dict.get("order_id")
         payment_status = data_dict.get("status")
         payment_id = data_dict.get("payment_id")
-        customer_email = data_dict.get("customer_email")
 
         if not order_id:
             logger.error("Missing order_id in webhook")
@@ -96,90 +112,51 @@ async def handle_prodamus_webhook(
             parts = order_id.split("_")
             user_id = int(parts[1])
             subscription_days = int(parts[3])
-            
+
             # Check for promo
             promo_code = None
             if "promo" in parts:
                 promo_index = parts.index("promo")
                 if len(parts) > promo_index + 1:
                     promo_code = parts[promo_index + 1]
-                    
+
         except (IndexError, ValueError):
             logger.error(f"Invalid order_id format: {order_id}")
             return web.Response(status=400, text="Invalid order_id format")
 
+        try:
+            amount = int(float(data_dict.get("sum", 0)))
+        except (ValueError, TypeError):
+            amount = 0
+
         # Get bot and session from app context
         bot: Bot = request.app["bot"]
         session_maker: async_sessionmaker[AsyncSession] = request.app["session_maker"]
 
+        processed = False
         async with session_maker() as session:
-            # Update or create payment record
             if payment_status == "success":
-                # Update payment status
-                payment = await update_payment_status(session, payment_id, "success")
-
-                if not payment:
-                    # Create payment if not exists (e.g. if we didn't save pending state)
-                    try:
-                        amount = float(data_dict.get("sum", 0))
-                    except (ValueError, TypeError):
-                        amount = 0
-                        
-                    payment = await create_payment(
-                        session=session,
-                        user_id=user_id,
-                        amount=int(amount),
-                        subscription_days=subscription_days,
-                        payment_id=payment_id,
-                        status="success"
-                    )
-
-                # Extend subscription
-                await extend_subscription(session, user_id, subscription_days)
-
-                # Record promocode usage if present
-                if promo_code:
-                    from sqlalchemy import select
-                    promo_query = select(PromocodeModel).filter_by(code=promo_code)
-                    promo_result = await session.execute(promo_query)
-                    promocode = promo_result.scalar_one_or_none()
-                    
-                    if promocode:
-                        await record_promocode_usage(session, user_id, promocode)
-
-                # Check if this is a referral - give bonus to referrer
-                await process_referral_bonus(session, user_id)
-
-                # Add user to channel
-                invite_link = await add_to_channel(bot, user_id, settings.payment.CHANNEL_ID)
-
-                # Send success message to user
-                message_text = (
-                    f"✅ <b>Оплата успешно получена!</b>\n\n"
-                    f"📅 Подписка активна на {subscription_days} дней\n"
-                    f"🔗 Присоединяйтесь к каналу: {invite_link}\n\n"
-                    f"Приятной практики! 🧘‍♀️"
+                processed = await process_successful_payment(
+                    session=session,
+                    order_id=order_id,
+                    user_id=user_id,
+                    amount=amount,
+                    subscription_days=subscription_days,
+                    payment_id=payment_id,
+                    promo_code=promo_code,
                 )
-
-                try:
-                    await bot.send_message(user_id, message_text)
-                except Exception as e:
-                    logger.error(f"Failed to send success message to user {user_id}: {e}")
-
-                logger.info(f"Payment success for user {user_id}: {subscription_days} days")
-
             elif payment_status == "failed":
-                await update_payment_status(session, payment_id, "failed")
-                logger.warning(f"Payment failed for user {user_id}")
-
-                # Send failure message
-                try:
-                    await bot.send_message(
-                        user_id,
-                        "❌ К сожалению, оплата не прошла. Попробуйте еще раз или обратитесь в поддержку."
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to send failure message to user {user_id}: {e}")
+                processed = await process_failed_payment(
+                    session=session,
+                    order_id=order_id,
+                    user_id=user_id,
+                    amount=amount,
+                    subscription_days=subscription_days,
+                    payment_id=payment_id,
+                )
+
+        if processed:
+            _schedule_notifications(bot)
 
         return web.Response(status=200, text="OK")
 
@@ -188,61 +165,58 @@ async def handle_prodamus_webhook(
         return web.Response(status=500, text="Internal server error")
 
 
-async def process_referral_bonus(session: AsyncSession, referred_user_id: int, bot: Bot) -> None:
-    """
-    Process referral bonus - give +30 days to referrer when referred user pays.
+async def health_check(request: web.Request) -> web.Response:
+    """Health check endpoint for Railway."""
+    return web.Response(text="OK", status=200)
 
-    Args:
-        session: Database session
-        referred_user_id: User who just paid
-        bot: Bot instance
-    """
-    from sqlalchemy import select
 
-    # Find referral record
-    query = select(ReferralModel).filter_by(
-        referred_id=referred_user_id,
-        is_bonus_given=False,
-    )
-    result = await session.execute(query)
-    referral = result.scalar_one_or_none()
+async def db_pool_stats(request: web.Request) -> web.Response:
+    """Database connection pool statistics."""
+    return web.json_response(get_pool_stats())
 
-    if not referral:
-        return
 
-    # Give bonus to referrer
-    referrer_id = referral.referrer_id
-    bonus_days = settings.payment.REFERRAL_BONUS_DAYS
+async def outbound_stats(request: web.Request) -> web.Response:
+    """Outbound Telegram messages queue statistics."""
+    return web.json_response(outbound.get_stats())
 
-    await extend_subscription(session, referrer_id, bonus_days)
 
-    # Mark bonus as given
-    referral.is_bonus_given = True
-    from datetime import datetime
-    referral.bonus_given_at = datetime.utcnow()
-    await session.commit()
+async def cache_stats(request: web.Request) -> web.Response:
+    """Two-tier cache statistics."""
+    return web.json_response(cache.get_stats())
 
-    logger.info(f"Gave referral bonus to user {referrer_id}: +{bonus_days} days")
 
-    # Notify referrer
-    try:
-        await bot.send_message(
-            chat_id=referrer_id,
-            text=(
-                f"🎁 <b>Поздравляем!</b>\n\n"
-                f"Твой друг оплатил подписку!\n"
-                f"Тебе начислено <b>+{bonus_days} дней</b> бонусной подписки.\n\n"
-                f"Продолжай приглашать друзей и получай больше бонусов!"
-            )
-        )
-        logger.info(f"Sent referral bonus notification to user {referrer_id}")
-    except Exception as e:
-        logger.error(f"Failed to send referral bonus notification to user {referrer_id}: {e}")
+async def scheduler_stats(request: web.Request) -> web.Response:
+    """Scheduler leader election state."""
+    from bot.core.leader import scheduler_leader
 
+    return web.json_response(scheduler_leader.get_stats())
 
-async def health_check(request: web.Request) -> web.Response:
-    """Health check endpoint for Railway."""
-    return web.Response(text="OK", status=200)
+
+async def metrics(request: web.Request) -> web.Response:
+    """Prometheus metrics."""
+    body, content_type = render_metrics()
+    return web.Response(body=body, headers={"Content-Type": content_type})
+
+
+@web.middleware
+async def request_metrics_middleware(request: web.Request, handler: Any) -> web.StreamResponse:
+    """Record request latency per route."""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        resource = request.match_info.route.resource
+        HTTP_REQUEST_SECONDS.labels(
+            route=resource.canonical if resource else "unmatched",
+            method=request.method,
+            status=status,
+        ).observe(time.perf_counter() - started)
 
 
 def setup_webhook_handlers(app: web.Application) -> None:
@@ -252,6 +226,12 @@ def setup_webhook_handlers(app: web.Application) -> None:
     Args:
         app: aiohttp application
     """
+    app.middlewares.append(request_metrics_middleware)
     app.router.add_post("/prodamus-webhook", handle_prodamus_webhook)
     app.router.add_get("/health", health_check)
+    app.router.add_get("/health/db", db_pool_stats)
+    app.router.add_get("/health/outbound", outbound_stats)
+    app.router.add_get("/health/cache", cache_stats)
+    app.router.add_get("/health/scheduler", scheduler_stats)
+    app.router.add_get("/metrics", metrics)
     app.router.add_get("/", health_check)  # Root endpoint also responds to health checks
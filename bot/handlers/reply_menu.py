@@ -2,78 +2,27 @@
 
 from __future__ import annotations
 
-import asyncio
 import datetime
 
 from aiogram import Bot, F, Router
-from aiogram.types import Message, URLInputFile, FSInputFile
+from aiogram.types import Message
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.core.config import settings
 from bot.keyboards.inline import back_to_main_keyboard, tariffs_keyboard
 from bot.services import (
-    get_days_left,
+    LESSON_REMINDER_JOB,
+    UserState,
+    enqueue_delayed_job,
     get_payment_history,
     start_lesson,
     mark_lesson_watched,
-    mark_reminder_sent,
-    get_lesson_progress
 )
 
 router = Router(name="reply_menu")
 
 
-async def send_reminder_task(bot: Bot, user_id: int, session: AsyncSession) -> None:
-    """
-    Send reminder after delay if lesson not watched.
-    """
-    try:
-        await asyncio.sleep(settings.payment.REMINDER_DELAY_SECONDS)
-
-        progress = await get_lesson_progress(session, user_id)
-        if not progress or progress.watched_free_lesson or progress.reminder_sent:
-            return
-
-        try:
-            photo_url = settings.payment.SAD_CAT_PHOTO_URL
-            if photo_url.startswith("http"):
-                photo = URLInputFile(photo_url)
-            else:
-                photo = FSInputFile(photo_url)
-
-            reminder_text = (
-                "😿 Нежное напоминание 🤍\n\n"
-                "Ты еще не посмотрела урок по дыханию. "
-                "Возможно отвлеклась - это нормально.\n\n"
-                "Просто знай: эта практика помогает:\n"
-                "— снизить тревожность\n"
-                "— успокоить поток мыслей\n"
-                "— восстановить силы и энергию\n\n"
-                "В нём я делюсь проверенным подходом, который помогает справиться с тревогой самостоятельно, "
-                "без долгой и дорогой работы с психологами или специалистами.\n\n"
-                "Всего 10 минут - и ты увидишь в чём настоящая причина твоей тревоги "
-                "и как с ней работать в любой момент.\n\n"
-                "Нажми на кнопку и посмотри урок прямо сейчас ⬇️"
-            )
-
-            await bot.send_photo(
-                chat_id=user_id,
-                photo=photo,
-                caption=reminder_text,
-                reply_markup=back_to_main_keyboard(),
-            )
-
-            await mark_reminder_sent(session, user_id)
-            logger.info(f"Sent reminder to user {user_id}")
-
-        except Exception as e:
-            logger.error(f"Failed to send reminder to user {user_id}: {e}")
-
-    except Exception as e:
-        logger.error(f"Error in reminder task for user {user_id}: {e}")
-
-
 @router.message(F.text == "Урок по дыханию")
 async def lesson_button_handler(message: Message, bot: Bot, session: AsyncSession) -> None:
     """Handle lesson button."""
@@ -83,8 +32,8 @@ async def lesson_button_handler(message: Message, bot: Bot, session: AsyncSessio
     user_id = message.from_user.id
     await start_lesson(session, user_id)
 
-    # Start reminder task
-    asyncio.create_task(send_reminder_task(bot, user_id, session))
+    # Schedule reminder in case lesson is not watched
+    await enqueue_delayed_job(session, LESSON_REMINDER_JOB, user_id, settings.payment.REMINDER_DELAY_SECONDS)
 
     lesson_text = (
         "Я практикую уже более 6 лет и тема тревожности - одна из самых частых в моей работе.\n\n"
@@ -146,12 +95,12 @@ async def club_button_handler(message: Message, session: AsyncSession) -> None:
 
 
 @router.message(F.text == "Дней осталось")
-async def days_left_button_handler(message: Message, session: AsyncSession) -> None:
+async def days_left_button_handler(message: Message, session: AsyncSession, user_state: UserState) -> None:
     """Handle days left button."""
     if not message.from_user:
         return
 
-    days = await get_days_left(session, message.from_user.id)
+    days = user_state.days_left
     
     if days is None:
         payments = await get_payment_history(session, message.from_user.id, limit=1)
@@ -182,7 +131,7 @@ async def days_left_button_handler(message: Message, session: AsyncSession) -> N
     await message.answer(text=days_text)
 
 
-@router.message(F.text == "Служба заботы")
+@router.message(F.text == "Служба заботы", flags={"no_db": True})
 async def support_button_handler(message: Message) -> None:
     """Handle support button."""
     support_text = (
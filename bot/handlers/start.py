@@ -10,20 +10,28 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.keyboards.inline import agreement_keyboard, main_keyboard
 from bot.keyboards.reply import main_menu
-from bot.services import add_user, check_agreement, user_exists
+from bot.core.redis import CustomRedis
+from bot.services import UserState, create_referral, user_exists
 from bot.core.config import settings
 
 router = Router(name="start")
 
 
 @router.message(CommandStart())
-async def start_handler(message: Message, session: AsyncSession) -> None:
+async def start_handler(
+    message: Message,
+    session: AsyncSession,
+    user_state: UserState,
+    redis: CustomRedis | None = None,
+) -> None:
     """
     Handle /start command.
 
     Args:
         message: Message
         session: Database session
+        user_state: User state snapshot
+        redis: Redis client (injected when available)
     """
     if not message.from_user:
         return
@@ -39,29 +47,18 @@ async def start_handler(message: Message, session: AsyncSession) -> None:
         except (IndexError, ValueError):
             logger.warning(f"Invalid referral code in: {message.text}")
 
-    # Add user if not exists
-    is_new_user = False
-    if not await user_exists(session, user_id):
-        await add_user(session, message.from_user, referrer=None)
-        is_new_user = True
+    # User is registered by AuthMiddleware
+    if user_state.is_new:
         logger.info(f"New user registered: {user_id} (@{message.from_user.username})")
 
         # Create referral record if came from referral link
         if referrer_id and referrer_id != user_id:
-            from bot.database.models import ReferralModel
-
             # Check if referrer exists
             if await user_exists(session, referrer_id):
-                referral = ReferralModel(
-                    referrer_id=referrer_id,
-                    referred_id=user_id,
-                )
-                session.add(referral)
-                await session.commit()
-                logger.info(f"Created referral: {referrer_id} → {user_id}")
+                await create_referral(session, referrer_id, user_id, redis=redis)
 
     # Check if user agreed to terms
-    if not await check_agreement(session, user_id):
+    if not user_state.has_agreement:
         # Show agreement screen with photo
         agreement_text = (
             f"👋 Привет, {message.from_user.first_name}!\n\n"
@@ -14,19 +14,19 @@ from bot.keyboards.inline import (
     subscription_keyboard,
     tariffs_keyboard,
 )
-from bot.services import check_agreement, get_days_left, get_payment_history
+from bot.services import UserState, get_payment_history
 
 router = Router(name="subscription")
 
 
 @router.callback_query(F.data == "menu:account")
-async def account_menu_handler(callback: CallbackQuery, session: AsyncSession) -> None:
+async def account_menu_handler(callback: CallbackQuery, user_state: UserState) -> None:
     """
     Show account menu.
 
     Args:
         callback: Callback query
-        session: Database session
+        user_state: User state snapshot
     """
     if not callback.from_user:
         return
@@ -34,7 +34,7 @@ async def account_menu_handler(callback: CallbackQuery, session: AsyncSession) -
     logger.info(f"🔘 Callback: {callback.data} - User {callback.from_user.id}")
 
     # Check agreement
-    if not await check_agreement(session, callback.from_user.id):
+    if not user_state.has_agreement:
         logger.warning(f"⛔ User {callback.from_user.id} tried to access account without agreement")
         agreement_text = (
             f"👋 Привет, {callback.from_user.first_name}!\n\n"
@@ -68,19 +68,20 @@ async def account_menu_handler(callback: CallbackQuery, session: AsyncSession) -
 
 
 @router.callback_query(F.data == "subscription:days_left")
-async def days_left_handler(callback: CallbackQuery, session: AsyncSession) -> None:
+async def days_left_handler(callback: CallbackQuery, session: AsyncSession, user_state: UserState) -> None:
     """
     Show days left in subscription.
 
     Args:
         callback: Callback query
         session: Database session
+        user_state: User state snapshot
     """
     if not callback.from_user:
         return
 
     logger.info(f"Checking days for user {callback.from_user.id}")
-    days = await get_days_left(session, callback.from_user.id)
+    days = user_state.days_left
     
     if days is None:
         # Check if user has payments despite no active subscription
@@ -183,7 +184,7 @@ async def payment_history_handler(callback: CallbackQuery, session: AsyncSession
     await callback.answer()
 
 
-@router.callback_query(F.data == "subscription:buy")
+@router.callback_query(F.data == "subscription:buy", flags={"no_db": True})
 async def buy_subscription_handler(callback: CallbackQuery) -> None:
     """
     Show tariff selection.
@@ -6,6 +6,10 @@ from aiogram import Dispatcher
 
 from .auth import AuthMiddleware
 from .database import DatabaseMiddleware
+from .metrics import HandlerMetricsMiddleware, TelegramRequestMetricsMiddleware
+from .query_budget import QueryBudgetMiddleware
+from .throttling import ThrottlingMiddleware
+from .tracing import HandlerTracingMiddleware, TelegramRequestTracingMiddleware, UpdateTracingMiddleware
 
 
 def register_middlewares(dp: Dispatcher) -> None:
@@ -15,15 +19,44 @@ def register_middlewares(dp: Dispatcher) -> None:
     Args:
         dp: Dispatcher instance
     """
+    # Trace wraps the whole update, including session cleanup
+    dp.update.middleware(UpdateTracingMiddleware())
+
     # Register database middleware first (so session is available in other middlewares)
     dp.update.middleware(DatabaseMiddleware())
 
-    # Register auth middleware (depends on database session)
-    dp.update.middleware(AuthMiddleware())
+    # Handler timing for every event type, including auth middleware time
+    handler_metrics = HandlerMetricsMiddleware()
+    handler_tracing = HandlerTracingMiddleware()
+    query_budget = QueryBudgetMiddleware()
+    for event_name, observer in dp.observers.items():
+        if event_name not in ("update", "error"):
+            observer.middleware(handler_metrics)
+            observer.middleware(handler_tracing)
+            observer.middleware(query_budget)
+
+    # Throttling runs before auth, so flooded updates don't touch the database.
+    # Registered per event type so that handler flags (rate_limit) are resolved.
+    throttling_middleware = ThrottlingMiddleware()
+    dp.message.middleware(throttling_middleware)
+    dp.callback_query.middleware(throttling_middleware)
+
+    # Register auth middleware (depends on database session).
+    # Registered per event type so that handler flags (no_db) are resolved.
+    auth_middleware = AuthMiddleware()
+    dp.message.middleware(auth_middleware)
+    dp.callback_query.middleware(auth_middleware)
 
 
 __all__ = [
     "DatabaseMiddleware",
     "AuthMiddleware",
+    "HandlerMetricsMiddleware",
+    "QueryBudgetMiddleware",
+    "ThrottlingMiddleware",
+    "TelegramRequestMetricsMiddleware",
+    "UpdateTracingMiddleware",
+    "HandlerTracingMiddleware",
+    "TelegramRequestTracingMiddleware",
     "register_middlewares",
 ]
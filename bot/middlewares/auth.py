@@ -5,15 +5,22 @@ from __future__ import annotations
 from typing import Any, Awaitable, Callable
 
 from aiogram import BaseMiddleware
-from aiogram.types import TelegramObject, User
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import CallbackQuery, Message, TelegramObject, User
 from loguru import logger
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from bot.services import add_user, user_exists
+from bot.database import LazySession
+from bot.services import UserState, add_user, load_user_state, set_users_blocked
+
+UNAVAILABLE_TEXT = "⚠️ Сервис временно недоступен. Попробуйте ещё раз через минуту."
 
 
 class AuthMiddleware(BaseMiddleware):
-    """Middleware to add new users to database."""
+    """
+    Middleware to add new users to database and inject their state.
+
+    Handlers marked with ``flags={"no_db": True}`` are skipped.
+    """
 
     async def __call__(
         self,
@@ -22,7 +29,7 @@ class AuthMiddleware(BaseMiddleware):
         data: dict[str, Any],
     ) -> Any:
         """
-        Add user to database if not exists.
+        Add user to database if not exists and inject user state snapshot.
 
         Args:
             handler: Handler function
@@ -32,19 +39,43 @@ class AuthMiddleware(BaseMiddleware):
         Returns:
             Handler result
         """
+        if get_flag(data, "no_db"):
+            return await handler(event, data)
+
         user: User | None = data.get("event_from_user")
-        session: AsyncSession | None = data.get("session")
+        session: LazySession | None = data.get("session")
 
         if user and session:
             try:
-                if not await user_exists(session, user.id):
+                user_state = await load_user_state(session, user.id)
+                if user_state is None:
                     logger.info(f"👤 New user detected in middleware: {user.id}")
-                    # Parse referrer from command argument if available
-                    referrer = None
-                    # You can parse referrer from start command here if needed
-
-                    await add_user(session, user, referrer)
+                    # Referral is recorded by /start handler (see UserState.is_new)
+                    await add_user(session, user, referrer=None)
+                    user_state = UserState(user_id=user.id, is_new=True)
+                elif user_state.is_blocked:
+                    # User is writing to the bot again, so it is unblocked
+                    await set_users_blocked(session, [user.id], is_blocked=False)
+                    # Snapshot may be shared with the local cache
+                    user_state = user_state.model_copy(update={"is_blocked": False})
             except Exception as e:
+                # Default state would look real (no agreement, no subscription),
+                # so the update fails instead of sending subscribers to the agreement
                 logger.error(f"Failed to check/add user in AuthMiddleware: {e}")
+                await self._answer_unavailable(event)
+                raise
+
+            data["user_state"] = user_state
+
+            # Don't hold pool connection while handler talks to Telegram
+            await session.release()
 
         return await handler(event, data)
+
+    @staticmethod
+    async def _answer_unavailable(event: TelegramObject) -> None:
+        try:
+            if isinstance(event, (CallbackQuery, Message)):
+                await event.answer(UNAVAILABLE_TEXT)
+        except Exception as e:
+            logger.warning(f"Failed to answer update after database error: {e}")
@@ -8,11 +8,16 @@ from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject
 from loguru import logger
 
-from bot.database import sessionmaker
+from bot.database import LazySession
 
 
 class DatabaseMiddleware(BaseMiddleware):
-    """Middleware to inject database session into handlers."""
+    """
+    Middleware to inject database session into handlers.
+
+    Session is lazy: connection is checked out from the pool only when
+    a handler (or another middleware) actually runs a query.
+    """
 
     async def __call__(
         self,
@@ -31,10 +36,12 @@ class DatabaseMiddleware(BaseMiddleware):
         Returns:
             Handler result
         """
-        async with sessionmaker() as session:
-            data["session"] = session
-            try:
-                return await handler(event, data)
-            except Exception as e:
-                logger.error(f"❌ Error in handler: {e}")
-                raise
+        session = LazySession()
+        data["session"] = session
+        try:
+            return await handler(event, data)
+        except Exception as e:
+            logger.error(f"❌ Error in handler: {e}")
+            raise
+        finally:
+            await session.aclose()
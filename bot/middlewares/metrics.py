@@ -0,0 +1,91 @@
+"""Metrics middlewares."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import TelegramObject
+
+from bot.core.metrics import (
+    TELEGRAM_API_ERRORS,
+    TELEGRAM_API_SECONDS,
+    UPDATE_HANDLER_ERRORS,
+    UPDATE_HANDLER_SECONDS,
+)
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Record handling time of updates per router and handler."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        """
+        Measure handler call.
+
+        Args:
+            handler: Handler function
+            event: Telegram event
+            data: Handler data
+
+        Returns:
+            Handler result
+        """
+        router = data.get("event_router")
+        handler_object: HandlerObject | None = data.get("handler")
+        labels = {
+            "router": router.name if router else "unknown",
+            "handler": getattr(handler_object.callback, "__name__", "unknown") if handler_object else "unknown",
+        }
+
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception as e:
+            UPDATE_HANDLER_ERRORS.labels(error=type(e).__name__, **labels).inc()
+            raise
+        finally:
+            UPDATE_HANDLER_SECONDS.labels(**labels).observe(time.perf_counter() - started)
+
+
+class TelegramRequestMetricsMiddleware(BaseRequestMiddleware):
+    """Record latency and errors of Bot API calls by method."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        """
+        Measure API call.
+
+        Args:
+            make_request: Next middleware in chain
+            bot: Bot instance
+            method: Bot API method
+
+        Returns:
+            API response
+        """
+        api_method = method.__api_method__
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            TELEGRAM_API_ERRORS.labels(method=api_method, error=type(e).__name__).inc()
+            raise
+        finally:
+            TELEGRAM_API_SECONDS.labels(method=api_method).observe(time.perf_counter() - started)
@@ -0,0 +1,64 @@
+"""Query budget middleware."""
+
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import TelegramObject
+from loguru import logger
+
+from bot.core.config import settings
+from bot.core.metrics import UPDATE_DB_QUERIES, UPDATE_QUERY_BUDGET_VIOLATIONS
+from bot.database.instrumentation import QueryBudgetExceeded, count_queries
+
+
+class QueryBudgetMiddleware(BaseMiddleware):
+    """
+    Count SQL statements per update and report budget violations.
+
+    Budget comes from handler flag ``query_budget`` (QUERY_BUDGET_DEFAULT
+    otherwise). A statement repeated N_PLUS_ONE_THRESHOLD times is reported
+    as N+1. Violations are logged, or raised in QUERY_BUDGET_STRICT mode.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        """
+        Count queries of handler call.
+
+        Args:
+            handler: Handler function
+            event: Telegram event
+            data: Handler data
+
+        Returns:
+            Handler result
+        """
+        with count_queries() as stats:
+            result = await handler(event, data)
+
+        router = data.get("event_router")
+        handler_object: HandlerObject | None = data.get("handler")
+        labels = {
+            "router": router.name if router else "unknown",
+            "handler": getattr(handler_object.callback, "__name__", "unknown") if handler_object else "unknown",
+        }
+        UPDATE_DB_QUERIES.labels(**labels).observe(stats.total)
+
+        budget = get_flag(data, "query_budget", default=settings.bot.QUERY_BUDGET_DEFAULT)
+        problems = stats.check(budget, settings.bot.N_PLUS_ONE_THRESHOLD)
+        if problems:
+            UPDATE_QUERY_BUDGET_VIOLATIONS.labels(**labels).inc()
+            message = f"Query budget violated in {labels['router']}.{labels['handler']}: {'; '.join(problems)}"
+            if settings.bot.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(f"🐌 {message}")
+
+        return result
@@ -0,0 +1,76 @@
+"""Throttling middleware."""
+
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import CallbackQuery, Message, TelegramObject, User
+from loguru import logger
+
+from bot.core.metrics import THROTTLED_UPDATES
+from bot.core.throttling import ThrottleResult, throttler
+
+TOO_FAST_TEXT = "⏳ Слишком часто! Подождите пару секунд и попробуйте снова."
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Drop updates of users sending them faster than RATE_LIMIT.
+
+    Runs before AuthMiddleware, so flooded updates don't touch the database.
+    The first dropped update of a flood is answered once, the rest are
+    ignored. Handlers set their own limit with ``flags={"rate_limit": 2}``
+    (seconds per call, separate bucket) or disable it with
+    ``flags={"rate_limit": 0}``.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        """
+        Check user's rate before calling handler.
+
+        Args:
+            handler: Handler function
+            event: Telegram event
+            data: Handler data
+
+        Returns:
+            Handler result or None if update was dropped
+        """
+        user: User | None = data.get("event_from_user")
+        if user is None:
+            return await handler(event, data)
+
+        handler_object: HandlerObject | None = data.get("handler")
+        interval = get_flag(data, "rate_limit")
+        if interval is None:
+            result = await throttler.hit(user.id)
+        else:
+            bucket = getattr(handler_object.callback, "__name__", "handler") if handler_object else "handler"
+            result = await throttler.hit(user.id, bucket=bucket, interval=interval)
+
+        if result is ThrottleResult.ALLOWED:
+            return await handler(event, data)
+
+        handler_name = getattr(handler_object.callback, "__name__", "unknown") if handler_object else "unknown"
+        THROTTLED_UPDATES.labels(handler=handler_name, result=result.name.lower()).inc()
+        if result is ThrottleResult.THROTTLED:
+            logger.info(f"🚦 Throttling user {user.id} in {handler_name}")
+            await self._answer_too_fast(event)
+        return None
+
+    @staticmethod
+    async def _answer_too_fast(event: TelegramObject) -> None:
+        try:
+            # Toast for callback queries, message otherwise
+            if isinstance(event, (CallbackQuery, Message)):
+                await event.answer(TOO_FAST_TEXT)
+        except Exception as e:
+            logger.warning(f"Failed to answer throttled update: {e}")
@@ -0,0 +1,101 @@
+"""Tracing middlewares."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import TelegramObject, Update, User
+
+from bot.core.tracing import span, tracer
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+
+class UpdateTracingMiddleware(BaseMiddleware):
+    """Open a trace for every update."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        """
+        Trace update handling.
+
+        Args:
+            handler: Handler function
+            event: Telegram update
+            data: Handler data
+
+        Returns:
+            Handler result
+        """
+        attributes: dict[str, Any] = {}
+        if isinstance(event, Update):
+            attributes["update_id"] = event.update_id
+            attributes["update_type"] = event.event_type
+        user: User | None = data.get("event_from_user")
+        if user:
+            attributes["user_id"] = user.id
+
+        with tracer.trace("update", **attributes):
+            return await handler(event, data)
+
+
+class HandlerTracingMiddleware(BaseMiddleware):
+    """Record the matched handler as a span."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        """
+        Trace handler call.
+
+        Args:
+            handler: Handler function
+            event: Telegram event
+            data: Handler data
+
+        Returns:
+            Handler result
+        """
+        router = data.get("event_router")
+        handler_object: HandlerObject | None = data.get("handler")
+        name = getattr(handler_object.callback, "__name__", "unknown") if handler_object else "unknown"
+
+        with span(f"handler.{name}", router=router.name if router else "unknown"):
+            return await handler(event, data)
+
+
+class TelegramRequestTracingMiddleware(BaseRequestMiddleware):
+    """Record Bot API calls as spans."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        """
+        Trace API call.
+
+        Args:
+            make_request: Next middleware in chain
+            bot: Bot instance
+            method: Bot API method
+
+        Returns:
+            API response
+        """
+        with span(f"telegram.{method.__api_method__}"):
+            return await make_request(bot, method)
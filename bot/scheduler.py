@@ -2,173 +2,579 @@
 
 from __future__ import annotations
 
+import asyncio
 import datetime
+import functools
+from typing import Awaitable, Callable
 
 from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError
+from aiogram.methods import SendMessage, SendPhoto
+from aiogram.types import FSInputFile, URLInputFile
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from loguru import logger
-from sqlalchemy import select
 
 from bot.core.config import settings
+from bot.core.metrics import instrument_scheduler
+from bot.core.outbound import Priority, outbound
+from bot.core.sharding import ALL_USERS, ReplicaRegistry, Shard
 from bot.database import sessionmaker
-from bot.database.models import LessonProgressModel, SubscriptionModel
+from bot.database.models import DelayedJobModel
 from bot.services import (
-    deactivate_subscription, 
-    get_expired_subscriptions, 
+    LESSON_REMINDER_JOB,
+    PAYMENT_FAILED_JOB,
+    PAYMENT_SUCCESS_JOB,
+    REFERRAL_BONUS_JOB,
+    RemovalResult,
+    add_to_channel,
+    claim_due_jobs,
+    claim_lesson_reminders,
+    complete_delayed_job,
+    create_invite_link,
+    deactivate_expired_subscriptions,
+    extend_delayed_job_lease,
     get_expiring_subscriptions,
-    remove_from_channel
+    get_lesson_progress,
+    get_pending_kicks,
+    mark_lesson_reminders_sent,
+    mark_reminder_sent,
+    mark_users_kicked,
+    remove_from_channel,
+    resume_broadcast_jobs,
+    retry_delayed_job,
+    set_users_blocked,
+)
+from bot.keyboards.inline import back_to_main_keyboard, buy_subscription_keyboard
+
+# Delayed job retry policy
+DELAYED_JOB_MAX_ATTEMPTS = 3
+DELAYED_JOB_RETRY_SECONDS = 60
+
+# Cron job still runs if leader took over this late after its run time
+LEADER_MISFIRE_GRACE_SECONDS = 600
+
+# Daily jobs run time (hour)
+KICK_EXPIRED_USERS_HOUR = 0
+EXPIRY_REMINDERS_HOUR = 10
+# Sharded mode: how often replicas pick up unfinished shards of today's runs
+SHARD_CATCH_UP_SECONDS = 300
+
+# User IDs shown in "failed to kick" warning
+FAILED_SAMPLE_SIZE = 20
+
+# Users claimed for lesson reminder per query
+LESSON_REMINDER_BATCH_SIZE = 500
+# Undelivered reminder claim (failed send, crash) is retried by a run this much later
+LESSON_REMINDER_CLAIM_TTL_SECONDS = 3600
+
+LESSON_REMINDER_TEXT = (
+    "Как ты? 🌿\n\n"
+    "Пару дней назад ты посмотрела урок по дыханию. "
+    "Надеюсь, практика уже помогает тебе чувствовать себя спокойнее 🤍\n\n"
+    "В клубе тебя ждут регулярные практики, которые закрепляют результат "
+    "и помогают справляться с тревогой каждый день.\n\n"
+    "Буду рада видеть тебя среди участниц ⬇️"
 )
-from bot.keyboards.inline import buy_subscription_keyboard
 
 
-async def kick_expired_users(bot: Bot) -> None:
+async def _process_expired_user(bot: Bot, user_id: int) -> RemovalResult:
     """
-    Kick users with expired subscriptions from channel.
+    Remove user from channel and notify about expiry.
 
     Args:
         bot: Bot instance
+        user_id: User ID
+
+    Returns:
+        Removal result
+    """
+    result = await remove_from_channel(bot, user_id)
+    if result is not RemovalResult.REMOVED:
+        return result
+
+    # Notification is sent by outbound dispatcher, kick loop doesn't wait for it
+    outbound.submit(
+        SendMessage(
+            chat_id=user_id,
+            text=(
+                "❌ Your subscription has expired\n\n"
+                "You have been removed from the channel.\n\n"
+                "To continue learning, renew your subscription in the bot."
+            ),
+        ),
+        Priority.NOTIFICATION,
+        chat_id=user_id,
+    )
+
+    return result
+
+
+async def _run_daily_job(
+    job: str,
+    hour: int,
+    func: Callable[[Shard], Awaitable[None]],
+    registry: ReplicaRegistry | None,
+) -> None:
     """
-    logger.info("Starting expired subscriptions check")
+    Run daily job for all users (leader mode) or shard by shard (sharded mode).
 
+    Args:
+        job: Job ID
+        hour: Hour of daily run, identifies today's or yesterday's run
+        func: Job body for one shard
+        registry: Replica registry in sharded mode
+    """
     try:
-        async with sessionmaker() as session:
-            # Get expired subscriptions
-            expired_subscriptions = await get_expired_subscriptions(session)
+        if registry is None:
+            await func(ALL_USERS)
+            return
 
-            if not expired_subscriptions:
-                logger.info("No expired subscriptions found")
-                return
+        now = datetime.datetime.now()
+        run_date = now.date() if now.hour >= hour else now.date() - datetime.timedelta(days=1)
+        await registry.run_sharded(job, run_date.isoformat(), func)
+    except Exception as e:
+        logger.error(f"Error in {job}: {e}")
+
+
+async def kick_expired_users(bot: Bot, registry: ReplicaRegistry | None = None) -> None:
+    """
+    Kick users with expired subscriptions from channel.
+
+    Expired subscriptions are deactivated with one bulk UPDATE, then channel
+    removals and notifications run concurrently under the Telegram rate
+    limiter. Users whose removal failed keep kicked_at empty and are
+    retried on the next run; users who can't be removed at all (deleted
+    account, channel admin) are marked kicked without notification.
+
+    Args:
+        bot: Bot instance
+        registry: Replica registry in sharded mode (users are processed by shards)
+    """
+    await _run_daily_job(
+        "kick_expired_users",
+        KICK_EXPIRED_USERS_HOUR,
+        functools.partial(_kick_expired_users, bot),
+        registry,
+    )
 
-            logger.info(f"Found {len(expired_subscriptions)} expired subscriptions")
 
-            for subscription in expired_subscriptions:
-                try:
-                    # Remove from channel
-                    success = await remove_from_channel(bot, subscription.user_id)
+async def _kick_expired_users(bot: Bot, shard: Shard) -> None:
+    logger.info(f"Starting expired subscriptions check (shard {shard.index + 1}/{shard.count})")
 
-                    if success:
-                        # Deactivate subscription
-                        await deactivate_subscription(session, subscription.user_id)
+    async with sessionmaker() as session:
+        deactivated = await deactivate_expired_subscriptions(session, shard)
+        user_ids = await get_pending_kicks(session, shard)
 
-                        # Send notification to user
-                        try:
-                            await bot.send_message(
-                                chat_id=subscription.user_id,
-                                text=(
-                                    "❌ Your subscription has expired\n\n"
-                                    "You have been removed from the channel.\n\n"
-                                    "To continue learning, renew your subscription in the bot."
-                                ),
-                            )
-                        except Exception as e:
-                            logger.error(f"Failed to send notification to user {subscription.user_id}: {e}")
+    if not user_ids:
+        logger.info("No expired subscriptions found")
+        return
 
-                        logger.info(f"Successfully processed expired subscription for user {subscription.user_id}")
-                    else:
-                        logger.warning(f"Failed to kick user {subscription.user_id} from channel")
+    logger.info(
+        f"Found {len(user_ids)} users to remove from channel "
+        f"({len(deactivated)} newly expired, {len(user_ids) - len(deactivated)} retries)"
+    )
 
-                except Exception as e:
-                    logger.error(f"Error processing expired subscription for user {subscription.user_id}: {e}")
+    semaphore = asyncio.Semaphore(settings.bot.SCHEDULER_CONCURRENCY)
 
-            logger.info("Finished expired subscriptions check")
+    async def process(user_id: int) -> RemovalResult:
+        async with semaphore:
+            try:
+                return await _process_expired_user(bot, user_id)
+            except Exception as e:
+                logger.error(f"Error processing expired subscription for user {user_id}: {e}")
+                return RemovalResult.FAILED
 
-    except Exception as e:
-        logger.error(f"Error in kick_expired_users: {e}")
+    results = await asyncio.gather(*(process(user_id) for user_id in user_ids))
+
+    kicked = [user_id for user_id, result in zip(user_ids, results) if result is RemovalResult.REMOVED]
+    skipped = [user_id for user_id, result in zip(user_ids, results) if result is RemovalResult.SKIPPED]
+    failed = [user_id for user_id, result in zip(user_ids, results) if result is RemovalResult.FAILED]
+
+    async with sessionmaker() as session:
+        await mark_users_kicked(session, kicked + skipped)
 
+    if failed:
+        sample = ", ".join(map(str, failed[:FAILED_SAMPLE_SIZE]))
+        logger.warning(
+            f"Failed to kick {len(failed)} users, will retry on next run "
+            f"(e.g. {sample}{', ...' if len(failed) > FAILED_SAMPLE_SIZE else ''})"
+        )
 
-async def send_lesson_reminders(bot: Bot) -> None:
+    logger.info(
+        f"Finished expired subscriptions check: kicked={len(kicked)}, "
+        f"skipped={len(skipped)}, failed={len(failed)}"
+    )
+
+
+async def send_lesson_reminders() -> None:
     """
     Send reminders to users who watched free lesson 48-72h ago but didn't purchase.
 
-    Args:
-        bot: Bot instance
+    Users are claimed in batches and reminders go through the outbound
+    dispatcher. After each batch delivered reminders are marked as sent;
+    failed ones keep their claim, which goes stale and is retried by a
+    later run (as are claims left by a crashed run).
     """
     logger.info("Starting lesson reminders check")
 
-    try:
-        async with sessionmaker() as session:
-            # Calculate time window (48-72 hours ago)
-            now = datetime.datetime.now(datetime.timezone.utc)
-            time_72h_ago = now - datetime.timedelta(seconds=settings.payment.REMINDER_48H_SECONDS + 86400)
-            time_48h_ago = now - datetime.timedelta(seconds=settings.payment.REMINDER_48H_SECONDS)
-
-            # Find users who watched lesson but didn't purchase
-            query = (
-                select(LessonProgressModel)
-                .filter(
-                    LessonProgressModel.watched_free_lesson == True,  # noqa: E712
-                    LessonProgressModel.reminder_sent == False,  # noqa: E712
-                    LessonProgressModel.free_lesson_watched_at.between(time_72h_ago, time_48h_ago),
-                )
-            )
-            result = await session.execute(query)
-            lesson_progress_list = result.scalars().all()
+    now = datetime.datetime.utcnow()
+    watched_from = now - datetime.timedelta(seconds=settings.payment.REMINDER_48H_SECONDS + 86400)
+    watched_to = now - datetime.timedelta(seconds=settings.payment.REMINDER_48H_SECONDS)
 
-            if not lesson_progress_list:
-                logger.info("No users need lesson reminders")
-                return
+    sent = 0
+    blocked: list[int] = []
+    failed: list[int] = []
 
-            logger.info(f"Found {len(lesson_progress_list)} users to send lesson reminders")
+    try:
+        while True:
+            async with sessionmaker() as session:
+                user_ids = await claim_lesson_reminders(
+                    session,
+                    watched_from,
+                    watched_to,
+                    LESSON_REMINDER_BATCH_SIZE,
+                    LESSON_REMINDER_CLAIM_TTL_SECONDS,
+                )
 
-            for lesson_progress in lesson_progress_list:
-                try:
-                    await send_lesson_reminder(bot, session, lesson_progress)
-                except Exception as e:
-                    logger.error(f"Failed to send reminder to user {lesson_progress.user_id}: {e}")
+            if not user_ids:
+                break
 
-            logger.info("Finished lesson reminders check")
+            futures = [
+                outbound.submit(
+                    SendMessage(
+                        chat_id=user_id,
+                        text=LESSON_REMINDER_TEXT,
+                        reply_markup=buy_subscription_keyboard(),
+                    ),
+                    Priority.REMINDER,
+                    chat_id=user_id,
+                )
+                for user_id in user_ids
+            ]
+            results = await asyncio.gather(*futures, return_exceptions=True)
+
+            delivered: list[int] = []
+            batch_blocked: list[int] = []
+            for user_id, result in zip(user_ids, results):
+                if isinstance(result, TelegramForbiddenError):
+                    batch_blocked.append(user_id)
+                elif isinstance(result, Exception):
+                    logger.error(f"Failed to send lesson reminder to user {user_id}: {result}")
+                    failed.append(user_id)
+                else:
+                    delivered.append(user_id)
+
+            async with sessionmaker() as session:
+                await mark_lesson_reminders_sent(session, delivered + batch_blocked)
+                await set_users_blocked(session, batch_blocked, is_blocked=True)
+            sent += len(delivered)
+            blocked += batch_blocked
+
+            if len(user_ids) < LESSON_REMINDER_BATCH_SIZE:
+                break
 
     except Exception as e:
         logger.error(f"Error in send_lesson_reminders: {e}")
 
+    logger.info(
+        f"Finished lesson reminders check: sent={sent}, blocked={len(blocked)}, failed={len(failed)}"
+    )
+
 
-async def send_expiry_reminders(bot: Bot) -> None:
+async def send_lesson_start_reminder(bot: Bot, job: DelayedJobModel) -> None:
     """
-    Send reminders to users whose subscription expires in 3 days.
+    Remind user who started free lesson but didn't watch it.
 
     Args:
         bot: Bot instance
+        job: Claimed delayed job
     """
-    logger.info("Starting expiry reminders check")
+    user_id = job.user_id
+
+    async with sessionmaker() as session:
+        progress = await get_lesson_progress(session, user_id)
+        if not progress or progress.watched_free_lesson or progress.reminder_sent:
+            return
+
+    photo_url = settings.payment.SAD_CAT_PHOTO_URL
+    if photo_url.startswith("http"):
+        photo = URLInputFile(photo_url)
+    else:
+        photo = FSInputFile(photo_url)
+
+    reminder_text = (
+        "😿 Нежное напоминание 🤍\n\n"
+        "Ты еще не посмотрела урок по дыханию. "
+        "Возможно отвлеклась - это нормально.\n\n"
+        "Просто знай: эта практика помогает:\n"
+        "— снизить тревожность\n"
+        "— успокоить поток мыслей\n"
+        "— восстановить силы и энергию\n\n"
+        "В нём я делюсь проверенным подходом, который помогает справиться с тревогой самостоятельно, "
+        "без долгой и дорогой работы с психологами или специалистами.\n\n"
+        "Всего 10 минут - и ты увидишь в чём настоящая причина твоей тревоги "
+        "и как с ней работать в любой момент.\n\n"
+        "Нажми на кнопку и посмотри урок прямо сейчас ⬇️"
+    )
 
     try:
+        await outbound.send(
+            SendPhoto(
+                chat_id=user_id,
+                photo=photo,
+                caption=reminder_text,
+                reply_markup=back_to_main_keyboard(),
+            ),
+            Priority.REMINDER,
+            chat_id=user_id,
+            coalesce_key=f"lesson_reminder:{user_id}",
+        )
+    except TelegramForbiddenError:
         async with sessionmaker() as session:
-            # Get subscriptions expiring in 3 days
-            subscriptions = await get_expiring_subscriptions(session, days=3)
+            await set_users_blocked(session, [user_id], is_blocked=True)
+        logger.info(f"User {user_id} blocked the bot, lesson reminder skipped")
+        return
+
+    async with sessionmaker() as session:
+        await mark_reminder_sent(session, user_id)
+    logger.info(f"Sent reminder to user {user_id}")
+
+
+async def _send_notification(user_id: int, text: str, priority: Priority) -> None:
+    """Send message to user, marking users who blocked the bot."""
+    try:
+        await outbound.send(SendMessage(chat_id=user_id, text=text), priority, chat_id=user_id)
+    except TelegramForbiddenError:
+        async with sessionmaker() as session:
+            await set_users_blocked(session, [user_id], is_blocked=True)
+        logger.info(f"User {user_id} blocked the bot, notification skipped")
+
+
+async def send_payment_success_notification(bot: Bot, job: DelayedJobModel) -> None:
+    """
+    Give channel access and confirm successful payment.
+
+    Args:
+        bot: Bot instance
+        job: Claimed delayed job
+    """
+    user_id = job.user_id
+    days = (job.payload or {}).get("days")
+
+    await add_to_channel(bot, user_id)
+    invite_link = await create_invite_link(bot, user_id)
+
+    text = (
+        f"✅ <b>Оплата успешно получена!</b>\n\n"
+        f"📅 Подписка активна на {days} дней\n"
+    )
+    if invite_link:
+        text += f"🔗 Присоединяйтесь к каналу: {invite_link}\n"
+    text += "\nПриятной практики! 🧘‍♀️"
+
+    await _send_notification(user_id, text, Priority.PAYMENT)
+    logger.info(f"Sent payment success message to user {user_id}")
+
+
+async def send_payment_failed_notification(bot: Bot, job: DelayedJobModel) -> None:
+    """
+    Notify user about failed payment.
+
+    Args:
+        bot: Bot instance
+        job: Claimed delayed job
+    """
+    await _send_notification(
+        job.user_id,
+        "❌ К сожалению, оплата не прошла. Попробуйте еще раз или обратитесь в поддержку.",
+        Priority.PAYMENT,
+    )
+
+
+async def send_referral_bonus_notification(bot: Bot, job: DelayedJobModel) -> None:
+    """
+    Notify referrer about bonus days.
 
-            if not subscriptions:
-                logger.info("No subscriptions expiring soon")
+    Args:
+        bot: Bot instance
+        job: Claimed delayed job
+    """
+    bonus_days = (job.payload or {}).get("days", settings.payment.REFERRAL_BONUS_DAYS)
+
+    await _send_notification(
+        job.user_id,
+        (
+            f"🎁 <b>Поздравляем!</b>\n\n"
+            f"Твой друг оплатил подписку!\n"
+            f"Тебе начислено <b>+{bonus_days} дней</b> бонусной подписки.\n\n"
+            f"Продолжай приглашать друзей и получай больше бонусов!"
+        ),
+        Priority.NOTIFICATION,
+    )
+    logger.info(f"Sent referral bonus notification to user {job.user_id}")
+
+
+# Delayed job kind -> handler
+DELAYED_JOB_HANDLERS = {
+    LESSON_REMINDER_JOB: send_lesson_start_reminder,
+    PAYMENT_SUCCESS_JOB: send_payment_success_notification,
+    PAYMENT_FAILED_JOB: send_payment_failed_notification,
+    REFERRAL_BONUS_JOB: send_referral_bonus_notification,
+}
+
+
+async def _keep_delayed_job_leased(job: DelayedJobModel, stop: asyncio.Event) -> None:
+    # Sends wait in the outbound queue, which can take longer than the lease
+    lease = settings.bot.DELAYED_JOBS_LEASE_SECONDS
+    while True:
+        try:
+            await asyncio.wait_for(stop.wait(), lease / 3)
+            return
+        except asyncio.TimeoutError:
+            pass
+
+        try:
+            async with sessionmaker() as session:
+                if not await extend_delayed_job_lease(session, job, lease):
+                    return
+        except Exception as e:
+            logger.warning(f"Failed to extend lease of delayed job {job.kind} for user {job.user_id}: {e}")
+
+
+async def _run_delayed_job(bot: Bot, job: DelayedJobModel) -> None:
+    handler = DELAYED_JOB_HANDLERS.get(job.kind)
+    if handler is None:
+        logger.error(f"Unknown delayed job kind {job.kind!r} for user {job.user_id}, dropping")
+    elif job.attempts > DELAYED_JOB_MAX_ATTEMPTS:
+        # Lease expired every time, e.g. worker crashed while running it
+        logger.error(f"Delayed job {job.kind} for user {job.user_id} was never finished, giving up")
+    else:
+        try:
+            stop_renewal = asyncio.Event()
+            renewal = asyncio.create_task(_keep_delayed_job_leased(job, stop_renewal))
+            try:
+                await handler(bot, job)
+            finally:
+                # Stopped, not cancelled: the renewal must not be interrupted
+                # between the UPDATE and storing the new lease on job
+                stop_renewal.set()
+                await renewal
+        except Exception as e:
+            if job.attempts < DELAYED_JOB_MAX_ATTEMPTS:
+                logger.warning(f"Delayed job {job.kind} for user {job.user_id} failed, will retry: {e}")
+                async with sessionmaker() as session:
+                    await retry_delayed_job(session, job, DELAYED_JOB_RETRY_SECONDS * job.attempts)
                 return
+            logger.error(f"Delayed job {job.kind} for user {job.user_id} failed, giving up: {e}")
 
-            logger.info(f"Found {len(subscriptions)} subscriptions expiring soon")
-
-            for subscription in subscriptions:
-                try:
-                    # Send reminder
-                    await bot.send_message(
-                        chat_id=subscription.user_id,
-                        text=(
-                            "Напоминаю 🌿\n\n"
-                            "Через 3 дня заканчивается доступ в клуб.\n"
-                            "Буду рада продолжить практики вместе 🤍"
-                        ),
-                        reply_markup=buy_subscription_keyboard(),
-                    )
+    async with sessionmaker() as session:
+        await complete_delayed_job(session, job)
 
-                    logger.info(f"Sent expiry reminder to user {subscription.user_id}")
 
-                except Exception as e:
-                    logger.error(f"Error sending expiry reminder to user {subscription.user_id}: {e}")
+async def process_delayed_jobs(bot: Bot) -> None:
+    """
+    Run due jobs from delayed jobs queue.
+
+    Jobs are claimed in batches until the queue has no due items left.
 
-            logger.info("Finished expiry reminders check")
+    Args:
+        bot: Bot instance
+    """
+    semaphore = asyncio.Semaphore(settings.bot.SCHEDULER_CONCURRENCY)
+    batch_size = settings.bot.DELAYED_JOBS_BATCH_SIZE
+
+    async def run(job: DelayedJobModel) -> None:
+        async with semaphore:
+            await _run_delayed_job(bot, job)
+
+    try:
+        while True:
+            async with sessionmaker() as session:
+                jobs = await claim_due_jobs(session, batch_size, settings.bot.DELAYED_JOBS_LEASE_SECONDS)
+
+            if not jobs:
+                return
+
+            logger.info(f"Processing {len(jobs)} delayed jobs")
+            await asyncio.gather(*(run(job) for job in jobs))
+
+            if len(jobs) < batch_size:
+                return
 
     except Exception as e:
-        logger.error(f"Error in send_expiry_reminders: {e}")
+        logger.error(f"Error in process_delayed_jobs: {e}")
+
+
+async def send_expiry_reminders(registry: ReplicaRegistry | None = None) -> None:
+    """
+    Send reminders to users whose subscription expires in 3 days.
+
+    Args:
+        registry: Replica registry in sharded mode (users are processed by shards)
+    """
+    await _run_daily_job("send_expiry_reminders", EXPIRY_REMINDERS_HOUR, _send_expiry_reminders, registry)
+
+
+async def _send_expiry_reminders(shard: Shard) -> None:
+    logger.info(f"Starting expiry reminders check (shard {shard.index + 1}/{shard.count})")
+
+    async with sessionmaker() as session:
+        # Get subscriptions expiring in 3 days
+        subscriptions = await get_expiring_subscriptions(session, days=3, shard=shard)
+
+        if not subscriptions:
+            logger.info("No subscriptions expiring soon")
+            return
+
+        logger.info(f"Found {len(subscriptions)} subscriptions expiring soon")
+
+    futures = [
+        outbound.submit(
+            SendMessage(
+                chat_id=subscription.user_id,
+                text=(
+                    "Напоминаю 🌿\n\n"
+                    "Через 3 дня заканчивается доступ в клуб.\n"
+                    "Буду рада продолжить практики вместе 🤍"
+                ),
+                reply_markup=buy_subscription_keyboard(),
+            ),
+            Priority.REMINDER,
+            chat_id=subscription.user_id,
+        )
+        for subscription in subscriptions
+    ]
+    results = await asyncio.gather(*futures, return_exceptions=True)
+
+    for subscription, result in zip(subscriptions, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error sending expiry reminder to user {subscription.user_id}: {result}")
+
+    sent = sum(not isinstance(result, Exception) for result in results)
+    logger.info(f"Finished expiry reminders check: sent={sent}, failed={len(results) - sent}")
+
+
+async def catch_up_sharded_jobs(bot: Bot, registry: ReplicaRegistry) -> None:
+    """
+    Process unfinished shards of today's daily jobs.
+
+    Args:
+        bot: Bot instance
+        registry: Replica registry
+    """
+    hour = datetime.datetime.now().hour
+    if hour >= KICK_EXPIRED_USERS_HOUR:
+        await kick_expired_users(bot, registry)
+    if hour >= EXPIRY_REMINDERS_HOUR:
+        await send_expiry_reminders(registry)
 
 
 def setup_scheduler(bot: Bot) -> AsyncIOScheduler:
     """
-    Setup and configure scheduler.
+    Setup scheduler for jobs that run on every replica.
+
+    These jobs claim their work atomically in the database, so running
+    them concurrently in several processes is safe.
 
     Args:
         bot: Bot instance
@@ -177,14 +583,75 @@ def setup_scheduler(bot: Bot) -> AsyncIOScheduler:
         Configured AsyncIOScheduler
     """
     scheduler = AsyncIOScheduler()
+    instrument_scheduler(scheduler)
+
+    # Resume broadcasts abandoned by stopped processes every minute
+    scheduler.add_job(
+        resume_broadcast_jobs,
+        trigger="interval",
+        minutes=1,
+        id="resume_broadcast_jobs",
+        replace_existing=True,
+    )
+
+    # Run due delayed jobs (lesson reminders, payment notifications)
+    scheduler.add_job(
+        process_delayed_jobs,
+        trigger="interval",
+        seconds=settings.bot.DELAYED_JOBS_POLL_SECONDS,
+        args=[bot],
+        id="process_delayed_jobs",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+
+    logger.info(
+        "Scheduler configured:\n"
+        "- Broadcast resume check: every minute\n"
+        f"- Delayed jobs: every {settings.bot.DELAYED_JOBS_POLL_SECONDS}s"
+    )
+
+    return scheduler
+
+
+def setup_cron_scheduler(bot: Bot, registry: ReplicaRegistry | None = None) -> AsyncIOScheduler:
+    """
+    Setup scheduler for daily batch jobs.
+
+    Leader mode (no registry): the scheduler is started paused and resumed
+    by leader election. A replica taking over shortly after a missed run
+    time still runs the job (within LEADER_MISFIRE_GRACE_SECONDS).
+
+    Sharded mode: every replica runs the jobs starting with its own shard of
+    users and then takes shards nobody finished. Replicas also check for
+    unfinished shards of today's runs periodically, so shards of a replica
+    that died, or runs missed while no replica was up, are still processed.
+    Lesson reminders need no shard, they are claimed with SKIP LOCKED.
+
+    Args:
+        bot: Bot instance
+        registry: Replica registry, enables sharded mode
+
+    Returns:
+        Configured AsyncIOScheduler
+    """
+    scheduler = AsyncIOScheduler(
+        job_defaults={
+            "coalesce": True,
+            "max_instances": 1,
+            "misfire_grace_time": LEADER_MISFIRE_GRACE_SECONDS,
+        }
+    )
+    instrument_scheduler(scheduler)
 
     # Add job to check expired subscriptions every day at 00:00
     scheduler.add_job(
         kick_expired_users,
         trigger="cron",
-        hour=0,
+        hour=KICK_EXPIRED_USERS_HOUR,
         minute=0,
-        args=[bot],
+        args=[bot, registry],
         id="kick_expired_users",
         replace_existing=True,
     )
@@ -195,7 +662,6 @@ def setup_scheduler(bot: Bot) -> AsyncIOScheduler:
         trigger="cron",
         hour="*/6",
         minute=0,
-        args=[bot],
         id="send_lesson_reminders",
         replace_existing=True,
     )
@@ -204,15 +670,27 @@ def setup_scheduler(bot: Bot) -> AsyncIOScheduler:
     scheduler.add_job(
         send_expiry_reminders,
         trigger="cron",
-        hour=10,
+        hour=EXPIRY_REMINDERS_HOUR,
         minute=0,
-        args=[bot],
+        args=[registry],
         id="send_expiry_reminders",
         replace_existing=True,
     )
 
+    if registry:
+        # Shards of replicas that died mid-run, or of a run nobody was up for
+        scheduler.add_job(
+            catch_up_sharded_jobs,
+            trigger="interval",
+            seconds=SHARD_CATCH_UP_SECONDS,
+            args=[bot, registry],
+            id="catch_up_sharded_jobs",
+            replace_existing=True,
+            next_run_time=datetime.datetime.now(),
+        )
+
     logger.info(
-        "Scheduler configured:\n"
+        f"Cron scheduler configured ({'sharded' if registry else 'leader'} mode):\n"
         "- Expired subscriptions check: daily at 00:00\n"
         "- Lesson reminders: every 6 hours\n"
         "- Expiry reminders: daily at 10:00"
@@ -1,38 +1,148 @@
 """Services package."""
 
-from .channel import add_to_channel, check_channel_membership, remove_from_channel
+from .broadcast import (
+    cancel_broadcast_job,
+    broadcast_progress_keyboard,
+    create_broadcast_job,
+    format_broadcast_progress,
+    resume_broadcast_jobs,
+    start_broadcast_job,
+)
+from .channel import (
+    RemovalResult,
+    add_to_channel,
+    check_channel_membership,
+    create_invite_link,
+    remove_from_channel,
+)
+from .delayed_jobs import (
+    LESSON_REMINDER_JOB,
+    PAYMENT_FAILED_JOB,
+    PAYMENT_SUCCESS_JOB,
+    REFERRAL_BONUS_JOB,
+    claim_due_jobs,
+    complete_delayed_job,
+    enqueue_delayed_job,
+    extend_delayed_job_lease,
+    retry_delayed_job,
+)
+from .export import export_subscribers
 from .payments import create_payment_record, get_payment_history, get_total_revenue
+from .pricing import (
+    TARIFFS,
+    PriceQuote,
+    Tariff,
+    get_payment_url,
+    get_payment_urls,
+    get_price_quotes,
+    get_user_discount,
+    quote,
+)
+from .referrals import (
+    LeaderboardEntry,
+    ReferralStats,
+    create_referral,
+    format_referral_leaderboard,
+    get_referral_leaderboard,
+    get_referral_stats,
+    mark_referral_paid,
+    rebuild_referral_leaderboard,
+)
+from .stats import AdminStats, format_admin_stats, get_admin_stats
+from .subscribers import (
+    SUBSCRIBER_FILTERS,
+    SubscriberItem,
+    SubscribersPage,
+    format_subscribers_page,
+    get_subscribers_page,
+)
 from .subscriptions import (
     check_expiry,
+    deactivate_expired_subscriptions,
     deactivate_subscription,
     extend_subscription,
     get_days_left,
     get_expired_subscriptions,
     get_expiring_subscriptions,
+    get_pending_kicks,
     get_subscription,
+    mark_users_kicked,
 )
+from .user_state import UserState, invalidate_user_state, invalidate_users_state, load_user_state
 from .users import (
     add_user,
     check_agreement,
+    claim_lesson_reminders,
     get_lesson_progress,
     get_user,
     is_admin,
     mark_lesson_watched,
+    mark_lesson_reminders_sent,
     mark_reminder_sent,
     set_agreement,
+    set_users_blocked,
     start_lesson,
     user_exists,
 )
 
 __all__ = [
+    # Broadcast
+    "create_broadcast_job",
+    "cancel_broadcast_job",
+    "format_broadcast_progress",
+    "broadcast_progress_keyboard",
+    "start_broadcast_job",
+    "resume_broadcast_jobs",
     # Channel
     "add_to_channel",
+    "create_invite_link",
     "remove_from_channel",
+    "RemovalResult",
     "check_channel_membership",
+    # Delayed jobs
+    "LESSON_REMINDER_JOB",
+    "PAYMENT_SUCCESS_JOB",
+    "PAYMENT_FAILED_JOB",
+    "REFERRAL_BONUS_JOB",
+    "enqueue_delayed_job",
+    "claim_due_jobs",
+    "complete_delayed_job",
+    "extend_delayed_job_lease",
+    "retry_delayed_job",
+    # Export
+    "export_subscribers",
     # Payments
     "create_payment_record",
     "get_payment_history",
     "get_total_revenue",
+    # Pricing
+    "TARIFFS",
+    "Tariff",
+    "PriceQuote",
+    "get_user_discount",
+    "get_price_quotes",
+    "quote",
+    "get_payment_url",
+    "get_payment_urls",
+    # Referrals
+    "ReferralStats",
+    "LeaderboardEntry",
+    "create_referral",
+    "mark_referral_paid",
+    "get_referral_stats",
+    "get_referral_leaderboard",
+    "rebuild_referral_leaderboard",
+    "format_referral_leaderboard",
+    # Stats
+    "AdminStats",
+    "get_admin_stats",
+    "format_admin_stats",
+    # Subscribers
+    "SUBSCRIBER_FILTERS",
+    "SubscriberItem",
+    "SubscribersPage",
+    "get_subscribers_page",
+    "format_subscribers_page",
     # Subscriptions
     "get_subscription",
     "check_expiry",
@@ -41,6 +151,9 @@ __all__ = [
     "deactivate_subscription",
     "get_expired_subscriptions",
     "get_expiring_subscriptions",
+    "deactivate_expired_subscriptions",
+    "get_pending_kicks",
+    "mark_users_kicked",
     # Users
     "add_user",
     "user_exists",
@@ -52,4 +165,12 @@ __all__ = [
     "start_lesson",
     "mark_lesson_watched",
     "mark_reminder_sent",
+    "claim_lesson_reminders",
+    "mark_lesson_reminders_sent",
+    "set_users_blocked",
+    # User state
+    "UserState",
+    "load_user_state",
+    "invalidate_user_state",
+    "invalidate_users_state",
 ]
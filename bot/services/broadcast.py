@@ -0,0 +1,353 @@
+"""Broadcast service."""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import time
+
+from aiogram.exceptions import TelegramForbiddenError
+from aiogram.methods import CopyMessage, EditMessageText
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from loguru import logger
+from sqlalchemy import ColumnElement, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.core.config import settings
+from bot.core.outbound import Priority, outbound
+from bot.core.sharding import default_replica_id
+from bot.database import sessionmaker
+from bot.database.models import BroadcastJobModel, UserModel
+from bot.services.users import set_users_blocked
+
+# Job is considered abandoned (process died) if heartbeat is older than this
+STALE_JOB_SECONDS = 120
+# Heartbeat interval while a batch is being sent
+HEARTBEAT_SECONDS = STALE_JOB_SECONDS / 4
+
+# Owner of jobs run by this process
+OWNER_ID = default_replica_id()
+
+# Minimal interval between progress message edits
+PROGRESS_REPORT_INTERVAL = 5.0
+
+# Jobs running in this process
+_running_jobs: dict[int, asyncio.Task] = {}
+
+
+async def create_broadcast_job(
+    session: AsyncSession,
+    created_by: int,
+    from_chat_id: int,
+    message_id: int,
+    progress_message_id: int | None = None,
+) -> BroadcastJobModel:
+    """
+    Create broadcast job for all users who didn't block the bot.
+
+    Args:
+        session: Database session
+        created_by: Admin user ID
+        from_chat_id: Chat with source message
+        message_id: Source message ID
+        progress_message_id: Admin message to edit with progress
+
+    Returns:
+        BroadcastJobModel
+    """
+    total_query = select(func.count(UserModel.id)).filter_by(is_blocked=False)
+    total = (await session.execute(total_query)).scalar_one()
+
+    job = BroadcastJobModel(
+        created_by=created_by,
+        from_chat_id=from_chat_id,
+        message_id=message_id,
+        progress_message_id=progress_message_id,
+        status="running",
+        total=total,
+        heartbeat_at=datetime.datetime.utcnow(),
+        owner=OWNER_ID,
+    )
+    session.add(job)
+    await session.commit()
+    await session.refresh(job)
+
+    logger.info(f"Created broadcast job {job.id} for {total} users")
+    return job
+
+
+async def cancel_broadcast_job(session: AsyncSession, job_id: int) -> BroadcastJobModel | None:
+    """
+    Cancel running broadcast job.
+
+    Args:
+        session: Database session
+        job_id: Broadcast job ID
+
+    Returns:
+        BroadcastJobModel or None if not found
+    """
+    job = await session.get(BroadcastJobModel, job_id)
+    if job and job.status == "running":
+        job.status = "cancelled"
+        job.finished_at = datetime.datetime.utcnow()
+        await session.commit()
+        logger.info(f"Broadcast job {job_id} cancelled")
+    return job
+
+
+def format_broadcast_progress(job: BroadcastJobModel) -> str:
+    """
+    Format progress report for admin.
+
+    Args:
+        job: Broadcast job
+
+    Returns:
+        Progress text
+    """
+    processed = job.sent + job.failed + job.blocked
+    percent = int(processed * 100 / job.total) if job.total else 100
+    status_text = {
+        "running": "⏳ Выполняется",
+        "completed": "✅ Завершена",
+        "cancelled": "⏹ Остановлена",
+    }.get(job.status, job.status)
+
+    return (
+        f"📤 <b>Рассылка #{job.id}</b>\n\n"
+        f"Статус: {status_text}\n"
+        f"Прогресс: {processed}/{job.total} ({percent}%)\n"
+        f"├ Доставлено: {job.sent}\n"
+        f"├ Заблокировали бота: {job.blocked}\n"
+        f"└ Ошибки: {job.failed}"
+    )
+
+
+def broadcast_progress_keyboard(job: BroadcastJobModel) -> InlineKeyboardMarkup | None:
+    """
+    Create keyboard for progress message.
+
+    Args:
+        job: Broadcast job
+
+    Returns:
+        InlineKeyboardMarkup or None for finished jobs
+    """
+    if job.status != "running":
+        return None
+
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text="⏹ Остановить", callback_data=f"admin:broadcast_stop:{job.id}")],
+        ]
+    )
+
+
+def _owned_job(job_id: int) -> ColumnElement[bool]:
+    return (BroadcastJobModel.id == job_id) & (BroadcastJobModel.owner == OWNER_ID)
+
+
+async def _heartbeat(job_id: int) -> None:
+    """Keep job claimed while a batch is in flight, until ownership is lost."""
+    while True:
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        try:
+            async with sessionmaker() as session:
+                result = await session.execute(
+                    update(BroadcastJobModel)
+                    .where(_owned_job(job_id))
+                    .values(heartbeat_at=datetime.datetime.utcnow())
+                )
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Broadcast job {job_id}: heartbeat failed: {e}")
+            continue
+
+        if not result.rowcount:
+            logger.warning(f"Broadcast job {job_id} was taken over by another process")
+            return
+
+
+def _report_progress(job: BroadcastJobModel) -> None:
+    if not job.progress_message_id:
+        return
+
+    # Queued edits of the same message are merged into the latest one
+    outbound.submit(
+        EditMessageText(
+            chat_id=job.created_by,
+            message_id=job.progress_message_id,
+            text=format_broadcast_progress(job),
+            reply_markup=broadcast_progress_keyboard(job),
+        ),
+        Priority.NOTIFICATION,
+        chat_id=job.created_by,
+        coalesce_key=f"broadcast_progress:{job.id}",
+    )
+
+
+async def _send_to_user(job: BroadcastJobModel, user_id: int) -> str:
+    """
+    Copy broadcast message to one user.
+
+    Returns:
+        "sent", "blocked" or "failed"
+    """
+    try:
+        await outbound.send(
+            CopyMessage(chat_id=user_id, from_chat_id=job.from_chat_id, message_id=job.message_id),
+            Priority.BROADCAST,
+            chat_id=user_id,
+        )
+        return "sent"
+    except TelegramForbiddenError:
+        return "blocked"
+    except Exception as e:
+        logger.warning(f"Broadcast {job.id}: failed to send to user {user_id}: {e}")
+        return "failed"
+
+
+async def run_broadcast_job(job_id: int) -> None:
+    """
+    Send broadcast in batches, checkpointing progress after every batch.
+
+    Users are iterated in ascending ID order, so after restart the job
+    continues from last_user_id. At most one batch can be delivered twice.
+
+    Args:
+        job_id: Broadcast job ID
+    """
+    semaphore = asyncio.Semaphore(settings.bot.BROADCAST_CONCURRENCY)
+    last_report = 0.0
+
+    async def send(job: BroadcastJobModel, user_id: int) -> str:
+        async with semaphore:
+            return await _send_to_user(job, user_id)
+
+    logger.info(f"Broadcast job {job_id} started")
+
+    try:
+        while True:
+            # Load batch without holding session during sending
+            async with sessionmaker() as session:
+                job = await session.get(BroadcastJobModel, job_id)
+                if not job or job.status != "running":
+                    logger.info(f"Broadcast job {job_id} is not running, stopping")
+                    if job:
+                        _report_progress(job)
+                    return
+                if job.owner != OWNER_ID:
+                    logger.warning(f"Broadcast job {job_id} is owned by {job.owner}, stopping")
+                    return
+
+                query = (
+                    select(UserModel.id)
+                    .filter(UserModel.id > job.last_user_id, UserModel.is_blocked == False)  # noqa: E712
+                    .order_by(UserModel.id)
+                    .limit(settings.bot.BROADCAST_BATCH_SIZE)
+                )
+                user_ids = list((await session.execute(query)).scalars().all())
+
+                if not user_ids:
+                    job.status = "completed"
+                    job.finished_at = datetime.datetime.utcnow()
+                    await session.commit()
+                    logger.info(f"Broadcast job {job_id} completed: sent={job.sent}, "
+                                f"blocked={job.blocked}, failed={job.failed}")
+                    _report_progress(job)
+                    return
+
+            heartbeat = asyncio.create_task(_heartbeat(job_id))
+            try:
+                results = await asyncio.gather(*(send(job, user_id) for user_id in user_ids))
+            finally:
+                heartbeat.cancel()
+                await asyncio.gather(heartbeat, return_exceptions=True)
+
+            blocked_ids = [user_id for user_id, result in zip(user_ids, results) if result == "blocked"]
+            sent = results.count("sent")
+            failed = results.count("failed")
+
+            # Checkpoint
+            async with sessionmaker() as session:
+                checkpoint = await session.execute(
+                    update(BroadcastJobModel)
+                    .where(_owned_job(job_id))
+                    .values(
+                        sent=BroadcastJobModel.sent + sent,
+                        failed=BroadcastJobModel.failed + failed,
+                        blocked=BroadcastJobModel.blocked + len(blocked_ids),
+                        last_user_id=user_ids[-1],
+                        heartbeat_at=datetime.datetime.utcnow(),
+                    )
+                )
+                await session.commit()
+
+                if blocked_ids:
+                    await set_users_blocked(session, blocked_ids, is_blocked=True)
+
+                if not checkpoint.rowcount:
+                    logger.warning(f"Broadcast job {job_id} was taken over by another process, stopping")
+                    return
+
+                job = await session.get(BroadcastJobModel, job_id)
+
+            if time.monotonic() - last_report >= PROGRESS_REPORT_INTERVAL:
+                last_report = time.monotonic()
+                _report_progress(job)
+
+    except asyncio.CancelledError:
+        logger.warning(f"Broadcast job {job_id} interrupted, will be resumed from checkpoint")
+        raise
+    except Exception as e:
+        logger.exception(f"Broadcast job {job_id} failed: {e}")
+    finally:
+        _running_jobs.pop(job_id, None)
+
+
+def start_broadcast_job(job_id: int) -> None:
+    """
+    Run broadcast job in background task.
+
+    Args:
+        job_id: Broadcast job ID
+    """
+    if job_id in _running_jobs:
+        return
+
+    _running_jobs[job_id] = asyncio.create_task(run_broadcast_job(job_id))
+
+
+async def resume_broadcast_jobs() -> None:
+    """
+    Resume running jobs abandoned by a stopped process.
+
+    Job is claimed atomically by moving its heartbeat and owner, so only
+    one replica resumes it and the previous runner stops at its next
+    checkpoint.
+    """
+    now = datetime.datetime.utcnow()
+    stale_before = now - datetime.timedelta(seconds=STALE_JOB_SECONDS)
+
+    try:
+        async with sessionmaker() as session:
+            query = (
+                update(BroadcastJobModel)
+                .where(
+                    BroadcastJobModel.status == "running",
+                    (BroadcastJobModel.heartbeat_at == None)  # noqa: E711
+                    | (BroadcastJobModel.heartbeat_at < stale_before),
+                )
+                .values(heartbeat_at=now, owner=OWNER_ID)
+                .returning(BroadcastJobModel.id)
+            )
+            job_ids = list((await session.execute(query)).scalars().all())
+            await session.commit()
+    except Exception as e:
+        logger.error(f"Error in resume_broadcast_jobs: {e}")
+        return
+
+    for job_id in job_ids:
+        logger.info(f"Resuming broadcast job {job_id} from checkpoint")
+        start_broadcast_job(job_id)
@@ -2,11 +2,37 @@
 
 from __future__ import annotations
 
+import enum
+
 from aiogram import Bot
-from aiogram.exceptions import TelegramBadRequest
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
 from loguru import logger
 
 from bot.core.config import settings
+from bot.core.rate_limiter import telegram_limiter
+
+# Errors about the user itself (deleted account, not a member, channel admin):
+# retrying won't help. Chat-level errors (missing rights) are retried.
+PERMANENT_REMOVAL_ERRORS = (
+    "participant_id_invalid",
+    "user_id_invalid",
+    "user not found",
+    "user_not_participant",
+    "member not found",
+    "user is an administrator",
+    "user_admin_invalid",
+    "can't remove chat owner",
+)
+
+
+class RemovalResult(enum.Enum):
+    """Outcome of removing user from channel."""
+
+    REMOVED = "removed"
+    # User can't be removed and never will be, don't retry
+    SKIPPED = "skipped"
+    # Temporary failure, retry later
+    FAILED = "failed"
 
 
 async def add_to_channel(bot: Bot, user_id: int) -> bool:
@@ -33,7 +59,30 @@ async def add_to_channel(bot: Bot, user_id: int) -> bool:
         return False
 
 
-async def remove_from_channel(bot: Bot, user_id: int) -> bool:
+async def create_invite_link(bot: Bot, user_id: int) -> str | None:
+    """
+    Create one-time channel invite link for user.
+
+    Args:
+        bot: Bot instance
+        user_id: User ID
+
+    Returns:
+        Invite link or None on error
+    """
+    try:
+        invite = await bot.create_chat_invite_link(
+            chat_id=settings.payment.CHANNEL_ID,
+            name=f"user {user_id}",
+            member_limit=1,
+        )
+        return invite.invite_link
+    except Exception as e:
+        logger.error(f"Failed to create invite link for user {user_id}: {e}")
+        return None
+
+
+async def remove_from_channel(bot: Bot, user_id: int) -> RemovalResult:
     """
     Remove user from channel (ban + unban).
 
@@ -42,23 +91,32 @@ async def remove_from_channel(bot: Bot, user_id: int) -> bool:
         user_id: User ID
 
     Returns:
-        True if successful, False otherwise
+        REMOVED, SKIPPED if user can't be removed (e.g. deleted account) or FAILED
     """
     try:
         # Ban user
+        await telegram_limiter.acquire()
         await bot.ban_chat_member(chat_id=settings.payment.CHANNEL_ID, user_id=user_id)
         logger.info(f"User {user_id} banned from channel {settings.payment.CHANNEL_ID}")
 
         # Immediately unban (so they can rejoin later)
+        await telegram_limiter.acquire()
         await bot.unban_chat_member(chat_id=settings.payment.CHANNEL_ID, user_id=user_id, only_if_banned=True)
         logger.info(f"User {user_id} unbanned from channel {settings.payment.CHANNEL_ID}")
-        return True
+        return RemovalResult.REMOVED
+    except TelegramRetryAfter as e:
+        telegram_limiter.pause(e.retry_after)
+        logger.warning(f"Flood control while removing user {user_id} from channel: retry after {e.retry_after}s")
+        return RemovalResult.FAILED
     except TelegramBadRequest as e:
+        if any(error in e.message.lower() for error in PERMANENT_REMOVAL_ERRORS):
+            logger.warning(f"User {user_id} can't be removed from channel, skipping: {e}")
+            return RemovalResult.SKIPPED
         logger.error(f"Failed to remove user {user_id} from channel: {e}")
-        return False
+        return RemovalResult.FAILED
     except Exception as e:
         logger.error(f"Unexpected error removing user {user_id} from channel: {e}")
-        return False
+        return RemovalResult.FAILED
 
 
 async def check_channel_membership(bot: Bot, user_id: int) -> bool:
@@ -0,0 +1,185 @@
+"""Delayed jobs queue service."""
+
+from __future__ import annotations
+
+import datetime
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import ColumnElement, delete, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.database.models import DelayedJobModel
+
+# Job kinds
+LESSON_REMINDER_JOB = "lesson_reminder"
+PAYMENT_SUCCESS_JOB = "payment_success"
+PAYMENT_FAILED_JOB = "payment_failed"
+REFERRAL_BONUS_JOB = "referral_bonus"
+
+
+async def enqueue_delayed_job(
+    session: AsyncSession,
+    kind: str,
+    user_id: int,
+    delay_seconds: float,
+    payload: dict[str, Any] | None = None,
+    dedup_key: str | None = None,
+    commit: bool = True,
+) -> None:
+    """
+    Schedule job for user, replacing pending job of the same kind and key.
+
+    Reminders use the default key, so rescheduling replaces the pending one.
+    Notifications pass a key per event (e.g. order ID), so that each of them
+    is delivered.
+
+    Args:
+        session: Database session
+        kind: Job kind
+        user_id: User ID
+        delay_seconds: Delay before job becomes due
+        payload: Optional job data
+        dedup_key: Deduplication key (user ID by default)
+        commit: Commit transaction (False to enqueue as part of caller's transaction)
+    """
+    run_at = datetime.datetime.utcnow() + datetime.timedelta(seconds=delay_seconds)
+
+    query = insert(DelayedJobModel).values(
+        kind=kind,
+        user_id=user_id,
+        dedup_key=dedup_key if dedup_key is not None else str(user_id),
+        run_at=run_at,
+        payload=payload,
+        attempts=0,
+    )
+    query = query.on_conflict_do_update(
+        constraint="uq_delayed_jobs_kind_dedup_key",
+        set_={
+            "run_at": query.excluded.run_at,
+            "payload": query.excluded.payload,
+            "attempts": 0,
+            # Running instance of the replaced job won't complete it (see complete_delayed_job)
+            "locked_until": None,
+        },
+    )
+    await session.execute(query)
+    if commit:
+        await session.commit()
+
+    logger.debug(f"Scheduled {kind} job for user {user_id} at {run_at}")
+
+
+async def claim_due_jobs(session: AsyncSession, limit: int, lease_seconds: float) -> list[DelayedJobModel]:
+    """
+    Lease due jobs.
+
+    Rows are locked with SKIP LOCKED and leased in one statement, so each
+    job is claimed by exactly one worker even with several replicas. Jobs
+    stay in the queue until completed; if the worker dies (e.g. redeploy),
+    the lease expires and another worker runs the job again. Every claim
+    counts as an attempt.
+
+    Args:
+        session: Database session
+        limit: Maximum number of jobs to claim
+        lease_seconds: Time to complete job before it is claimable again
+
+    Returns:
+        List of claimed jobs
+    """
+    now = datetime.datetime.utcnow()
+    due_ids = (
+        select(DelayedJobModel.id)
+        .filter(
+            DelayedJobModel.run_at <= now,
+            or_(DelayedJobModel.locked_until == None, DelayedJobModel.locked_until < now),  # noqa: E711
+        )
+        .order_by(DelayedJobModel.run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    query = (
+        update(DelayedJobModel)
+        .where(DelayedJobModel.id.in_(due_ids))
+        .values(
+            locked_until=now + datetime.timedelta(seconds=lease_seconds),
+            attempts=DelayedJobModel.attempts + 1,
+        )
+        .returning(DelayedJobModel)
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(query)
+    jobs = list(result.scalars().all())
+    await session.commit()
+    return jobs
+
+
+def _leased_by(job: DelayedJobModel) -> ColumnElement[bool]:
+    # Job replaced by enqueue_delayed_job in the meantime has another lease
+    return (DelayedJobModel.id == job.id) & (DelayedJobModel.locked_until == job.locked_until)
+
+
+async def extend_delayed_job_lease(session: AsyncSession, job: DelayedJobModel, lease_seconds: float) -> bool:
+    """
+    Extend lease of job that is still running.
+
+    Args:
+        session: Database session
+        job: Claimed job, its locked_until is updated
+        lease_seconds: New lease from now
+
+    Returns:
+        False if job was replaced and is no longer leased by this worker
+    """
+    locked_until = datetime.datetime.utcnow() + datetime.timedelta(seconds=lease_seconds)
+    query = (
+        update(DelayedJobModel)
+        .where(_leased_by(job))
+        .values(locked_until=locked_until)
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(query)
+    await session.commit()
+    if not result.rowcount:
+        return False
+
+    job.locked_until = locked_until
+    return True
+
+
+async def complete_delayed_job(session: AsyncSession, job: DelayedJobModel) -> None:
+    """
+    Remove finished (or abandoned) job from the queue.
+
+    Args:
+        session: Database session
+        job: Claimed job
+    """
+    await session.execute(delete(DelayedJobModel).where(_leased_by(job)))
+    await session.commit()
+
+
+async def retry_delayed_job(session: AsyncSession, job: DelayedJobModel, delay_seconds: float) -> None:
+    """
+    Release failed job for another attempt.
+
+    Job rescheduled by user in the meantime takes precedence.
+
+    Args:
+        session: Database session
+        job: Claimed job
+        delay_seconds: Delay before next attempt
+    """
+    query = (
+        update(DelayedJobModel)
+        .where(_leased_by(job))
+        .values(
+            run_at=datetime.datetime.utcnow() + datetime.timedelta(seconds=delay_seconds),
+            locked_until=None,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(query)
+    await session.commit()
@@ -5,7 +5,7 @@ from __future__ import annotations
 import datetime
 
 from loguru import logger
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from bot.database.models import PaymentModel
@@ -72,22 +72,20 @@ async def get_payment_history(session: AsyncSession, user_id: int, limit: int =
     return payments
 
 
-async def get_total_revenue(session: AsyncSession) -> dict[str, int]:
+async def get_total_revenue(session: AsyncSession, status: str | None = None) -> dict[str, int]:
     """
     Get total revenue by currency.
 
     Args:
         session: Database session
+        status: Count only payments with this status (None for all)
 
     Returns:
         Dictionary with currency as key and total amount as value
     """
-    query = select(PaymentModel)
-    result = await session.execute(query)
-    payments = result.scalars().all()
-
-    revenue: dict[str, int] = {}
-    for payment in payments:
-        revenue[payment.currency] = revenue.get(payment.currency, 0) + payment.amount
+    query = select(PaymentModel.currency, func.sum(PaymentModel.amount)).group_by(PaymentModel.currency)
+    if status is not None:
+        query = query.filter(PaymentModel.status == status)
 
-    return revenue
+    result = await session.execute(query)
+    return {currency: int(total or 0) for currency, total in result.all()}
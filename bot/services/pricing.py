@@ -0,0 +1,244 @@
+"""Tariff pricing service."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from pydantic import BaseModel
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.core.cache import cache
+from bot.core.config import settings
+from bot.core.tracing import traced
+from bot.database.models import PromocodeModel, PromocodeUsageModel, VideoReviewModel
+from bot.services.prodamus import PROMOCODES_CACHE_TAG, PromocodeInfo, generate_payment_url
+from bot.services.user_state import USER_CACHE_TAG
+
+USER_DISCOUNT_KEY = "user_discount:{user_id}"
+PAYMENT_URL_KEY = "payment_url:{user_id}:{tariff_id}:{promo_code}:{bucket}"
+
+
+class Tariff(BaseModel):
+    """Subscription tariff."""
+
+    id: str
+    days: int
+    price: int
+    title: str
+    description: str
+    emoji: str
+    badge: str | None = None
+    static_link: str | None = None  # Prepared payform without discount
+
+
+class PriceQuote(BaseModel):
+    """Tariff price for a specific user."""
+
+    tariff: Tariff
+    price: int
+    promo_code: str | None = None
+
+    @property
+    def is_discounted(self) -> bool:
+        """Check if user's discount was applied."""
+        return self.promo_code is not None
+
+
+TARIFFS: dict[str, Tariff] = {
+    tariff.id: tariff
+    for tariff in (
+        Tariff(
+            id="7",
+            days=settings.payment.TARIFF_7_DAYS,
+            price=settings.payment.TARIFF_7_PRICE,
+            title="Пробная неделя",
+            description="Доступ к занятиям на 7 дней",
+            emoji="🌱",
+            static_link="https://payform.ru/4lanBvw/",
+        ),
+        Tariff(
+            id="30",
+            days=settings.payment.TARIFF_30_DAYS,
+            price=settings.payment.TARIFF_30_PRICE,
+            title="1 месяц",
+            description="Доступ к занятиям на 30 дней",
+            emoji="📅",
+            static_link="https://payform.ru/4kanBwA/",
+        ),
+        Tariff(
+            id="90",
+            days=settings.payment.TARIFF_90_DAYS,
+            price=settings.payment.TARIFF_90_PRICE,
+            title="3 месяца",
+            description="Доступ к занятиям на 90 дней",
+            emoji="📆",
+            badge="-20%",
+            static_link="https://payform.ru/5canBwZ/",
+        ),
+        Tariff(
+            id="180",
+            days=settings.payment.TARIFF_180_DAYS,
+            price=settings.payment.TARIFF_180_PRICE,
+            title="Полгода",
+            description="Доступ к занятиям на 180 дней",
+            emoji="🌟",
+            badge="-25%",
+            static_link="https://payform.ru/66anBxq/",
+        ),
+        Tariff(
+            id="365",
+            days=settings.payment.TARIFF_365_DAYS,
+            price=settings.payment.TARIFF_365_PRICE,
+            title="1 год",
+            description="Доступ к занятиям на 365 дней",
+            emoji="⭐",
+            badge="-35%",
+            static_link="https://payform.ru/6tanBxN/",
+        ),
+    )
+}
+
+
+@traced()
+async def get_user_discount(session: AsyncSession, user_id: int) -> PromocodeInfo | None:
+    """
+    Get promocode the user is eligible for (cached).
+
+    Eligibility (video review left, promocode active, not exhausted and
+    not used by the user yet) is checked with a single query.
+
+    Args:
+        session: Database session
+        user_id: User ID
+
+    Returns:
+        PromocodeInfo or None if no discount applies
+    """
+
+    async def fetch() -> PromocodeInfo | None:
+        query = select(
+            PromocodeModel.id,
+            PromocodeModel.code,
+            PromocodeModel.discount_amount,
+            PromocodeModel.max_uses,
+            PromocodeModel.current_uses,
+        ).where(
+            PromocodeModel.code == settings.payment.VIDEO_REVIEW_PROMO.upper(),
+            PromocodeModel.is_active == True,  # noqa: E712
+            (PromocodeModel.max_uses == None)  # noqa: E711
+            | (PromocodeModel.current_uses < PromocodeModel.max_uses),
+            exists().where(VideoReviewModel.user_id == user_id),
+            ~exists().where(
+                PromocodeUsageModel.user_id == user_id,
+                PromocodeUsageModel.promocode_id == PromocodeModel.id,
+            ),
+        )
+        row = (await session.execute(query)).one_or_none()
+        if row is None:
+            return None
+        return PromocodeInfo.model_validate(row._asdict())
+
+    return await cache.get_or_load(
+        USER_DISCOUNT_KEY.format(user_id=user_id),
+        fetch,
+        ttl=settings.cache.USER_STATE_TTL,
+        model=PromocodeInfo,
+        tags=[USER_CACHE_TAG.format(user_id=user_id), PROMOCODES_CACHE_TAG],
+    )
+
+
+def quote(tariff: Tariff, discount: PromocodeInfo | None) -> PriceQuote:
+    """
+    Apply discount to tariff price.
+
+    Args:
+        tariff: Tariff
+        discount: User's promocode or None
+
+    Returns:
+        PriceQuote
+    """
+    if discount is not None:
+        price = max(0, tariff.price - discount.discount_amount)
+        if price < tariff.price:
+            return PriceQuote(tariff=tariff, price=price, promo_code=discount.code)
+
+    return PriceQuote(tariff=tariff, price=tariff.price)
+
+
+async def get_price_quotes(session: AsyncSession, user_id: int) -> list[PriceQuote]:
+    """
+    Get prices of all tariffs for user.
+
+    Args:
+        session: Database session
+        user_id: User ID
+
+    Returns:
+        Quotes in catalog order
+    """
+    discount = await get_user_discount(session, user_id)
+    return [quote(tariff, discount) for tariff in TARIFFS.values()]
+
+
+def _build_payment_url(user_id: int, price_quote: PriceQuote) -> str:
+    tariff = price_quote.tariff
+
+    # Format: user_{user_id}_days_{days}_{timestamp}[_promo_{code}]
+    order_id = f"user_{user_id}_days_{tariff.days}_{int(time.time())}"
+    if price_quote.promo_code:
+        order_id += f"_promo_{price_quote.promo_code}"
+
+    # Static payform can't carry a discount
+    if tariff.static_link and not price_quote.promo_code:
+        return f"{tariff.static_link}?order_id={order_id}"
+
+    return generate_payment_url(order_id=order_id, amount=price_quote.price, products=tariff.title)
+
+
+async def get_payment_url(user_id: int, price_quote: PriceQuote) -> str:
+    """
+    Get payment URL for quote (cached per time bucket).
+
+    The same URL (and order ID) is reused within PAYMENT_URL_TTL, so
+    repeated views of the tariff screen don't re-sign links. Cached URLs
+    are dropped with user's cache tag, e.g. after a successful payment,
+    so a paid order ID is never offered again.
+
+    Args:
+        user_id: User ID
+        price_quote: Price quote
+
+    Returns:
+        Payment URL
+    """
+    ttl = settings.cache.PAYMENT_URL_TTL
+    key = PAYMENT_URL_KEY.format(
+        user_id=user_id,
+        tariff_id=price_quote.tariff.id,
+        promo_code=price_quote.promo_code or "-",
+        bucket=int(time.time()) // ttl,
+    )
+
+    async def build() -> str:
+        return _build_payment_url(user_id, price_quote)
+
+    return await cache.get_or_load(key, build, ttl=ttl, tags=[USER_CACHE_TAG.format(user_id=user_id)])
+
+
+@traced()
+async def get_payment_urls(user_id: int, quotes: list[PriceQuote]) -> dict[str, str]:
+    """
+    Get payment URLs for several quotes.
+
+    Args:
+        user_id: User ID
+        quotes: Price quotes
+
+    Returns:
+        Dictionary of tariff_id -> URL
+    """
+    urls = await asyncio.gather(*(get_payment_url(user_id, price_quote) for price_quote in quotes))
+    return {price_quote.tariff.id: url for price_quote, url in zip(quotes, urls)}
@@ -2,16 +2,42 @@
 
 from __future__ import annotations
 
+import datetime
 import hashlib
 import hmac
 from urllib.parse import urlencode
 
 from loguru import logger
+from pydantic import BaseModel
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from bot.core.cache import cache
 from bot.core.config import settings
-from bot.database.models import PaymentModel, PromocodeModel, PromocodeUsageModel
+from bot.database.models import PaymentModel, PromocodeModel, PromocodeUsageModel, ReferralModel
+from bot.services.delayed_jobs import (
+    PAYMENT_FAILED_JOB,
+    PAYMENT_SUCCESS_JOB,
+    REFERRAL_BONUS_JOB,
+    enqueue_delayed_job,
+)
+from bot.services.referrals import mark_referral_paid
+from bot.services.subscriptions import extend_subscription
+from bot.services.user_state import invalidate_user_state
+
+PROMOCODE_KEY = "promocode:{code}"
+PROMOCODES_CACHE_TAG = "promocodes"
+
+
+class PromocodeInfo(BaseModel):
+    """Cached snapshot of active promocode."""
+
+    id: int
+    code: str
+    discount_amount: int
+    max_uses: int | None
+    current_uses: int
 
 
 def generate_payment_url(
@@ -62,12 +88,47 @@ def generate_payment_url(
     return f"{base_url}?{urlencode(params)}"
 
 
+async def get_promocode(session: AsyncSession, code: str) -> PromocodeInfo | None:
+    """
+    Get active promocode (cached).
+
+    Args:
+        session: Database session
+        code: Promocode string
+
+    Returns:
+        PromocodeInfo or None if not found or inactive
+    """
+    code = code.upper()
+
+    async def fetch() -> PromocodeInfo | None:
+        query = select(PromocodeModel).filter_by(code=code, is_active=True)
+        promocode = (await session.execute(query)).scalar_one_or_none()
+        if not promocode:
+            return None
+        return PromocodeInfo(
+            id=promocode.id,
+            code=promocode.code,
+            discount_amount=promocode.discount_amount,
+            max_uses=promocode.max_uses,
+            current_uses=promocode.current_uses,
+        )
+
+    return await cache.get_or_load(
+        PROMOCODE_KEY.format(code=code),
+        fetch,
+        ttl=settings.cache.PROMOCODE_CACHE_TTL,
+        model=PromocodeInfo,
+        tags=[PROMOCODES_CACHE_TAG],
+    )
+
+
 async def apply_promocode(
     session: AsyncSession,
     user_id: int,
     code: str,
     base_amount: int,
-) -> tuple[int, PromocodeModel | None]:
+) -> tuple[int, PromocodeInfo | None]:
     """
     Apply promocode and return discounted amount.
 
@@ -78,12 +139,10 @@ async def apply_promocode(
         base_amount: Base amount before discount
 
     Returns:
-        Tuple of (final_amount, promocode_model or None)
+        Tuple of (final_amount, promocode or None)
     """
     # Find promocode
-    query = select(PromocodeModel).filter_by(code=code.upper(), is_active=True)
-    result = await session.execute(query)
-    promocode = result.scalar_one_or_none()
+    promocode = await get_promocode(session, code)
 
     if not promocode:
         logger.warning(f"Promocode '{code}' not found or inactive")
@@ -115,6 +174,7 @@ async def record_promocode_usage(
     session: AsyncSession,
     user_id: int,
     promocode: PromocodeModel,
+    commit: bool = True,
 ) -> None:
     """
     Record promocode usage.
@@ -123,6 +183,7 @@ async def record_promocode_usage(
         session: Database session
         user_id: User ID
         promocode: Promocode model
+        commit: Commit transaction (False to let caller commit)
     """
     # Create usage record
     usage = PromocodeUsageModel(
@@ -134,7 +195,9 @@ async def record_promocode_usage(
     # Increment usage counter
     promocode.current_uses += 1
 
-    await session.commit()
+    if commit:
+        await session.commit()
+        await cache.invalidate_tags(PROMOCODES_CACHE_TAG)
     logger.info(f"Recorded promocode usage: user {user_id}, code '{promocode.code}'")
 
 
@@ -204,3 +267,182 @@ async def update_payment_status(
         logger.info(f"Updated payment {payment_id} status to '{status}'")
 
     return payment
+
+
+async def _claim_order(
+    session: AsyncSession,
+    order_id: str,
+    user_id: int,
+    amount: int,
+    subscription_days: int,
+    payment_id: str | None,
+    status: str,
+) -> bool:
+    """
+    Insert payment for order or move it to final status.
+
+    Concurrent webhooks for the same order wait on the unique order_id
+    until the first transaction finishes.
+
+    Returns:
+        True if this call changed the payment, False for duplicate webhook
+    """
+    query = insert(PaymentModel).values(
+        user_id=user_id,
+        amount=amount,
+        currency="RUB",
+        subscription_days=subscription_days,
+        payment_provider="prodamus",
+        payment_id=payment_id,
+        order_id=order_id,
+        status=status,
+    )
+    query = query.on_conflict_do_update(
+        index_elements=[PaymentModel.order_id],
+        set_={"status": query.excluded.status, "payment_id": query.excluded.payment_id},
+        # Successful payment is final, failed one can be paid on retry
+        where=(PaymentModel.status != "success") & (PaymentModel.status != query.excluded.status),
+    ).returning(PaymentModel.id)
+
+    result = await session.execute(query)
+    return result.scalar_one_or_none() is not None
+
+
+async def _apply_referral_bonus(session: AsyncSession, referred_user_id: int) -> int | None:
+    """
+    Give bonus days to referrer of user who just paid.
+
+    Returns:
+        Referrer ID or None if there is no pending bonus
+    """
+    query = (
+        select(ReferralModel)
+        .filter_by(referred_id=referred_user_id, is_bonus_given=False)
+        .with_for_update()
+    )
+    referral = (await session.execute(query)).scalars().first()
+    if not referral:
+        return None
+
+    bonus_days = settings.payment.REFERRAL_BONUS_DAYS
+    await extend_subscription(session, referral.referrer_id, bonus_days, commit=False)
+
+    referral.is_bonus_given = True
+    referral.bonus_given_at = datetime.datetime.utcnow()
+    await mark_referral_paid(session, referral)
+
+    await enqueue_delayed_job(
+        session,
+        REFERRAL_BONUS_JOB,
+        referral.referrer_id,
+        0,
+        payload={"days": bonus_days},
+        dedup_key=str(referred_user_id),
+        commit=False,
+    )
+
+    logger.info(f"Gave referral bonus to user {referral.referrer_id}: +{bonus_days} days")
+    return referral.referrer_id
+
+
+async def process_successful_payment(
+    session: AsyncSession,
+    order_id: str,
+    user_id: int,
+    amount: int,
+    subscription_days: int,
+    payment_id: str | None = None,
+    promo_code: str | None = None,
+) -> bool:
+    """
+    Apply successful payment in one transaction.
+
+    Records payment, extends subscription, records promocode usage, gives
+    referral bonus and enqueues user notifications. Repeated webhooks for
+    the same order are ignored.
+
+    Args:
+        session: Database session
+        order_id: Order ID from payment link
+        user_id: User ID
+        amount: Amount in rubles
+        subscription_days: Number of days
+        payment_id: Prodamus payment ID
+        promo_code: Promocode used in order
+
+    Returns:
+        True if payment was applied, False if it was already processed
+    """
+    if not await _claim_order(session, order_id, user_id, amount, subscription_days, payment_id, "success"):
+        await session.rollback()
+        logger.info(f"Order {order_id} already processed, skipping")
+        return False
+
+    try:
+        await extend_subscription(session, user_id, subscription_days, commit=False)
+
+        promocode = None
+        if promo_code:
+            promo_query = select(PromocodeModel).filter_by(code=promo_code).with_for_update()
+            promocode = (await session.execute(promo_query)).scalar_one_or_none()
+            if promocode:
+                await record_promocode_usage(session, user_id, promocode, commit=False)
+
+        referrer_id = await _apply_referral_bonus(session, user_id)
+
+        await enqueue_delayed_job(
+            session,
+            PAYMENT_SUCCESS_JOB,
+            user_id,
+            0,
+            payload={"days": subscription_days},
+            dedup_key=order_id,
+            commit=False,
+        )
+
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+
+    await invalidate_user_state(user_id)
+    if referrer_id:
+        await invalidate_user_state(referrer_id)
+    if promocode:
+        await cache.invalidate_tags(PROMOCODES_CACHE_TAG)
+
+    logger.info(f"Payment success for user {user_id}: {subscription_days} days (order {order_id})")
+    return True
+
+
+async def process_failed_payment(
+    session: AsyncSession,
+    order_id: str,
+    user_id: int,
+    amount: int,
+    subscription_days: int,
+    payment_id: str | None = None,
+) -> bool:
+    """
+    Record failed payment and enqueue user notification.
+
+    Args:
+        session: Database session
+        order_id: Order ID from payment link
+        user_id: User ID
+        amount: Amount in rubles
+        subscription_days: Number of days
+        payment_id: Prodamus payment ID
+
+    Returns:
+        True if payment was recorded, False if order was already paid
+    """
+    if not await _claim_order(session, order_id, user_id, amount, subscription_days, payment_id, "failed"):
+        await session.rollback()
+        return False
+
+    await enqueue_delayed_job(session, PAYMENT_FAILED_JOB, user_id, 0, dedup_key=order_id, commit=False)
+    await session.commit()
+
+    logger.warning(f"Payment failed for user {user_id} (order {order_id})")
+    return True
@@ -0,0 +1,246 @@
+"""Referral program service."""
+
+from __future__ import annotations
+
+import html
+import uuid
+
+from loguru import logger
+from pydantic import BaseModel
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.core.redis import CustomRedis
+from bot.core.tracing import traced
+from bot.database.models import ReferralModel, UserModel
+
+REFERRAL_LEADERBOARD_KEY = "referral_leaderboard"
+
+# Leaderboard is rebuilt from users table after this period to heal drift
+LEADERBOARD_TTL = 24 * 60 * 60
+
+LEADERBOARD_REBUILD_BATCH = 1000
+# Temporary set of an interrupted rebuild expires after this many seconds
+LEADERBOARD_REBUILD_TTL = 10 * 60
+
+
+class ReferralStats(BaseModel):
+    """User's referral counters."""
+
+    total: int = 0
+    paid: int = 0
+
+
+class LeaderboardEntry(BaseModel):
+    """Referral leaderboard row."""
+
+    user_id: int
+    first_name: str
+    username: str | None
+    referrals: int
+    paid_referrals: int
+
+
+async def create_referral(
+    session: AsyncSession,
+    referrer_id: int,
+    referred_id: int,
+    redis: CustomRedis | None = None,
+) -> None:
+    """
+    Create referral and increment referrer's counter in one transaction.
+
+    Args:
+        session: Database session
+        referrer_id: User who invited
+        referred_id: Invited user
+        redis: Redis client to update leaderboard (optional)
+    """
+    session.add(ReferralModel(referrer_id=referrer_id, referred_id=referred_id))
+    query = (
+        update(UserModel)
+        .where(UserModel.id == referrer_id)
+        .values(referrals_count=UserModel.referrals_count + 1)
+        .returning(UserModel.referrals_count)
+    )
+    referrals_count = (await session.execute(query)).scalar_one()
+    await session.commit()
+
+    logger.info(f"Created referral: {referrer_id} → {referred_id}")
+
+    if redis is None:
+        return
+
+    try:
+        # Absolute score keeps set consistent with DB; a missing set is
+        # rebuilt in full on next read instead of being filled partially
+        if await redis.exists(REFERRAL_LEADERBOARD_KEY):
+            await redis.zadd(REFERRAL_LEADERBOARD_KEY, {str(referrer_id): referrals_count})
+    except Exception as e:
+        logger.warning(f"Failed to update referral leaderboard: {e}")
+
+
+async def mark_referral_paid(session: AsyncSession, referral: ReferralModel) -> None:
+    """
+    Increment referrer's paid referrals counter (caller commits).
+
+    Args:
+        session: Database session
+        referral: Referral whose bonus was just given
+    """
+    await session.execute(
+        update(UserModel)
+        .where(UserModel.id == referral.referrer_id)
+        .values(paid_referrals_count=UserModel.paid_referrals_count + 1)
+    )
+
+
+@traced()
+async def get_referral_stats(session: AsyncSession, user_id: int) -> ReferralStats:
+    """
+    Get user's referral counters.
+
+    Args:
+        session: Database session
+        user_id: User ID
+
+    Returns:
+        ReferralStats
+    """
+    query = select(UserModel.referrals_count, UserModel.paid_referrals_count).where(UserModel.id == user_id)
+    row = (await session.execute(query)).one_or_none()
+    if row is None:
+        return ReferralStats()
+    return ReferralStats(total=row.referrals_count, paid=row.paid_referrals_count)
+
+
+async def rebuild_referral_leaderboard(session: AsyncSession, redis: CustomRedis) -> int:
+    """
+    Rebuild leaderboard sorted set from users table.
+
+    The set is filled under a temporary key unique to this rebuild and
+    renamed, so readers never see a partial leaderboard, even with
+    concurrent rebuilds.
+
+    Args:
+        session: Database session
+        redis: Redis client
+
+    Returns:
+        Number of users in leaderboard
+    """
+    tmp_key = f"{REFERRAL_LEADERBOARD_KEY}:rebuild:{uuid.uuid4().hex}"
+    query = (
+        select(UserModel.id, UserModel.referrals_count)
+        .where(UserModel.referrals_count > 0)
+        .execution_options(yield_per=LEADERBOARD_REBUILD_BATCH)
+    )
+
+    total = 0
+    result = await session.stream(query)
+    async for rows in result.partitions():
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(tmp_key, {str(user_id): count for user_id, count in rows})
+            pipe.expire(tmp_key, LEADERBOARD_REBUILD_TTL)
+            await pipe.execute()
+        total += len(rows)
+
+    if total:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.rename(tmp_key, REFERRAL_LEADERBOARD_KEY)
+            pipe.expire(REFERRAL_LEADERBOARD_KEY, LEADERBOARD_TTL)
+            await pipe.execute()
+
+    logger.info(f"Rebuilt referral leaderboard with {total} users")
+    return total
+
+
+async def _get_leader_ids(session: AsyncSession, redis: CustomRedis | None, limit: int) -> list[int]:
+    if redis is not None:
+        try:
+            if not await redis.exists(REFERRAL_LEADERBOARD_KEY):
+                await rebuild_referral_leaderboard(session, redis)
+            members = await redis.zrevrange(REFERRAL_LEADERBOARD_KEY, 0, limit - 1)
+            return [int(member) for member in members]
+        except Exception as e:
+            logger.warning(f"Referral leaderboard unavailable, falling back to SQL: {e}")
+
+    query = (
+        select(UserModel.id)
+        .where(UserModel.referrals_count > 0)
+        .order_by(UserModel.referrals_count.desc(), UserModel.id)
+        .limit(limit)
+    )
+    return list((await session.execute(query)).scalars().all())
+
+
+async def get_referral_leaderboard(
+    session: AsyncSession,
+    redis: CustomRedis | None = None,
+    limit: int = 10,
+) -> list[LeaderboardEntry]:
+    """
+    Get top referrers.
+
+    Ranking comes from Redis sorted set when available (ix_users_referrals_count
+    otherwise), details are loaded by primary key.
+
+    Args:
+        session: Database session
+        redis: Redis client (optional)
+        limit: Number of entries
+
+    Returns:
+        Entries ordered by referrals count
+    """
+    leader_ids = await _get_leader_ids(session, redis, limit)
+    if not leader_ids:
+        return []
+
+    query = select(
+        UserModel.id,
+        UserModel.first_name,
+        UserModel.username,
+        UserModel.referrals_count,
+        UserModel.paid_referrals_count,
+    ).where(UserModel.id.in_(leader_ids))
+    rows = {row.id: row for row in (await session.execute(query)).all()}
+
+    entries = [
+        LeaderboardEntry(
+            user_id=row.id,
+            first_name=row.first_name,
+            username=row.username,
+            referrals=row.referrals_count,
+            paid_referrals=row.paid_referrals_count,
+        )
+        for row in (rows.get(user_id) for user_id in leader_ids)
+        if row is not None
+    ]
+    # Counters in DB are authoritative if sorted set lags behind
+    entries.sort(key=lambda entry: entry.referrals, reverse=True)
+    return entries
+
+
+def format_referral_leaderboard(entries: list[LeaderboardEntry]) -> str:
+    """
+    Format referral leaderboard for admin.
+
+    Args:
+        entries: Leaderboard entries
+
+    Returns:
+        Leaderboard text
+    """
+    lines = ["🏆 <b>Топ рефереров</b>", ""]
+    if not entries:
+        lines.append("Приглашений пока нет")
+
+    for place, entry in enumerate(entries, start=1):
+        username = f" @{html.escape(entry.username)}" if entry.username else ""
+        lines.append(
+            f"{place}. <a href=\"tg://user?id={entry.user_id}\">{html.escape(entry.first_name)}</a>{username} — "
+            f"{entry.referrals} приглашений, {entry.paid_referrals} оплатили"
+        )
+
+    return "\n".join(lines)
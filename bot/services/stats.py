@@ -0,0 +1,237 @@
+"""Admin statistics service."""
+
+from __future__ import annotations
+
+import datetime
+
+from pydantic import BaseModel
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.core.cache import cache
+from bot.core.config import settings
+from bot.database.models import LessonProgressModel, PaymentModel, SubscriptionModel, UserModel
+
+ADMIN_STATS_KEY = "admin_stats"
+
+# Days shown in revenue by day breakdown
+REVENUE_DAYS = 7
+
+
+class GroupStats(BaseModel):
+    """Payments count and amount for one group."""
+
+    count: int
+    amount: int
+
+
+class AdminStats(BaseModel):
+    """Aggregated bot statistics."""
+
+    generated_at: datetime.datetime
+
+    total_users: int
+    new_users_today: int
+    new_users_week: int
+    blocked_users: int
+
+    active_subscribers: int
+    expiring_week: int
+    expired_week: int
+    inactive_subscriptions: int
+
+    lesson_started: int
+    lesson_watched: int
+    paying_users: int
+
+    revenue_by_currency: dict[str, GroupStats]
+    payments_by_status: dict[str, GroupStats]
+    revenue_by_tariff: dict[int, GroupStats]
+    revenue_by_day: dict[datetime.date, GroupStats]
+
+    @property
+    def paying_conversion(self) -> float:
+        """Share of users who paid at least once, percent."""
+        return self.paying_users * 100 / self.total_users if self.total_users else 0.0
+
+    @property
+    def lesson_conversion(self) -> float:
+        """Share of users who started free lesson, percent."""
+        return self.lesson_started * 100 / self.total_users if self.total_users else 0.0
+
+
+async def _fetch_admin_stats(session: AsyncSession) -> AdminStats:
+    now = datetime.datetime.utcnow()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    week_ago = now - datetime.timedelta(days=7)
+    week_ahead = now + datetime.timedelta(days=7)
+    success = PaymentModel.status == "success"
+
+    users = (
+        await session.execute(
+            select(
+                func.count(),
+                func.count().filter(UserModel.created_at >= today),
+                func.count().filter(UserModel.created_at >= week_ago),
+                func.count().filter(UserModel.is_blocked == True),  # noqa: E712
+            ).select_from(UserModel)
+        )
+    ).one()
+
+    is_current = (SubscriptionModel.is_active == True) & (SubscriptionModel.expires_at > now)  # noqa: E712
+    subscriptions = (
+        await session.execute(
+            select(
+                func.count().filter(is_current),
+                func.count().filter(is_current & (SubscriptionModel.expires_at <= week_ahead)),
+                func.count().filter(SubscriptionModel.expires_at.between(week_ago, now)),
+                func.count().filter(SubscriptionModel.is_active == False),  # noqa: E712
+            ).select_from(SubscriptionModel)
+        )
+    ).one()
+
+    lessons = (
+        await session.execute(
+            select(
+                func.count(),
+                func.count().filter(LessonProgressModel.watched_free_lesson == True),  # noqa: E712
+            ).select_from(LessonProgressModel)
+        )
+    ).one()
+
+    paying_users = (
+        await session.execute(select(func.count(func.distinct(PaymentModel.user_id))).where(success))
+    ).scalar_one()
+
+    amount = func.coalesce(func.sum(PaymentModel.amount), 0)
+
+    by_status_currency = (
+        await session.execute(
+            select(PaymentModel.status, PaymentModel.currency, func.count(), amount)
+            .group_by(PaymentModel.status, PaymentModel.currency)
+        )
+    ).all()
+
+    by_tariff = (
+        await session.execute(
+            select(PaymentModel.subscription_days, func.count(), amount)
+            .where(success)
+            .group_by(PaymentModel.subscription_days)
+            .order_by(PaymentModel.subscription_days)
+        )
+    ).all()
+
+    day = cast(PaymentModel.created_at, Date)
+    by_day = (
+        await session.execute(
+            select(day, func.count(), amount)
+            .where(success, PaymentModel.created_at >= today - datetime.timedelta(days=REVENUE_DAYS - 1))
+            .group_by(day)
+            .order_by(day)
+        )
+    ).all()
+
+    revenue_by_currency: dict[str, GroupStats] = {}
+    payments_by_status: dict[str, GroupStats] = {}
+    for status, currency, count, total in by_status_currency:
+        group = payments_by_status.setdefault(status, GroupStats(count=0, amount=0))
+        group.count += count
+        group.amount += total
+        if status == "success":
+            revenue_by_currency[currency] = GroupStats(count=count, amount=total)
+
+    return AdminStats(
+        generated_at=now,
+        total_users=users[0],
+        new_users_today=users[1],
+        new_users_week=users[2],
+        blocked_users=users[3],
+        active_subscribers=subscriptions[0],
+        expiring_week=subscriptions[1],
+        expired_week=subscriptions[2],
+        inactive_subscriptions=subscriptions[3],
+        lesson_started=lessons[0],
+        lesson_watched=lessons[1],
+        paying_users=paying_users,
+        revenue_by_currency=revenue_by_currency,
+        payments_by_status=payments_by_status,
+        revenue_by_tariff={days: GroupStats(count=count, amount=total) for days, count, total in by_tariff},
+        revenue_by_day={day: GroupStats(count=count, amount=total) for day, count, total in by_day},
+    )
+
+
+async def get_admin_stats(session: AsyncSession) -> AdminStats:
+    """
+    Get aggregated statistics (cached for a short time).
+
+    All numbers are computed with SQL aggregates, no rows are loaded.
+
+    Args:
+        session: Database session
+
+    Returns:
+        AdminStats
+    """
+    return await cache.get_or_load(
+        ADMIN_STATS_KEY,
+        lambda: _fetch_admin_stats(session),
+        ttl=settings.cache.ADMIN_STATS_TTL,
+        model=AdminStats,
+    )
+
+
+def format_admin_stats(stats: AdminStats) -> str:
+    """
+    Format statistics for admin.
+
+    Args:
+        stats: Aggregated statistics
+
+    Returns:
+        Stats text
+    """
+    lines = [
+        "📊 <b>Статистика</b>",
+        "",
+        "👥 <b>Пользователи</b>",
+        f"├ Всего: {stats.total_users}",
+        f"├ Новых сегодня: {stats.new_users_today}",
+        f"├ Новых за 7 дней: {stats.new_users_week}",
+        f"└ Заблокировали бота: {stats.blocked_users}",
+        "",
+        "💎 <b>Подписки</b>",
+        f"├ Активных: {stats.active_subscribers}",
+        f"├ Истекают в ближайшие 7 дней: {stats.expiring_week}",
+        f"├ Истекли за 7 дней: {stats.expired_week}",
+        f"└ Неактивных: {stats.inactive_subscriptions}",
+        "",
+        "📈 <b>Конверсии</b>",
+        f"├ Начали урок: {stats.lesson_started} ({stats.lesson_conversion:.1f}%)",
+        f"├ Досмотрели урок: {stats.lesson_watched}",
+        f"└ Оплатили: {stats.paying_users} ({stats.paying_conversion:.1f}%)",
+        "",
+        "💰 <b>Выручка</b>",
+    ]
+
+    if stats.revenue_by_currency:
+        for currency, group in stats.revenue_by_currency.items():
+            lines.append(f"• {group.amount} {currency} ({group.count} оплат)")
+    else:
+        lines.append("• Оплат пока нет")
+
+    if stats.revenue_by_tariff:
+        lines += ["", "📅 <b>По тарифам</b>"]
+        for days, group in stats.revenue_by_tariff.items():
+            lines.append(f"• {days} дн.: {group.count} оплат, {group.amount} ₽")
+
+    if stats.revenue_by_day:
+        lines += ["", f"🗓 <b>За {REVENUE_DAYS} дней</b>"]
+        for day, group in stats.revenue_by_day.items():
+            lines.append(f"• {day:%d.%m}: {group.count} оплат, {group.amount} ₽")
+
+    if stats.payments_by_status:
+        statuses = ", ".join(f"{status}: {group.count}" for status, group in stats.payments_by_status.items())
+        lines += ["", f"🧾 Платежи по статусам: {statuses}"]
+
+    lines += ["", f"<i>Обновлено: {stats.generated_at:%d.%m.%Y %H:%M} UTC</i>"]
+    return "\n".join(lines)
@@ -0,0 +1,174 @@
+"""Admin subscriber list service."""
+
+from __future__ import annotations
+
+import datetime
+import html
+
+from pydantic import BaseModel
+from sqlalchemy import func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.database.models import SubscriptionModel, UserModel
+
+SUBSCRIBERS_PAGE_SIZE = 20
+
+# Subscriptions ending within this period are "expiring"
+EXPIRING_DAYS = 7
+
+SUBSCRIBER_FILTERS = {
+    "all": "Все",
+    "active": "Активные",
+    "expiring": "Истекают",
+    "expired": "Истекшие",
+}
+
+
+class SubscriberItem(BaseModel):
+    """Subscriber list row."""
+
+    user_id: int
+    first_name: str
+    username: str | None
+    expires_at: datetime.datetime
+    is_active: bool
+
+
+class SubscribersPage(BaseModel):
+    """One page of subscriber list."""
+
+    items: list[SubscriberItem]
+    next_cursor: str | None = None
+
+
+def _encode_cursor(expires_at: datetime.datetime, user_id: int) -> str:
+    return f"{expires_at.isoformat()}|{user_id}"
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime.datetime, int]:
+    expires_at, user_id = cursor.split("|")
+    return datetime.datetime.fromisoformat(expires_at), int(user_id)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def get_subscribers_page(
+    session: AsyncSession,
+    status: str = "all",
+    search: str | None = None,
+    cursor: str | None = None,
+    limit: int = SUBSCRIBERS_PAGE_SIZE,
+) -> SubscribersPage:
+    """
+    Get page of subscribers ordered by (expires_at, user_id).
+
+    Keyset pagination: the page starts right after cursor, so every page
+    is one range scan on ix_subscriptions_expires_at_user_id no matter
+    how deep it is. Expired subscriptions are listed newest first.
+
+    Args:
+        session: Database session
+        status: One of SUBSCRIBER_FILTERS
+        search: Username or first name prefix (case-insensitive)
+        cursor: next_cursor of previous page, None for the first page
+        limit: Page size
+
+    Returns:
+        SubscribersPage
+    """
+    now = datetime.datetime.utcnow()
+    key = tuple_(SubscriptionModel.expires_at, SubscriptionModel.user_id)
+    descending = status == "expired"
+
+    query = select(
+        UserModel.id,
+        UserModel.first_name,
+        UserModel.username,
+        SubscriptionModel.expires_at,
+        SubscriptionModel.is_active,
+    ).join(UserModel, UserModel.id == SubscriptionModel.user_id)
+
+    if status == "active":
+        query = query.where(SubscriptionModel.is_active == True, SubscriptionModel.expires_at > now)  # noqa: E712
+    elif status == "expiring":
+        query = query.where(
+            SubscriptionModel.is_active == True,  # noqa: E712
+            SubscriptionModel.expires_at > now,
+            SubscriptionModel.expires_at <= now + datetime.timedelta(days=EXPIRING_DAYS),
+        )
+    elif status == "expired":
+        query = query.where(SubscriptionModel.expires_at <= now)
+
+    if search:
+        # Prefix match is served by ix_users_*_prefix (text_pattern_ops)
+        pattern = _escape_like(search.lstrip("@").lower()) + "%"
+        query = query.where(
+            or_(
+                func.lower(UserModel.username).like(pattern, escape="\\"),
+                func.lower(UserModel.first_name).like(pattern, escape="\\"),
+            )
+        )
+
+    if cursor:
+        after = _decode_cursor(cursor)
+        query = query.where(key < after if descending else key > after)
+
+    if descending:
+        query = query.order_by(SubscriptionModel.expires_at.desc(), SubscriptionModel.user_id.desc())
+    else:
+        query = query.order_by(SubscriptionModel.expires_at, SubscriptionModel.user_id)
+
+    # One extra row tells whether next page exists
+    rows = (await session.execute(query.limit(limit + 1))).all()
+
+    items = [
+        SubscriberItem(
+            user_id=row.id,
+            first_name=row.first_name,
+            username=row.username,
+            expires_at=row.expires_at,
+            is_active=row.is_active,
+        )
+        for row in rows[:limit]
+    ]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = _encode_cursor(items[-1].expires_at, items[-1].user_id)
+
+    return SubscribersPage(items=items, next_cursor=next_cursor)
+
+
+def format_subscribers_page(page: SubscribersPage, status: str, search: str | None, page_number: int) -> str:
+    """
+    Format subscriber list page for admin.
+
+    Args:
+        page: Subscribers page
+        status: Applied filter
+        search: Applied search query
+        page_number: Page number starting from 1
+
+    Returns:
+        Page text
+    """
+    now = datetime.datetime.utcnow()
+    lines = [f"👥 <b>Подписчики</b> · {SUBSCRIBER_FILTERS.get(status, status)} · стр. {page_number}"]
+    if search:
+        lines.append(f"🔍 Поиск: <code>{html.escape(search)}</code>")
+    lines.append("")
+
+    if not page.items:
+        lines.append("Никого не найдено")
+
+    for item in page.items:
+        name = html.escape(item.first_name)
+        username = f" @{html.escape(item.username)}" if item.username else ""
+        mark = "✅" if item.is_active and item.expires_at > now else "❌"
+        lines.append(
+            f"{mark} <a href=\"tg://user?id={item.user_id}\">{name}</a>{username} "
+            f"<code>{item.user_id}</code> — до {item.expires_at:%d.%m.%Y}"
+        )
+
+    return "\n".join(lines)
@@ -5,12 +5,16 @@ from __future__ import annotations
 import datetime
 
 from loguru import logger
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from bot.core.sharding import ALL_USERS, Shard
+from bot.core.tracing import traced
 from bot.database.models import SubscriptionModel
+from bot.services.user_state import invalidate_user_state, invalidate_users_state, load_user_state
 
 
+@traced()
 async def get_subscription(session: AsyncSession, user_id: int) -> SubscriptionModel | None:
     """
     Get user subscription.
@@ -38,29 +42,36 @@ async def check_expiry(session: AsyncSession, user_id: int) -> bool:
     Returns:
         True if subscription is active, False otherwise
     """
-    subscription = await get_subscription(session, user_id)
-    if not subscription:
-        return False
-
-    if not subscription.is_active:
+    state = await load_user_state(session, user_id)
+    if not state or not state.subscription_is_active:
         return False
 
-    return subscription.expires_at > datetime.datetime.utcnow()
+    return state.subscription_expires_at > datetime.datetime.utcnow()
 
 
-async def extend_subscription(session: AsyncSession, user_id: int, days: int) -> SubscriptionModel:
+async def extend_subscription(
+    session: AsyncSession,
+    user_id: int,
+    days: int,
+    commit: bool = True,
+) -> SubscriptionModel:
     """
     Extend or create subscription.
 
+    Subscription row is locked until the end of transaction, so concurrent
+    extensions are applied one after another.
+
     Args:
         session: Database session
         user_id: User ID
         days: Number of days to add
+        commit: Commit transaction (False to let caller commit and invalidate user state)
 
     Returns:
         SubscriptionModel
     """
-    subscription = await get_subscription(session, user_id)
+    query = select(SubscriptionModel).filter_by(user_id=user_id).with_for_update()
+    subscription = (await session.execute(query)).scalar_one_or_none()
 
     if subscription:
         # Extend existing subscription
@@ -72,6 +83,7 @@ async def extend_subscription(session: AsyncSession, user_id: int, days: int) ->
             subscription.expires_at = datetime.datetime.utcnow() + datetime.timedelta(days=days)
 
         subscription.is_active = True
+        subscription.kicked_at = None
         logger.info(f"Extended subscription for user {user_id} by {days} days")
     else:
         # Create new subscription
@@ -83,18 +95,28 @@ async def extend_subscription(session: AsyncSession, user_id: int, days: int) ->
         session.add(subscription)
         logger.info(f"Created new subscription for user {user_id} for {days} days")
 
+    if not commit:
+        await session.flush()
+        return subscription
+
     await session.commit()
     await session.refresh(subscription)
+    await invalidate_user_state(user_id)
     return subscription
 
 
-async def get_expiring_subscriptions(session: AsyncSession, days: int) -> list[SubscriptionModel]:
+async def get_expiring_subscriptions(
+    session: AsyncSession,
+    days: int,
+    shard: Shard = ALL_USERS,
+) -> list[SubscriptionModel]:
     """
     Get subscriptions expiring in N days.
 
     Args:
         session: Database session
         days: Number of days before expiration
+        shard: Only users of this shard
 
     Returns:
         List of expiring subscriptions
@@ -106,6 +128,7 @@ async def get_expiring_subscriptions(session: AsyncSession, days: int) -> list[S
     query = select(SubscriptionModel).filter(
         SubscriptionModel.is_active == True,  # noqa: E712
         SubscriptionModel.expires_at.between(target_date_start, target_date_end),
+        shard.filter(SubscriptionModel.user_id),
     )
     result = await session.execute(query)
     return list(result.scalars().all())
@@ -122,15 +145,11 @@ async def get_days_left(session: AsyncSession, user_id: int) -> int | None:
     Returns:
         Days left (0 if no subscription or expired), or None if no subscription found
     """
-    subscription = await get_subscription(session, user_id)
-    if not subscription:
+    state = await load_user_state(session, user_id)
+    if not state:
         return None
-        
-    if not subscription.is_active:
-        return 0
 
-    days_left = (subscription.expires_at - datetime.datetime.utcnow()).days
-    return max(0, days_left)
+    return state.days_left
 
 
 async def deactivate_subscription(session: AsyncSession, user_id: int) -> None:
@@ -145,6 +164,7 @@ async def deactivate_subscription(session: AsyncSession, user_id: int) -> None:
     if subscription:
         subscription.is_active = False
         await session.commit()
+        await invalidate_user_state(user_id)
         logger.info(f"Deactivated subscription for user {user_id}")
 
 
@@ -164,3 +184,83 @@ async def get_expired_subscriptions(session: AsyncSession) -> list[SubscriptionM
     )
     result = await session.execute(query)
     return list(result.scalars().all())
+
+
+async def deactivate_expired_subscriptions(session: AsyncSession, shard: Shard = ALL_USERS) -> list[int]:
+    """
+    Deactivate all expired subscriptions with one bulk UPDATE.
+
+    Args:
+        session: Database session
+        shard: Only users of this shard
+
+    Returns:
+        IDs of users whose subscriptions were deactivated
+    """
+    query = (
+        update(SubscriptionModel)
+        .where(
+            SubscriptionModel.is_active == True,  # noqa: E712
+            SubscriptionModel.expires_at < datetime.datetime.utcnow(),
+            shard.filter(SubscriptionModel.user_id),
+        )
+        .values(is_active=False)
+        .returning(SubscriptionModel.user_id)
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(query)
+    user_ids = list(result.scalars().all())
+    await session.commit()
+
+    await invalidate_users_state(user_ids)
+
+    if user_ids:
+        logger.info(f"Deactivated {len(user_ids)} expired subscriptions")
+    return user_ids
+
+
+async def get_pending_kicks(session: AsyncSession, shard: Shard = ALL_USERS) -> list[int]:
+    """
+    Get users with deactivated subscriptions who are not yet removed from channel.
+
+    Includes users whose removal failed during previous runs.
+
+    Args:
+        session: Database session
+        shard: Only users of this shard
+
+    Returns:
+        List of user IDs
+    """
+    query = select(SubscriptionModel.user_id).filter(
+        SubscriptionModel.is_active == False,  # noqa: E712
+        SubscriptionModel.kicked_at == None,  # noqa: E711
+        SubscriptionModel.expires_at < datetime.datetime.utcnow(),
+        shard.filter(SubscriptionModel.user_id),
+    )
+    result = await session.execute(query)
+    return list(result.scalars().all())
+
+
+async def mark_users_kicked(session: AsyncSession, user_ids: list[int]) -> None:
+    """
+    Record successful channel removal.
+
+    Args:
+        session: Database session
+        user_ids: User IDs removed from channel
+    """
+    if not user_ids:
+        return
+
+    query = (
+        update(SubscriptionModel)
+        .where(
+            SubscriptionModel.user_id.in_(user_ids),
+            SubscriptionModel.is_active == False,  # noqa: E712
+        )
+        .values(kicked_at=datetime.datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    await session.execute(query)
+    await session.commit()
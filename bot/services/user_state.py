@@ -0,0 +1,132 @@
+"""User state service."""
+
+from __future__ import annotations
+
+import datetime
+from typing import Iterable
+
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.core.cache import cache
+from bot.core.config import settings
+from bot.core.tracing import traced
+from bot.database.models import AgreementModel, LessonProgressModel, SubscriptionModel, UserModel
+
+USER_STATE_KEY = "user_state:{user_id}"
+
+# Cache tag for everything derived from user's rows
+USER_CACHE_TAG = "user:{user_id}"
+
+
+class UserState(BaseModel):
+    """Snapshot of user, agreement, subscription and lesson progress."""
+
+    user_id: int
+    is_new: bool = False
+    is_blocked: bool = False
+    has_agreement: bool = False
+    subscription_expires_at: datetime.datetime | None = None
+    subscription_is_active: bool = False
+    watched_free_lesson: bool = False
+    reminder_sent: bool = False
+
+    @property
+    def has_subscription(self) -> bool:
+        """Check if user ever had a subscription."""
+        return self.subscription_expires_at is not None
+
+    @property
+    def days_left(self) -> int | None:
+        """
+        Get days left in subscription.
+
+        Returns:
+            Days left (0 if expired or inactive), or None if no subscription found
+        """
+        if self.subscription_expires_at is None:
+            return None
+
+        if not self.subscription_is_active:
+            return 0
+
+        days_left = (self.subscription_expires_at - datetime.datetime.utcnow()).days
+        return max(0, days_left)
+
+
+async def _fetch_user_state(session: AsyncSession, user_id: int) -> UserState | None:
+    query = (
+        select(
+            UserModel.id,
+            UserModel.is_blocked,
+            AgreementModel.agreed_to_offer,
+            AgreementModel.agreed_to_privacy,
+            AgreementModel.agreed_to_consent,
+            SubscriptionModel.expires_at,
+            SubscriptionModel.is_active,
+            LessonProgressModel.watched_free_lesson,
+            LessonProgressModel.reminder_sent,
+        )
+        .select_from(UserModel)
+        .outerjoin(AgreementModel, AgreementModel.user_id == UserModel.id)
+        .outerjoin(SubscriptionModel, SubscriptionModel.user_id == UserModel.id)
+        .outerjoin(LessonProgressModel, LessonProgressModel.user_id == UserModel.id)
+        .where(UserModel.id == user_id)
+    )
+    result = await session.execute(query)
+    row = result.one_or_none()
+
+    if row is None:
+        return None
+
+    return UserState(
+        user_id=user_id,
+        is_blocked=row.is_blocked,
+        has_agreement=bool(row.agreed_to_offer and row.agreed_to_privacy and row.agreed_to_consent),
+        subscription_expires_at=row.expires_at,
+        subscription_is_active=bool(row.is_active),
+        watched_free_lesson=bool(row.watched_free_lesson),
+        reminder_sent=bool(row.reminder_sent),
+    )
+
+
+@traced()
+async def load_user_state(session: AsyncSession, user_id: int) -> UserState | None:
+    """
+    Load user state with a single joined query (or from cache).
+
+    Args:
+        session: Database session
+        user_id: User ID
+
+    Returns:
+        UserState or None if user not found
+    """
+    return await cache.get_or_load(
+        USER_STATE_KEY.format(user_id=user_id),
+        lambda: _fetch_user_state(session, user_id),
+        ttl=settings.cache.USER_STATE_TTL,
+        model=UserState,
+        tags=[USER_CACHE_TAG.format(user_id=user_id)],
+    )
+
+
+async def invalidate_user_state(user_id: int) -> None:
+    """
+    Drop cached user state (and other cached user data) after a write.
+
+    Args:
+        user_id: User ID
+    """
+    await cache.invalidate_tags(USER_CACHE_TAG.format(user_id=user_id))
+
+
+async def invalidate_users_state(user_ids: Iterable[int]) -> None:
+    """
+    Drop cached state of many users after a bulk write, in batched Redis calls.
+
+    Args:
+        user_ids: User IDs
+    """
+    await cache.invalidate_tags(*(USER_CACHE_TAG.format(user_id=user_id) for user_id in user_ids))
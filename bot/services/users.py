@@ -6,12 +6,15 @@ import datetime
 
 from aiogram.types import User
 from loguru import logger
-from sqlalchemy import select
+from sqlalchemy import exists, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from bot.database.models import AgreementModel, LessonProgressModel, UserModel
+from bot.core.tracing import traced
+from bot.database.models import AgreementModel, LessonProgressModel, SubscriptionModel, UserModel
+from bot.services.user_state import invalidate_user_state, invalidate_users_state, load_user_state
 
 
+@traced()
 async def add_user(session: AsyncSession, user: User, referrer: str | None = None) -> UserModel:
     """
     Add new user to database.
@@ -36,6 +39,7 @@ async def add_user(session: AsyncSession, user: User, referrer: str | None = Non
     session.add(new_user)
     await session.commit()
     await session.refresh(new_user)
+    await invalidate_user_state(user.id)
 
     logger.info(f"Added new user: {user.id} (@{user.username})")
     return new_user
@@ -99,19 +103,8 @@ async def check_agreement(session: AsyncSession, user_id: int) -> bool:
     Returns:
         True if user has agreed, False otherwise
     """
-    query = select(AgreementModel).filter_by(user_id=user_id)
-    result = await session.execute(query)
-    agreement = result.scalar_one_or_none()
-
-    # Проверяем все три согласия
-    if not agreement:
-        return False
-
-    return (
-        agreement.agreed_to_offer and
-        agreement.agreed_to_privacy and
-        agreement.agreed_to_consent
-    )
+    state = await load_user_state(session, user_id)
+    return bool(state and state.has_agreement)
 
 
 async def set_agreement(session: AsyncSession, user_id: int) -> AgreementModel:
@@ -145,6 +138,7 @@ async def set_agreement(session: AsyncSession, user_id: int) -> AgreementModel:
 
     await session.commit()
     await session.refresh(agreement)
+    await invalidate_user_state(user_id)
     logger.info(f"User {user_id} agreed to terms")
     return agreement
 
@@ -194,6 +188,7 @@ async def start_lesson(session: AsyncSession, user_id: int) -> LessonProgressMod
 
     await session.commit()
     await session.refresh(progress)
+    await invalidate_user_state(user_id)
     logger.info(f"Lesson started for user {user_id}")
     return progress
 
@@ -211,6 +206,7 @@ async def mark_lesson_watched(session: AsyncSession, user_id: int) -> None:
         progress.watched_free_lesson = True
         progress.free_lesson_watched_at = datetime.datetime.utcnow()
         await session.commit()
+        await invalidate_user_state(user_id)
         logger.info(f"Lesson watched for user {user_id}")
 
 
@@ -222,8 +218,108 @@ async def mark_reminder_sent(session: AsyncSession, user_id: int) -> None:
         session: Database session
         user_id: User ID
     """
-    progress = await get_lesson_progress(session, user_id)
-    if progress:
-        progress.reminder_sent = True
-        await session.commit()
+    query = update(LessonProgressModel).filter_by(user_id=user_id).values(reminder_sent=True)
+    result = await session.execute(query)
+    await session.commit()
+    if result.rowcount:
+        await invalidate_user_state(user_id)
         logger.info(f"Reminder sent for user {user_id}")
+
+
+async def claim_lesson_reminders(
+    session: AsyncSession,
+    watched_from: datetime.datetime,
+    watched_to: datetime.datetime,
+    limit: int,
+    claim_ttl: float,
+) -> list[int]:
+    """
+    Claim users for lesson reminder.
+
+    Users who watched free lesson in the given window, never subscribed
+    and didn't block the bot get reminder_claimed_at set with one
+    UPDATE ... RETURNING. Rows are locked with SKIP LOCKED, so concurrent
+    runs claim different users. reminder_sent is set only after delivery
+    (mark_lesson_reminders_sent); claims of undelivered reminders, e.g.
+    after a crash, are taken again once older than claim_ttl.
+
+    Args:
+        session: Database session
+        watched_from: Start of free lesson watch window
+        watched_to: End of free lesson watch window
+        limit: Maximum number of users to claim
+        claim_ttl: Seconds before unfinished claim can be taken again
+
+    Returns:
+        Claimed user IDs
+    """
+    now = datetime.datetime.utcnow()
+    due_ids = (
+        select(LessonProgressModel.id)
+        .join(UserModel, UserModel.id == LessonProgressModel.user_id)
+        .filter(
+            LessonProgressModel.watched_free_lesson == True,  # noqa: E712
+            LessonProgressModel.reminder_sent == False,  # noqa: E712
+            or_(
+                LessonProgressModel.reminder_claimed_at == None,  # noqa: E711
+                LessonProgressModel.reminder_claimed_at < now - datetime.timedelta(seconds=claim_ttl),
+            ),
+            LessonProgressModel.free_lesson_watched_at.between(watched_from, watched_to),
+            UserModel.is_blocked == False,  # noqa: E712
+            ~exists().where(SubscriptionModel.user_id == LessonProgressModel.user_id),
+        )
+        .order_by(LessonProgressModel.id)
+        .limit(limit)
+        .with_for_update(of=LessonProgressModel, skip_locked=True)
+    )
+    query = (
+        update(LessonProgressModel)
+        .where(LessonProgressModel.id.in_(due_ids))
+        .values(reminder_claimed_at=now)
+        .returning(LessonProgressModel.user_id)
+    )
+    user_ids = list((await session.execute(query)).scalars().all())
+    await session.commit()
+    return user_ids
+
+
+async def mark_lesson_reminders_sent(session: AsyncSession, user_ids: list[int]) -> None:
+    """
+    Finish claims of users whose reminder was delivered (or who blocked the bot).
+
+    Args:
+        session: Database session
+        user_ids: User IDs
+    """
+    if not user_ids:
+        return
+
+    query = (
+        update(LessonProgressModel)
+        .where(LessonProgressModel.user_id.in_(user_ids))
+        .values(reminder_sent=True, reminder_claimed_at=None)
+    )
+    await session.execute(query)
+    await session.commit()
+    await invalidate_users_state(user_ids)
+
+
+async def set_users_blocked(session: AsyncSession, user_ids: list[int], is_blocked: bool) -> None:
+    """
+    Mark users who blocked (or unblocked) the bot.
+
+    Args:
+        session: Database session
+        user_ids: User IDs
+        is_blocked: New flag value
+    """
+    if not user_ids:
+        return
+
+    query = update(UserModel).where(UserModel.id.in_(user_ids)).values(is_blocked=is_blocked)
+    await session.execute(query)
+    await session.commit()
+
+    await invalidate_users_state(user_ids)
+
+    logger.info(f"Set is_blocked={is_blocked} for {len(user_ids)} users")
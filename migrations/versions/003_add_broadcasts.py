@@ -0,0 +1,54 @@
+"""Add broadcast jobs and blocked users flag
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.add_column(
+        'users',
+        sa.Column('is_blocked', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+    )
+
+    op.create_table(
+        'broadcast_jobs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('created_by', sa.BigInteger(), nullable=False),
+        sa.Column('from_chat_id', sa.BigInteger(), nullable=False),
+        sa.Column('message_id', sa.Integer(), nullable=False),
+        sa.Column('progress_message_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), server_default=sa.text("'running'"), nullable=False),
+        sa.Column('total', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('sent', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('failed', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('blocked', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('last_user_id', sa.BigInteger(), server_default=sa.text('0'), nullable=False),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        comment='Admin broadcast jobs with progress checkpoint'
+    )
+    op.create_index(op.f('ix_broadcast_jobs_status'), 'broadcast_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index(op.f('ix_broadcast_jobs_status'), table_name='broadcast_jobs')
+    op.drop_table('broadcast_jobs')
+    op.drop_column('users', 'is_blocked')
@@ -0,0 +1,31 @@
+"""Add kicked_at to subscriptions
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.add_column('subscriptions', sa.Column('kicked_at', sa.DateTime(), nullable=True))
+
+    # Subscriptions deactivated before this migration were already processed
+    op.execute("UPDATE subscriptions SET kicked_at = CURRENT_TIMESTAMP WHERE is_active = false")
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_column('subscriptions', 'kicked_at')
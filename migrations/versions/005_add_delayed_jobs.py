@@ -0,0 +1,43 @@
+"""Add delayed jobs queue
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.create_table(
+        'delayed_jobs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('user_id', sa.BigInteger(), nullable=False),
+        sa.Column('run_at', sa.DateTime(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=True),
+        sa.Column('attempts', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('kind', 'user_id', name='uq_delayed_jobs_kind_user_id'),
+        comment='Delayed jobs queue'
+    )
+    op.create_index(op.f('ix_delayed_jobs_run_at'), 'delayed_jobs', ['run_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index(op.f('ix_delayed_jobs_run_at'), table_name='delayed_jobs')
+    op.drop_table('delayed_jobs')
@@ -0,0 +1,30 @@
+"""Add unique order_id to payments
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.add_column('payments', sa.Column('order_id', sa.String(length=255), nullable=True))
+    op.create_unique_constraint('uq_payments_order_id', 'payments', ['order_id'])
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_constraint('uq_payments_order_id', 'payments', type_='unique')
+    op.drop_column('payments', 'order_id')
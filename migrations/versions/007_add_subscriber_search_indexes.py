@@ -0,0 +1,37 @@
+"""Add indexes for admin subscriber list
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    # Keyset pagination on (expires_at, user_id), replaces single-column index
+    op.create_index('ix_subscriptions_expires_at_user_id', 'subscriptions', ['expires_at', 'user_id'], unique=False)
+    op.drop_index(op.f('ix_subscriptions_expires_at'), table_name='subscriptions')
+
+    # Case-insensitive prefix search (LIKE 'abc%')
+    op.create_index('ix_users_username_prefix', 'users', [sa.text('lower(username) text_pattern_ops')], unique=False)
+    op.create_index('ix_users_first_name_prefix', 'users', [sa.text('lower(first_name) text_pattern_ops')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index('ix_users_first_name_prefix', table_name='users')
+    op.drop_index('ix_users_username_prefix', table_name='users')
+    op.create_index(op.f('ix_subscriptions_expires_at'), 'subscriptions', ['expires_at'], unique=False)
+    op.drop_index('ix_subscriptions_expires_at_user_id', table_name='subscriptions')
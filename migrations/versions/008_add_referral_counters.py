@@ -0,0 +1,50 @@
+"""Add denormalized referral counters to users
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.add_column('users', sa.Column('referrals_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('paid_referrals_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from existing referrals
+    op.execute(
+        """
+        UPDATE users
+        SET referrals_count = counts.total,
+            paid_referrals_count = counts.paid
+        FROM (
+            SELECT referrer_id,
+                   COUNT(*) AS total,
+                   COUNT(*) FILTER (WHERE is_bonus_given) AS paid
+            FROM referrals
+            GROUP BY referrer_id
+        ) AS counts
+        WHERE users.id = counts.referrer_id
+        """
+    )
+
+    op.create_index('ix_users_referrals_count', 'users', ['referrals_count'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index('ix_users_referrals_count', table_name='users')
+    op.drop_column('users', 'paid_referrals_count')
+    op.drop_column('users', 'referrals_count')
@@ -0,0 +1,28 @@
+"""Add lease to delayed jobs
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.add_column('delayed_jobs', sa.Column('locked_until', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_column('delayed_jobs', 'locked_until')
@@ -0,0 +1,42 @@
+"""Deduplicate delayed jobs by key instead of user
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.add_column('delayed_jobs', sa.Column('dedup_key', sa.String(length=255), nullable=True))
+    op.execute("UPDATE delayed_jobs SET dedup_key = CAST(user_id AS VARCHAR)")
+    op.alter_column('delayed_jobs', 'dedup_key', nullable=False)
+
+    op.drop_constraint('uq_delayed_jobs_kind_user_id', 'delayed_jobs', type_='unique')
+    op.create_unique_constraint('uq_delayed_jobs_kind_dedup_key', 'delayed_jobs', ['kind', 'dedup_key'])
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    # Keep one job per user and kind so the old constraint can be restored
+    op.execute(
+        """
+        DELETE FROM delayed_jobs
+        WHERE id NOT IN (SELECT MAX(id) FROM delayed_jobs GROUP BY kind, user_id)
+        """
+    )
+    op.drop_constraint('uq_delayed_jobs_kind_dedup_key', 'delayed_jobs', type_='unique')
+    op.create_unique_constraint('uq_delayed_jobs_kind_user_id', 'delayed_jobs', ['kind', 'user_id'])
+    op.drop_column('delayed_jobs', 'dedup_key')
@@ -0,0 +1,28 @@
+"""Add lesson reminder claim timestamp
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.add_column('lesson_progress', sa.Column('reminder_claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_column('lesson_progress', 'reminder_claimed_at')
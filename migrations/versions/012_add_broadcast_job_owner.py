@@ -0,0 +1,28 @@
+"""Add broadcast job owner
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17
+
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.add_column('broadcast_jobs', sa.Column('owner', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_column('broadcast_jobs', 'owner')